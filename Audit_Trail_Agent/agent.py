@@ -1,28 +1,11 @@
-# Built-in libraries
-import os
-
 # Third-party libraries
-import boto3
-from strands import Agent
-from strands.models import BedrockModel
 from strands_tools import retrieve
 
-# Create a custom boto3 session
-session = boto3.Session(
-    aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
-    aws_session_token=os.environ.get('AWS_SESSION_TOKEN'),  
-    region_name=os.environ.get('AWS_REGION'),
-)
-
-# Create a Bedrock model instance
-bedrock_model = BedrockModel(
-    model_id="amazon.nova-pro-v1:0",   # Nova Pro
-    boto_session=session,
-)
+# Local libraries
+from common_agents.factory import create_agent, deferred_agents
 
 
-audit_trail_agent = Agent(model=bedrock_model, tools=[store, retrieve], system_prompt="""
+SYSTEM_PROMPT = """
 Role:
 You are an Audit Trail Agent responsible for capturing, organizing, and presenting a transparent, structured, and traceable record of all actions and decisions made by intelligent agents in the procurement process.
 
@@ -61,6 +44,15 @@ Return a structured JSON including:
 - Version history (if applicable)
 
 Your output should support traceability, compliance, and transparency across the procurement lifecycle.
-""",
-callback_handler=None
-)
+"""
+
+
+def create_audit_trail_agent(credentials=None):
+    """Creates an Audit Trail Agent on the shared Bedrock client for the given credentials."""
+    return create_agent(SYSTEM_PROMPT, [store, retrieve], credentials, name="audit_trail_agent",
+                        callback_handler=None)
+
+
+# audit_trail_agent is built on first access
+__getattr__ = deferred_agents(globals(), {"audit_trail_agent": create_audit_trail_agent})
+
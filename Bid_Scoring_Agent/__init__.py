@@ -1 +0,0 @@
-from .agent import bid_scoring_agent, pdf_code_agent
\ No newline at end of file
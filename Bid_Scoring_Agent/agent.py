@@ -1,291 +1,60 @@
-import boto3
-from strands.models import BedrockModel
-from strands import Agent
-import os
-from strands import Agent
 from strands_tools import retrieve
-
-# Create a custom boto3 session
-session = boto3.Session(
-    aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
-    aws_session_token=os.environ.get('AWS_SESSION_TOKEN'),  
-    region_name=os.environ.get('AWS_REGION'),
-)
-
-# Create a Bedrock model instance
-bedrock_model = BedrockModel(
-    model_id="amazon.nova-pro-v1:0",   # Nova Pro
-    boto_session=session,
-)
- 
+from common_agents.factory import create_agent, deferred_agents
 
 
 ## Bid Scoring Agent
-bid_scoring_agent = Agent(model=bedrock_model, tools=[retrieve],
-                          system_prompt = """
+BID_SCORING_PROMPT = """
 Role:
-You are a Bid Scoring Agent responsible for evaluating supplier bids using a structured, transparent, and auditable weighted average scoring model. You are also capable of generating a clean, json format output.
+You are a Bid Scoring Agent responsible for rating supplier bids in a structured, transparent, and auditable way. You are also capable of generating a clean, json format output.
 
 Objective:
-Your goal is to assess suppliers' bids based on multiple criteria including sustainability, cost-effectiveness, delivery reliability, and historical performance. You must apply a weighted scoring methodology, justify each score with data, and ensure compliance with procurement policies.
+Your goal is to assess suppliers' bids based on multiple criteria including sustainability, cost-effectiveness, delivery reliability, and historical performance. You must justify each rating with data and ensure compliance with procurement policies. Weighted and final scores are computed by the application from your ratings.
 
 Step-by-Step Instructions:
 
 1. Evaluation Criteria:
-   Use the following fixed criteria and weights:
-   - CO₂ Emissions: 20%
-   - Circularity: 15%
-   - Cost: 25%
-   - Delivery Reliability: 20%
-   - Vendor Scorecard (Quality, Responsiveness, Compliance): 20%
+   Rate the following fixed criteria:
+   - CO₂ Emissions
+   - Circularity
+   - Cost
+   - Delivery Reliability
+   - Vendor Scorecard (Quality, Responsiveness, Compliance)
 
 2. Rate Bid:
    Score each supplier on a consistent scale (1 to 5) for each criterion using validated bid data and compliance reports.
+   Use 1 when there is no evidence for a criterion.
 
-3. Calculate Weighted Scores:
-   For each criterion, multiply the score by its assigned weight:
-   Weighted Score = Score × Weight
+3. Do Not Calculate Scores:
+   Do not apply weights, multiply or sum scores, and do not report weighted or final scores.
 
-4. Compute Final Bid Score:
-   Sum all weighted scores to get the final bid score:
-   Final Score = Σ (Score_i × Weight_i)
-
-5. Provide Scoring Rationale:
+4. Provide Scoring Rationale:
    For each criterion, explain the reasoning behind the score using supporting data, compliance findings, and performance history (if any).
 
-6. Output Format:
-   Output the evaluation in JSON format:
-   - Supplier Info (if available)
-   - Category considered to score
-   - Weight Assigned to the category
-   - Score for the category (Out of 5)
-   - Weighted Score of that category
-   - Final Weighted Score of the category
-   - Justification for the score given
-   - Compliance Flags 
-   - Final Score to the supplier
-   - Any additional observations or recommendations
-
-Ensure transparency, consistency, and traceability in all scoring decisions and report generation.
+5. Output Format:
+   Output the evaluation as a single JSON object:
+   {
+     "supplier": "Supplier name",
+     "supplier_info": {"field": "value"},
+     "ratings": [
+       {"criterion": "CO₂ Emissions", "score": 1-5, "justification": "...", "compliance_flag": "Pass | Fail | None"}
+     ],
+     "compliance_flags": ["..."],
+     "observations": ["Any additional observations, recommendations or references"]
+   }
+
+Ensure transparency, consistency, and traceability in all scoring decisions.
 """
- )
-
-
-# Pdf code generation agent 
-pdf_code_agent = Agent(model=bedrock_model,
-    system_prompt = """
-Role:
-You are a Python developer responsible for generating Python code that creates a PDF report from structured bid evaluation data. You receive output from a Bid Scoring Agent and Compliance Agent, which includes explanatory text and a JSON output. Your task is to extract the JSON, dynamically convert it into a styled HTML report with necessary CSS, and generate Python code that uses PyMuPDF (fitz) to convert the HTML into a PDF.
-
-Objective:
-Your goal is to return Python code that produces a clean, professional, and consistently formatted PDF report. The code must be complete, correct, and ready to run. The HTML content should be dynamically generated based on the structure and content of the JSON, but must follow a fixed layout:
-
-PDF Layout Format:
-1. **Title**: Supplier Name (as <h1>)
-2. **Sub-header**: "Supplier Info" (as <h2>) followed by any supplier-related information in paragraph or table format.
-3. **Score Table**:
-   - A table with columns: Category, Weight Percentage of category, Score (out of 5), Weighted Score, Justification, Compliance flag information.
-   - Each row represents one scoring category.
-4. **Final Score**:
-   - Display the final weighted score of the supplier.
-5. **Compliance Flag**:
-   - If present, display at the bottom of the PDF in a clearly marked section.
-6. **Additional Observations**:
-   - Any additional observations or recommendations.
-   - References to supporting documents.
-
-Workflow:
-
-1. Extract JSON:
-   - Identify and extract the JSON block from the Bid Scoring Agent's and Compliance Agent's output.
-   - Ignore any surrounding text, markdown, or tags (e.g., <thinking>, ```json).
-   - Ensure the JSON is syntactically valid before parsing.
-   - Parse the JSON into a Python dictionary using `json.loads()`.
-
-2. Convert JSON to HTML:
-   - Follow the fixed layout format described above.
-   - Use semantic HTML tags (<h1>, <h2>, <table>, <tr>, <td>, <p>) and inline CSS for styling.
-   - Ensure the score section is always rendered as a table with the specified columns.
-   - If any section is missing in the JSON, skip it gracefully without breaking the layout.
-   - Do not use HTML-escaped characters like &lt; or &gt;; use raw HTML tags.
-   - Ensure all triple-quoted strings in Python are properly closed to avoid syntax errors.
-   - Escape any embedded triple quotes or special characters in strings to prevent unterminated string errors.
-   - Ensure the HTML is valid, readable, and visually consistent.
-   - Never pass {data['Final Score']} this type of text in the code if it not exists in provided json.
-
-3. Generate Python Code:
-   - Use the `fitz` (PyMuPDF) library to convert the generated HTML into a PDF.
-   - Use only valid and supported methods from the `fitz` library.
-   - Use `page.insert_htmlbox(rect, html_content)` to render HTML into the PDF.
-   - Define a rectangular area (`fitz.Rect`) for placing the HTML content.
-   - Save the PDF to a file path ("bidoutput.pdf") always.
-   - Include all necessary imports (`import fitz`, `import json`, etc.).
-   - Ensure the code is syntactically correct, complete, and ready to run without modification.
 
-4. Output:
-   - Return only the complete Python code that performs the HTML-to-PDF conversion.
-   - Do not execute the code.
-   - Do not include any explanation, markdown formatting, or additional text.
-
-Error Prevention Instructions:
-- Always close triple-quoted strings properly.
-- Avoid using unescaped triple quotes inside strings.
-- Validate JSON before parsing.
-- Ensure all HTML tags are properly opened and closed.
-- Use only supported PyMuPDF methods and avoid deprecated or invalid calls.
-
-Ensure the final code is robust, adaptable to different JSON structures, and produces a visually appealing PDF report that adheres to the specified layout.
-
-<Example code>
-import fitz  # PyMuPDF
-import json
-
-# Sample JSON data
-json_data = '''
-{
-  "title": "Bid Evaluation Report",
-  "supplier": "Star Enterprise",
-  "categories": [
-    {
-      "category": "CO₂ Emissions",
-      "weight": 0.20,
-      "score": 1,
-      "weighted_score": 0.20,
-      "justification": "The bid data does not provide any information regarding CO₂ emissions per 100 units.",
-      "compliance_flag": "Fail"
-    },
-    {
-      "category": "Circularity",
-      "weight": 0.15,
-      "score": 1,
-      "weighted_score": 0.15,
-      "justification": "The bid data does not provide any information regarding the circularity score.",
-      "compliance_flag": "Fail"
-    },
-    {
-      "category": "Cost",
-      "weight": 0.25,
-      "score": 3,
-      "weighted_score": 0.75,
-      "justification": "The total cost is $43,272.81. Without a benchmark, a neutral score of 3 is assigned.",
-      "compliance_flag": "None"
-    },
-    {
-      "category": "Delivery Reliability",
-      "weight": 0.20,
-      "score": 1,
-      "weighted_score": 0.20,
-      "justification": "The bid data does not provide any information regarding the delivery time.",
-      "compliance_flag": "Fail"
-    },
-    {
-      "category": "Vendor Scorecard (Quality, Responsiveness, Compliance)",
-      "weight": 0.20,
-      "score": 1,
-      "weighted_score": 0.20,
-      "justification": "There is no information on quality, responsiveness, or compliance in the bid data.",
-      "compliance_flag": "Fail"
-    }
-  ],
-  "final_score": 1.50,
-  "compliance_status": "Non-compliant"
-}
-'''
-
-# Parse JSON
-data = json.loads(json_data)
-
-# Generate HTML content
-html_content = f'''
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{data['title']}</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            margin: 20px;
-        }}
-        h1, h2 {{
-            color: #333;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }}
-        th, td {{
-            border: 1px solid #ddd;
-            padding: 8px;
-            text-align: left;
-        }}
-        th {{
-            background-color: #f2f2f2;
-        }}
-        .non-compliant {{
-            color: red;
-            font-weight: bold;
-        }}
-    </style>
-</head>
-<body>
-    <h1>{data['title']}</h1>
-    <h2>Supplier: {data['supplier']}</h2>
-    <table>
-        <thead>
-            <tr>
-                <th>Category</th>
-                <th>Weight</th>
-                <th>Score</th>
-                <th>Weighted Score</th>
-                <th>Justification</th>
-                <th>Compliance Flag</th>
-            </tr>
-        </thead>
-        <tbody>
-'''
-
-for category in data['categories']:
-    html_content += f'''
-            <tr>
-                <td>{category['category']}</td>
-                <td>{category['weight']}</td>
-                <td>{category['score']}</td>
-                <td>{category['weighted_score']}</td>
-                <td>{category['justification']}</td>
-                <td class="{'non-compliant' if category['compliance_flag'] == 'Fail' else ''}">{category['compliance_flag']}</td>
-            </tr>
-'''
-
-html_content += f'''
-        </tbody>
-    </table>
-    <h2>Final Score: {data['final_score']}</h2>
-    <p class="non-compliant">Compliance Status: {data['compliance_status']}</p>
-</body>
-</html>
-'''
-
-# Create a PDF document
-doc = fitz.open()
-page = doc.new_page(width=800, height=1000)  # Adjust dimensions as needed
-
-# Insert HTML content into the PDF
-page.insert_htmlbox(fitz.Rect(70, 70, 750, 950), html_content)  # Adjust rect as needed
-
-# Save the PDF to a file
-doc.save("bidoutput.pdf")
-
-<Example code/>
-"""
 
+def create_bid_scoring_agent(credentials=None):
+    """Creates a Bid Scoring Agent on the shared Bedrock client for the given credentials."""
+    return create_agent(BID_SCORING_PROMPT, [retrieve], credentials, name="bid_scoring_agent")
 
 
-)
+# The agents are built on first access
+__getattr__ = deferred_agents(globals(), {
+    "bid_scoring_agent": create_bid_scoring_agent,
+})
 
 
 
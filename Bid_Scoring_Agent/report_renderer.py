@@ -0,0 +1,269 @@
+import html
+import io
+import json
+import re
+
+
+# A4 page and its content area with 50pt margins, in points; fitz is imported on first render
+PAGE_RECT = (0, 0, 595, 842)
+CONTENT_RECT = (50, 50, 545, 792)
+
+REPORT_CSS = """
+body { font-family: sans-serif; font-size: 10px; color: #222; }
+h1 { font-size: 20px; color: #1f3864; }
+h2 { font-size: 14px; color: #333; margin-top: 14px; }
+table { border-collapse: collapse; width: 100%; }
+th { background-color: #d9e2f3; font-weight: bold; }
+th, td { border: 1px solid #999; padding: 4px; text-align: left; vertical-align: top; }
+.fail { color: #c00000; font-weight: bold; }
+.pass { color: #007a33; font-weight: bold; }
+.final { font-size: 16px; font-weight: bold; }
+.bar { background-color: #4472c4; height: 8px; }
+"""
+
+# Column order of the score table
+SCORE_COLUMNS = ["Category", "Weight", "Score (out of 5)", "Weighted Score", "Justification", "Compliance Flag"]
+
+# Width in points of the largest bar in the tornado table
+TORNADO_BAR_WIDTH = 120
+
+
+def _normalize_key(key):
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+def _lookup(data, *names, default=None):
+    """Returns the first value whose key matches one of `names`, ignoring case, spaces and underscores."""
+    keys = {_normalize_key(key): key for key in data}
+    for name in names:
+        key = keys.get(_normalize_key(name))
+        if key is not None:
+            return data[key]
+    return default
+
+
+def extract_json_block(text):
+    """
+    Extracts the first JSON object from agent output.
+
+    Fenced ```json blocks are preferred; otherwise the first balanced {...} span that
+    parses is used. Surrounding text and tags such as <thinking> are ignored.
+
+    Args:
+        text (str): Agent response text.
+
+    Returns:
+        dict: The parsed object, or None if the text contains no valid JSON object.
+    """
+    for block in re.findall(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL):
+        try:
+            return json.loads(block)
+        except json.JSONDecodeError:
+            pass
+
+    decoder = json.JSONDecoder()
+    for match in re.finditer(r"\{", text):
+        try:
+            data, _ = decoder.raw_decode(text, match.start())
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def _category_rows(evaluation):
+    """Normalizes the scoring categories, given as a list or as a dict keyed by category name."""
+    categories = _lookup(evaluation, "categories", "category_scores", "scores", "evaluation", "criteria", default=[])
+    if isinstance(categories, dict):
+        categories = [dict(value, category=name) for name, value in categories.items() if isinstance(value, dict)]
+
+    rows = []
+    for category in categories:
+        if not isinstance(category, dict):
+            continue
+        score = _lookup(category, "score", default="")
+        rows.append([
+            _lookup(category, "category", "criterion", "name", default=""),
+            _lookup(category, "weight", "weight_percentage", "weight_assigned", default=""),
+            "Unrated" if score is None else score,
+            _lookup(category, "weighted_score", default=""),
+            _lookup(category, "justification", "rationale", "reasoning", default=""),
+            _lookup(category, "compliance_flag", "compliance_flags", "compliance", default=""),
+        ])
+    return rows
+
+
+def _format_value(value):
+    if isinstance(value, float) and value != value:
+        # NaN is the score of a supplier without any usable rating
+        return "Unrated"
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_format_value(item) for item in value)
+    if isinstance(value, dict):
+        return "; ".join(f"{key}: {_format_value(item)}" for key, item in value.items())
+    return "" if value is None else str(value)
+
+
+def _flag_class(value):
+    text = _format_value(value).lower()
+    if any(word in text for word in ("fail", "non-compliant", "non compliant")):
+        return "fail"
+    if text in ("pass", "compliant", "none"):
+        return "pass"
+    return ""
+
+
+def _html_block(value):
+    """Renders free-form supplier info, flags or observations as a table, list or paragraph."""
+    if isinstance(value, dict):
+        rows = "".join(
+            f"<tr><th>{html.escape(str(key))}</th><td>{html.escape(_format_value(item))}</td></tr>"
+            for key, item in value.items()
+        )
+        return f"<table>{rows}</table>"
+    if isinstance(value, (list, tuple)):
+        items = "".join(f"<li>{html.escape(_format_value(item))}</li>" for item in value)
+        return f"<ul>{items}</ul>"
+    return f"<p>{html.escape(_format_value(value))}</p>"
+
+
+def _sensitivity_html(sensitivity, supplier):
+    """Renders the weight-sensitivity results: rank probabilities per supplier and a tornado table."""
+    # e.g. "cost_focused" reads as "cost focused weights"
+    profile = str(sensitivity.get("profile", "profile")).replace("_", " ")
+    parts = [
+        f"<p>Final scores recomputed for {sensitivity['samples']} weight vectors sampled around the "
+        f"{html.escape(profile)} weights (Dirichlet, concentration {_format_value(sensitivity['concentration'])}). "
+        f"The ranking is unchanged in {sensitivity['rank_stability']:.0%} of the samples.</p>"
+    ]
+
+    rows = "".join(
+        f"<tr><td>{html.escape(name)}</td><td>{_format_value(result['base_score'])}</td><td>{result['base_rank']}</td>"
+        f"<td>{result['win_probability']:.0%}</td>"
+        f"<td>{_format_value(result['score_p5'])} - {_format_value(result['score_p95'])}</td></tr>"
+        for name, result in sensitivity["suppliers"].items()
+    )
+    parts.append("<table><tr><th>Supplier</th><th>Score</th><th>Rank</th><th>Probability of Rank 1</th>"
+                 f"<th>Score Range (P5 - P95)</th></tr>{rows}</table>")
+
+    entries = sensitivity["tornado"]
+    largest = max((entry["swing"] for entry in entries), default=0) or 1
+    rows = ""
+    for entry in entries:
+        low = entry["low_scores"].get(supplier, "")
+        high = entry["high_scores"].get(supplier, "")
+        width = max(1, round(TORNADO_BAR_WIDTH * entry["swing"] / largest))
+        rows += (
+            f"<tr><td>{html.escape(entry['criterion'])}</td>"
+            f"<td>{_format_value(entry['low_weight'])}% - {_format_value(entry['high_weight'])}%</td>"
+            f"<td>{_format_value(low)}</td><td>{_format_value(high)}</td><td>{_format_value(entry['swing'])}</td>"
+            f"<td><div class=\"bar\" style=\"width:{width}px\"></div></td></tr>"
+        )
+    parts.append("<h2>Criterion Influence</h2><table><tr><th>Criterion</th><th>Weight Range</th>"
+                 "<th>Score at Low Weight</th><th>Score at High Weight</th><th>Largest Score Change</th>"
+                 f"<th></th></tr>{rows}</table>")
+    return "".join(parts)
+
+
+def render_report_html(evaluation):
+    """
+    Builds the report HTML for a bid evaluation.
+
+    The layout is fixed: supplier name as title, supplier info, score table, final
+    score, compliance flags and additional observations, followed by the
+    weight-sensitivity analysis when the evaluation has one. Missing sections are
+    skipped.
+
+    Args:
+        evaluation (dict): Bid Scoring Agent JSON, with keys matched loosely
+            (e.g. "final_score" or "Final Score").
+
+    Returns:
+        str: The report HTML.
+    """
+    supplier_info = _lookup(evaluation, "supplier_info", "supplier_information", "supplier_details")
+    supplier = _lookup(evaluation, "supplier", "supplier_name", "name", "title")
+    if supplier is None and isinstance(supplier_info, dict):
+        supplier = _lookup(supplier_info, "supplier_name", "name", "supplier")
+    if isinstance(supplier, dict):
+        supplier = _lookup(supplier, "supplier_name", "name", default="")
+
+    parts = [f"<h1>{html.escape(_format_value(supplier) or 'Bid Evaluation Report')}</h1>"]
+
+    if supplier_info:
+        parts.append("<h2>Supplier Info</h2>" + _html_block(supplier_info))
+
+    rows = _category_rows(evaluation)
+    if rows:
+        header = "".join(f"<th>{column}</th>" for column in SCORE_COLUMNS)
+        body = "".join(
+            "<tr>" + "".join(f"<td>{html.escape(_format_value(cell))}</td>" for cell in row[:-1])
+            + f"<td class=\"{_flag_class(row[-1])}\">{html.escape(_format_value(row[-1]))}</td></tr>"
+            for row in rows
+        )
+        parts.append(f"<h2>Score Table</h2><table><tr>{header}</tr>{body}</table>")
+
+    final_score = _lookup(evaluation, "final_score", "final_weighted_score", "total_score")
+    if final_score is not None:
+        parts.append(f"<h2>Final Score</h2><p class=\"final\">{html.escape(_format_value(final_score))}</p>")
+
+    flags = _lookup(evaluation, "compliance_flags", "compliance_status", "compliance")
+    if flags:
+        parts.append("<h2>Compliance Flags</h2>" + _html_block(flags))
+
+    for title, names in (("Additional Observations", ("observations", "additional_observations", "recommendations")),
+                         ("References", ("references", "supporting_documents"))):
+        value = _lookup(evaluation, *names)
+        if value:
+            parts.append(f"<h2>{title}</h2>" + _html_block(value))
+
+    sensitivity = evaluation.get("sensitivity")
+    if sensitivity:
+        parts.append("<h2>Weight Sensitivity</h2>" + _sensitivity_html(sensitivity, _format_value(supplier)))
+
+    return "<body>" + "".join(parts) + "</body>"
+
+
+def render_bid_report(evaluation, output_path=None):
+    """
+    Renders a bid evaluation to PDF in-process with PyMuPDF.
+
+    The layout is that of `render_report_html`. Content flows over as many pages as
+    it needs, and embedded fonts are subset.
+
+    Args:
+        evaluation (dict or str): Bid Scoring Agent JSON, or its raw response text.
+            Text without a JSON block is rendered as an observation.
+        output_path (str, optional): Also write the PDF to this path.
+
+    Returns:
+        bytes: The PDF document.
+    """
+    if not isinstance(evaluation, dict):
+        text = str(evaluation)
+        evaluation = extract_json_block(text) or {"observations": text}
+
+    import fitz
+
+    buffer = io.BytesIO()
+    writer = fitz.DocumentWriter(buffer)
+    story = fitz.Story(html=render_report_html(evaluation), user_css=REPORT_CSS)
+    more = True
+    while more:
+        device = writer.begin_page(fitz.Rect(PAGE_RECT))
+        more, _ = story.place(fitz.Rect(CONTENT_RECT))
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+
+    # Story embeds whole fonts; subsetting keeps the report to tens of kilobytes
+    with fitz.open(stream=buffer.getvalue(), filetype="pdf") as doc:
+        doc.subset_fonts()
+        pdf_bytes = doc.tobytes(garbage=3, deflate=True)
+    if output_path:
+        with open(output_path, "wb") as f:
+            f.write(pdf_bytes)
+    return pdf_bytes
@@ -0,0 +1,269 @@
+import logging
+import os
+import re
+
+import numpy as np
+
+from .report_renderer import extract_json_block
+
+
+logger = logging.getLogger(__name__)
+
+# Scoring criteria, in the column order of every score matrix
+CRITERIA = ["CO₂ Emissions", "Circularity", "Cost", "Delivery Reliability", "Vendor Scorecard"]
+
+# Weights in percent; "policy" is the procurement policy weighting
+WEIGHT_PROFILES = {
+    "policy": {"CO₂ Emissions": 20, "Circularity": 15, "Cost": 25, "Delivery Reliability": 20, "Vendor Scorecard": 20},
+    "cost_focused": {"CO₂ Emissions": 15, "Circularity": 10, "Cost": 35, "Delivery Reliability": 20, "Vendor Scorecard": 20},
+    "sustainability_focused": {"CO₂ Emissions": 30, "Circularity": 25, "Cost": 15, "Delivery Reliability": 15, "Vendor Scorecard": 15},
+}
+DEFAULT_PROFILE = os.environ.get("BID_WEIGHT_PROFILE", "policy")
+
+SCORE_MIN = 1
+SCORE_MAX = 5
+
+# Leading words of the names the agent uses for each criterion
+CRITERION_ALIASES = {
+    "co2": "CO₂ Emissions",
+    "carbon": "CO₂ Emissions",
+    "emission": "CO₂ Emissions",
+    "circular": "Circularity",
+    "cost": "Cost",
+    "price": "Cost",
+    "pricing": "Cost",
+    "delivery": "Delivery Reliability",
+    "vendor": "Vendor Scorecard",
+    "scorecard": "Vendor Scorecard",
+    "supplier scorecard": "Vendor Scorecard",
+}
+
+
+def _normalize_key(key):
+    return re.sub(r"[^a-z0-9]", "", str(key).lower())
+
+
+def _lookup(data, *names, default=None):
+    keys = {_normalize_key(key): key for key in data}
+    for name in names:
+        key = keys.get(_normalize_key(name))
+        if key is not None:
+            return data[key]
+    return default
+
+
+def canonical_criterion(name):
+    """
+    Maps a criterion name used by the agent to one of `CRITERIA`.
+
+    Args:
+        name (str): e.g. "CO2 emissions" or "Vendor Scorecard (Quality, Responsiveness, Compliance)".
+
+    Returns:
+        str: The canonical name, or None if the name is not a scoring criterion.
+    """
+    text = str(name).lower().replace("₂", "2").strip()
+    for alias, criterion in sorted(CRITERION_ALIASES.items(), key=lambda item: -len(item[0])):
+        if text.startswith(alias):
+            return criterion
+    return None
+
+
+def weight_vector(weights=None):
+    """
+    Resolves a weight profile to a normalized vector in `CRITERIA` order.
+
+    Args:
+        weights (str or dict, optional): A `WEIGHT_PROFILES` name, or {criterion: weight}.
+            Defaults to `DEFAULT_PROFILE`. Weights need not sum to 100.
+
+    Returns:
+        numpy.ndarray: Weights summing to 1.
+
+    Raises:
+        ValueError: If the profile is unknown, a criterion is missing, or the weights are invalid.
+    """
+    weights = DEFAULT_PROFILE if weights is None else weights
+    if isinstance(weights, str):
+        if weights not in WEIGHT_PROFILES:
+            raise ValueError(f"Unknown weight profile '{weights}', expected one of {sorted(WEIGHT_PROFILES)}")
+        weights = WEIGHT_PROFILES[weights]
+
+    canonical = {canonical_criterion(name): value for name, value in weights.items()}
+    missing = [criterion for criterion in CRITERIA if criterion not in canonical]
+    if missing:
+        raise ValueError(f"Weights are missing criteria {missing}")
+
+    vector = np.array([canonical[criterion] for criterion in CRITERIA], dtype=float)
+    if (vector < 0).any() or vector.sum() <= 0:
+        raise ValueError("Weights must be non-negative and not all zero")
+    return vector / vector.sum()
+
+
+def parse_ratings(evaluation):
+    """
+    Reads per-criterion ratings from Bid Scoring Agent output.
+
+    Ratings may be given as a list of {"criterion", "score", "justification",
+    "compliance_flag"} entries or as a dict keyed by criterion name.
+
+    Args:
+        evaluation (dict or str): Agent JSON, or its raw response text.
+
+    Returns:
+        dict: The evaluation with "ratings" as {criterion: {"score", "justification",
+        "compliance_flag"}} over `CRITERIA`, or None if no JSON was found.
+    """
+    if not isinstance(evaluation, dict):
+        evaluation = extract_json_block(str(evaluation))
+        if evaluation is None:
+            return None
+
+    entries = _lookup(evaluation, "ratings", "categories", "category_scores", "scores", "criteria", default=[])
+    if isinstance(entries, dict):
+        entries = [dict(value, criterion=name) for name, value in entries.items() if isinstance(value, dict)]
+
+    ratings = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        criterion = canonical_criterion(_lookup(entry, "criterion", "category", "name", default=""))
+        if criterion is None:
+            continue
+        try:
+            score = float(_lookup(entry, "score", "rating"))
+        except (TypeError, ValueError):
+            score = None
+        ratings[criterion] = {
+            "score": score,
+            "justification": _lookup(entry, "justification", "rationale", "reasoning", default=""),
+            "compliance_flag": _lookup(entry, "compliance_flag", "compliance", default="None"),
+        }
+    return dict(evaluation, ratings=ratings)
+
+
+def rating_matrix(evaluations):
+    """
+    Builds the suppliers x criteria rating matrix.
+
+    Ratings are clipped to [SCORE_MIN, SCORE_MAX]. A missing or unreadable rating
+    stays NaN rather than becoming a score, see `final_scores`.
+
+    Args:
+        evaluations (list): Parsed evaluations, see `parse_ratings`.
+
+    Returns:
+        numpy.ndarray: Shape (len(evaluations), len(CRITERIA)).
+    """
+    matrix = np.full((len(evaluations), len(CRITERIA)), np.nan)
+    for row, evaluation in enumerate(evaluations):
+        for column, criterion in enumerate(CRITERIA):
+            score = evaluation["ratings"].get(criterion, {}).get("score")
+            if score is not None:
+                matrix[row, column] = score
+    return np.clip(matrix, SCORE_MIN, SCORE_MAX)
+
+
+def final_scores(ratings, weights):
+    """
+    Computes final scores as the weighted mean of each supplier's rated criteria.
+
+    Unrated (NaN) criteria are left out and the remaining weights rescaled, so a
+    failed extraction neither lowers nor raises a supplier's score. A supplier
+    without any rating gets NaN.
+
+    Args:
+        ratings (numpy.ndarray): Suppliers x criteria ratings, see `rating_matrix`.
+        weights (numpy.ndarray): One weight vector, or one per row, in `CRITERIA` order.
+
+    Returns:
+        numpy.ndarray: One score per supplier, or rows x suppliers for several weight vectors.
+    """
+    ratings = np.asarray(ratings, dtype=float)
+    rated = ~np.isnan(ratings)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (weights @ np.where(rated, ratings, 0.0).T) / (weights @ rated.T)
+
+
+def score_matrix(ratings, weights=None):
+    """
+    Computes weighted and final scores for every supplier at once.
+
+    Args:
+        ratings (numpy.ndarray): Suppliers x criteria ratings, see `rating_matrix`.
+        weights (str or dict, optional): Weight profile, see `weight_vector`.
+
+    Returns:
+        tuple: (weighted scores, suppliers x criteria, NaN where unrated; final scores,
+        one per supplier, see `final_scores`)
+    """
+    vector = weight_vector(weights)
+    return np.asarray(ratings, dtype=float) * vector, final_scores(ratings, vector)
+
+
+def rank_scores(final_scores):
+    """Returns 1-based ranks, highest score first; tied suppliers share a rank and unscored (NaN) ones come last."""
+    final_scores = np.nan_to_num(np.asarray(final_scores, dtype=float), nan=-np.inf)
+    return 1 + (final_scores[None, :] > final_scores[:, None]).sum(axis=1)
+
+
+def score_bids(evaluations, weights=None):
+    """
+    Scores parsed evaluations and fills in their weighted and final scores.
+
+    Args:
+        evaluations (list): Parsed evaluations, see `parse_ratings`.
+        weights (str or dict, optional): Weight profile, see `weight_vector`.
+
+    Returns:
+        list: Copies of the evaluations with "categories" (category, weight, score,
+        weighted_score, justification, compliance_flag), "final_score" and "rank",
+        ready for `render_bid_report`. Unrated criteria have a score of None and are
+        listed under "unrated"; the final score covers the rated criteria only.
+    """
+    if not evaluations:
+        return []
+    ratings = rating_matrix(evaluations)
+    weighted, final = score_matrix(ratings, weights)
+    ranks = rank_scores(final)
+    percents = weight_vector(weights) * 100
+
+    scored = []
+    for row, evaluation in enumerate(evaluations):
+        unrated = [criterion for column, criterion in enumerate(CRITERIA) if np.isnan(ratings[row, column])]
+        if unrated:
+            logger.warning("No usable rating for %s of %s; scored on the rated criteria only",
+                           ", ".join(unrated), evaluation.get("supplier") or f"supplier {row + 1}")
+        categories = [
+            {
+                "category": criterion,
+                "weight": round(float(percents[column]), 1),
+                "score": None if criterion in unrated else float(ratings[row, column]),
+                "weighted_score": None if criterion in unrated else round(float(weighted[row, column]), 3),
+                "justification": evaluation["ratings"].get(criterion, {}).get("justification", ""),
+                "compliance_flag": evaluation["ratings"].get(criterion, {}).get("compliance_flag", "None"),
+            }
+            for column, criterion in enumerate(CRITERIA)
+        ]
+        scored.append(dict(evaluation, categories=categories, unrated=unrated,
+                           final_score=None if np.isnan(final[row]) else round(float(final[row]), 3),
+                           rank=int(ranks[row])))
+    return scored
+
+
+def score_evaluation(response, weights=None):
+    """
+    Scores a single Bid Scoring Agent response.
+
+    Args:
+        response (str or dict): Agent response text or JSON.
+        weights (str or dict, optional): Weight profile, see `weight_vector`.
+
+    Returns:
+        dict: The scored evaluation, see `score_bids`. A response without JSON is
+        returned as {"observations": text} so it can still be reported.
+    """
+    evaluation = parse_ratings(response)
+    if evaluation is None:
+        return {"observations": str(response)}
+    return score_bids([evaluation], weights)[0]
@@ -0,0 +1,139 @@
+import os
+
+import numpy as np
+
+from .scoring import CRITERIA, DEFAULT_PROFILE, final_scores, rank_scores, rating_matrix, weight_vector
+
+
+# Number of sampled weight vectors
+SAMPLES = int(os.environ.get("BID_SENSITIVITY_SAMPLES", 5000))
+
+# Dirichlet concentration: higher values keep the samples closer to the profile weights
+CONCENTRATION = float(os.environ.get("BID_SENSITIVITY_CONCENTRATION", 50))
+
+# Relative change applied to one weight at a time for the tornado analysis
+TORNADO_SWING = 0.5
+
+
+def sample_weights(weights=None, samples=SAMPLES, concentration=CONCENTRATION, seed=0):
+    """
+    Samples weight vectors from a Dirichlet distribution centred on a weight profile.
+
+    Args:
+        weights (str or dict, optional): Weight profile, see `scoring.weight_vector`.
+        samples (int): Number of weight vectors.
+        concentration (float): Dirichlet concentration around the profile.
+        seed (int, optional): Random seed, so reports are reproducible.
+
+    Returns:
+        numpy.ndarray: Shape (samples, len(CRITERIA)); each row sums to 1.
+    """
+    alpha = np.maximum(weight_vector(weights) * concentration, 1e-3)
+    return np.random.default_rng(seed).dirichlet(alpha, size=samples)
+
+
+def _rank_matrix(final_scores):
+    """Ranks suppliers in every sample at once; final_scores is samples x suppliers, NaN ranks last."""
+    final_scores = np.nan_to_num(final_scores, nan=-np.inf)
+    return 1 + (final_scores[:, None, :] > final_scores[:, :, None]).sum(axis=2)
+
+
+def tornado(ratings, weights=None, swing=TORNADO_SWING):
+    """
+    Measures how much each criterion's weight moves the final scores.
+
+    Each weight is lowered and raised by `swing` (relative) in turn, with the other
+    weights rescaled so the total stays 100%.
+
+    Args:
+        ratings (numpy.ndarray): Suppliers x criteria ratings.
+        weights (str or dict, optional): Weight profile, see `scoring.weight_vector`.
+        swing (float): Relative weight change, e.g. 0.5 for -50% / +50%.
+
+    Returns:
+        list: One entry per criterion, largest influence first: {"criterion",
+        "low_weight", "high_weight", "low_scores", "high_scores", "swing"}, with
+        weights in percent and scores per supplier.
+    """
+    base = weight_vector(weights)
+    factors = np.ones((2 * len(CRITERIA), len(CRITERIA)))
+    for column in range(len(CRITERIA)):
+        factors[2 * column, column] = 1 - swing
+        factors[2 * column + 1, column] = 1 + swing
+    varied = base * factors
+    varied /= varied.sum(axis=1, keepdims=True)
+    finals = final_scores(ratings, varied)
+
+    entries = []
+    for column, criterion in enumerate(CRITERIA):
+        low, high = finals[2 * column], finals[2 * column + 1]
+        entries.append({
+            "criterion": criterion,
+            "low_weight": round(float(varied[2 * column, column]) * 100, 1),
+            "high_weight": round(float(varied[2 * column + 1, column]) * 100, 1),
+            "low_scores": [round(float(score), 3) for score in low],
+            "high_scores": [round(float(score), 3) for score in high],
+            "swing": round(float(np.nan_to_num(np.abs(high - low)).max()), 3),
+        })
+    return sorted(entries, key=lambda entry: -entry["swing"])
+
+
+def weight_sensitivity(evaluations, weights=None, samples=SAMPLES, concentration=CONCENTRATION, seed=0):
+    """
+    Runs a Monte Carlo weight-sensitivity analysis over scored suppliers.
+
+    Every supplier's final score is computed for all sampled weight vectors in one
+    matrix product, and the ranking is recomputed per sample.
+
+    Args:
+        evaluations (list): Parsed or scored evaluations, see `scoring.parse_ratings`.
+        weights (str or dict, optional): Weight profile the samples are centred on.
+        samples (int): Number of weight vectors.
+        concentration (float): Dirichlet concentration around the profile.
+        seed (int, optional): Random seed.
+
+    Returns:
+        dict: {"samples", "concentration", "profile": profile name, or "custom" for a
+        weight dict, "weights": {criterion: percent},
+        "rank_stability": share of samples that keep the base ranking,
+        "suppliers": {name: {"base_score", "base_rank", "win_probability",
+        "rank_probabilities", "score_p5", "score_p50", "score_p95"}},
+        "tornado": see `tornado`}
+    """
+    names = [evaluation.get("supplier") or f"Supplier {index + 1}" for index, evaluation in enumerate(evaluations)]
+    ratings = rating_matrix(evaluations)
+    base_scores = final_scores(ratings, weight_vector(weights))
+    base_ranks = rank_scores(base_scores)
+
+    sampled = sample_weights(weights, samples, concentration, seed)
+    finals = final_scores(ratings, sampled)
+    ranks = _rank_matrix(finals)
+    percentiles = np.percentile(finals, [5, 50, 95], axis=0)
+
+    suppliers = {}
+    for column, name in enumerate(names):
+        rank_counts = np.bincount(ranks[:, column], minlength=len(names) + 1)[1:] / samples
+        suppliers[name] = {
+            "base_score": round(float(base_scores[column]), 3),
+            "base_rank": int(base_ranks[column]),
+            "win_probability": round(float(rank_counts[0]), 4),
+            "rank_probabilities": {str(rank): round(float(p), 4) for rank, p in enumerate(rank_counts, start=1)},
+            "score_p5": round(float(percentiles[0, column]), 3),
+            "score_p50": round(float(percentiles[1, column]), 3),
+            "score_p95": round(float(percentiles[2, column]), 3),
+        }
+
+    entries = tornado(ratings, weights)
+    for entry in entries:
+        entry["low_scores"] = dict(zip(names, entry["low_scores"]))
+        entry["high_scores"] = dict(zip(names, entry["high_scores"]))
+
+    return {
+        "samples": samples,
+        "concentration": concentration,
+        "profile": "custom" if isinstance(weights, dict) else weights or DEFAULT_PROFILE,
+        "weights": {criterion: round(float(weight) * 100, 1) for criterion, weight in zip(CRITERIA, weight_vector(weights))},
+        "rank_stability": round(float((ranks == base_ranks).all(axis=1).mean()), 4),
+        "suppliers": suppliers,
+        "tornado": entries,
+    }
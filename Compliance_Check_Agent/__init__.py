@@ -1 +0,0 @@
-from .agent import compliance_checking_agent
\ No newline at end of file
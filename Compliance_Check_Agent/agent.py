@@ -1,29 +1,13 @@
-# Built-in libraries
-import os
-
 # Third-party libraries
-import boto3
-from strands import Agent
-from strands.models import BedrockModel
+from strands import tool
 from strands_tools import retrieve
 
-# Create a custom boto3 session
-session = boto3.Session(
-    aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
-    aws_session_token=os.environ.get('AWS_SESSION_TOKEN'),  
-    region_name=os.environ.get('AWS_REGION'),
-)
-
-# Create a Bedrock model instance
-bedrock_model = BedrockModel(
-    model_id="amazon.nova-pro-v1:0",   # Nova Pro
-    boto_session=session,
-)
- 
+# Local libraries
+from common_agents.factory import create_agent, deferred_agents
+from common_agents.retrieval import retrieve_local
 
 
-compliance_checking_agent = Agent(model=bedrock_model, tools=[retrieve], system_prompt="""
+SYSTEM_PROMPT = """
 Role:
 You are a Compliance Checking Agent responsible for validating supplier bids against ESG, GPP, CSRD, and internal procurement policies, and recommending optimized, low-carbon shipping scenarios.
 
@@ -68,9 +52,17 @@ Return a structured JSON including:
 - Any additional observations or risks identified
 
 Your output should be suitable for regulatory review, internal audit, and downstream scoring agents.
-""",
-callback_handler=None
-)
+"""
+
+
+def create_compliance_checking_agent(credentials=None):
+    """Creates a Compliance Checking Agent on the shared Bedrock client for the given credentials."""
+    return create_agent(SYSTEM_PROMPT, [retrieve, tool(retrieve_local)], credentials,
+                        name="compliance_checking_agent", callback_handler=None)
+
+
+# compliance_checking_agent is built on first access
+__getattr__ = deferred_agents(globals(), {"compliance_checking_agent": create_compliance_checking_agent})
 
 
  
\ No newline at end of file
@@ -0,0 +1,199 @@
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+
+REGISTRY_PATH = os.environ.get("SUPPLIER_REGISTRY_PATH", "Audit_files/supplier_registry.json")
+
+# Character n-gram size for fuzzy lookup, and the minimum Dice similarity for a fuzzy match;
+# one-character variants such as "Supplier3" for "Supplier1" stay below it
+NGRAM_SIZE = 3
+FUZZY_MIN_SIMILARITY = float(os.environ.get("SUPPLIER_FUZZY_MIN_SIMILARITY", 0.9))
+
+# Similarity a fuzzy match must have over the best name of any other supplier
+FUZZY_MIN_MARGIN = float(os.environ.get("SUPPLIER_FUZZY_MIN_MARGIN", 0.1))
+
+# Trailing words that do not distinguish suppliers ("Acme Ltd" and "ACME Limited" are the same supplier)
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "ltd", "limited", "llc", "llp", "plc", "gmbh", "ag", "sa", "sas", "bv", "nv",
+    "co", "corp", "corporation", "company", "pvt", "private", "pte", "srl", "spa", "oy", "ab",
+}
+
+# Trailing words naming the document rather than the supplier ("Supplier1_quote", "Vendus Enterprise QUOTE")
+DOCUMENT_WORDS = {
+    "quote", "quotation", "bid", "proposal", "tender", "offer", "invoice", "rfq", "rfp", "form", "audit",
+}
+
+_registry_cache = {}
+
+
+def normalize_name(name):
+    """
+    Normalizes a supplier name for lookup: accents, case, punctuation, trailing
+    legal suffixes and trailing document words are removed.
+
+    Args:
+        name (str): e.g. "Vendus Enterprise Pvt. Ltd."
+
+    Returns:
+        str: e.g. "vendus enterprise"
+    """
+    text = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii").lower()
+    words = re.findall(r"[a-z0-9]+", text.replace("&", " and "))
+    while len(words) > 1 and (words[-1] in LEGAL_SUFFIXES or words[-1] in DOCUMENT_WORDS):
+        words.pop()
+    return " ".join(words)
+
+
+def name_ngrams(normalized):
+    padded = f" {normalized} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def build_index(suppliers):
+    """
+    Indexes supplier records by normalized name and by name n-grams.
+
+    Args:
+        suppliers (list): Records with "id", "name" and optional "aliases",
+            "audit_file", "audit_form" and "approved".
+
+    Returns:
+        dict: {"suppliers": {id: record}, "names": {normalized name: id}, "keys": [normalized
+        names], "owners": supplier id per key, "grams": {n-gram: array of positions in "keys"},
+        "sizes": n-gram count per key}
+    """
+    records = {}
+    names = {}
+    keys = []
+    owners = []
+    grams = defaultdict(list)
+    sizes = []
+    for supplier in suppliers:
+        records[supplier["id"]] = supplier
+        for name in [supplier["name"], *supplier.get("aliases", [])]:
+            key = normalize_name(name)
+            # The first supplier to claim a name keeps it
+            if not key or key in names:
+                continue
+            names[key] = supplier["id"]
+            key_grams = name_ngrams(key)
+            for gram in key_grams:
+                grams[gram].append(len(keys))
+            keys.append(key)
+            owners.append(supplier["id"])
+            sizes.append(len(key_grams))
+    return {
+        "suppliers": records,
+        "names": names,
+        "keys": keys,
+        "owners": np.array(owners),
+        "grams": {gram: np.array(positions, dtype=np.int32) for gram, positions in grams.items()},
+        "sizes": np.array(sizes, dtype=np.float64),
+    }
+
+
+def load_registry(path=None):
+    """
+    Loads and indexes the supplier registry, reusing the index until the file changes.
+
+    Args:
+        path (str, optional): Registry JSON with a "suppliers" list. Defaults to `REGISTRY_PATH`.
+
+    Returns:
+        dict: The index, see `build_index`.
+    """
+    path = path or REGISTRY_PATH
+    mtime = os.path.getmtime(path)
+    cached = _registry_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = (mtime, build_index(json.load(f)["suppliers"]))
+        _registry_cache[path] = cached
+    return cached[1]
+
+
+def _match(registry, key, match, similarity):
+    supplier_id = registry["names"][key]
+    if match == "exact" and key != normalize_name(registry["suppliers"][supplier_id]["name"]):
+        match = "alias"
+    return {
+        "id": supplier_id,
+        "supplier": registry["suppliers"][supplier_id],
+        "matched_name": key,
+        "match": match,
+        "similarity": round(similarity, 3),
+    }
+
+
+def resolve_supplier(name, registry=None, min_similarity=FUZZY_MIN_SIMILARITY, min_margin=FUZZY_MIN_MARGIN):
+    """
+    Resolves a supplier name to its registry record.
+
+    An exact hit on the normalized name is a single dict lookup. Otherwise the
+    posting lists of the query's n-grams are counted in one `numpy.bincount`,
+    giving the shared n-grams and Dice similarity of every indexed name at once.
+    A fuzzy match must also beat every name of the other suppliers by `min_margin`;
+    a name close to two suppliers is ambiguous and resolves to nothing.
+
+    Args:
+        name (str): Supplier name as written in a bid or file name.
+        registry (dict, optional): Index from `load_registry`. Defaults to the registry file.
+        min_similarity (float): Minimum similarity for a fuzzy match.
+        min_margin (float): Minimum lead of a fuzzy match over the runner-up supplier.
+
+    Returns:
+        dict: {"id", "supplier", "matched_name", "match": "exact", "alias" or "fuzzy",
+        "similarity"}, or None if nothing matches or the match is ambiguous.
+    """
+    registry = registry or load_registry()
+    key = normalize_name(name)
+    if not key:
+        return None
+    if key in registry["names"]:
+        return _match(registry, key, "exact", 1.0)
+
+    query = name_ngrams(key)
+    postings = [registry["grams"][gram] for gram in query if gram in registry["grams"]]
+    if not postings:
+        return None
+    shared = np.bincount(np.concatenate(postings), minlength=len(registry["keys"]))
+    similarities = 2 * shared / (len(query) + registry["sizes"])
+    # Ties go to the name registered first
+    best = int(similarities.argmax())
+    if similarities[best] < min_similarity:
+        return None
+    others = similarities[registry["owners"] != registry["owners"][best]]
+    if others.size and similarities[best] - others.max() < min_margin:
+        return None
+    return _match(registry, registry["keys"][best], "fuzzy", float(similarities[best]))
+
+
+def identify_supplier(texts, registry=None, min_similarity=FUZZY_MIN_SIMILARITY, min_margin=FUZZY_MIN_MARGIN):
+    """
+    Finds the supplier best matching any of several candidate texts.
+
+    Args:
+        texts (list): Candidate names, e.g. the file name and the bid's header lines.
+        registry (dict, optional): Index from `load_registry`.
+        min_similarity (float): Minimum similarity for a fuzzy match.
+        min_margin (float): Minimum lead of the best match over a match to another supplier.
+
+    Returns:
+        dict: The best match, see `resolve_supplier`, or None if nothing matches or the
+        texts point to different suppliers with no clear winner.
+    """
+    registry = registry or load_registry()
+    matches = [match for match in (resolve_supplier(text, registry, min_similarity, min_margin) for text in texts)
+               if match]
+    if not matches:
+        return None
+    best = max(matches, key=lambda match: match["similarity"])
+    if any(match["id"] != best["id"] and best["similarity"] - match["similarity"] < min_margin
+           for match in matches):
+        return None
+    return best
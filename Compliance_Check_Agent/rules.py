@@ -0,0 +1,397 @@
+import re
+from datetime import datetime
+
+
+PASS = "Pass"
+FAIL = "Fail"
+UNDECIDED = "Undecided"
+
+# Policy thresholds from the compliance agent's checks
+CO2_LIMIT_KG_PER_100_UNITS = 15
+CIRCULARITY_MIN = 7
+DELIVERY_MAX_DAYS = 10
+
+NEGATIVE_PATTERN = re.compile(
+    r"\b(no|not|none|missing|absent|expired|pending|revoked|suspended|n/?a|non[- ]?compliant|false|unapproved)\b",
+    re.IGNORECASE)
+POSITIVE_PATTERN = re.compile(
+    r"\b(yes|present|certified|certificate|valid|compliant|approved|documented|demonstrated|true|available|attached|verified)\b",
+    re.IGNORECASE)
+
+GPP_PATTERN = re.compile(r"\bGPP\b|green public procurement", re.IGNORECASE)
+ESG_PATTERN = re.compile(r"\bESG\b|environmental,? social,? (and )?governance|\bCSRD\b|sustainability report", re.IGNORECASE)
+CO2_PATTERN = re.compile(r"\bCO\s?[2₂]e?\b|carbon|greenhouse|\bGHG\b", re.IGNORECASE)
+CIRCULARITY_PATTERN = re.compile(r"circularity", re.IGNORECASE)
+APPROVED_PATTERN = re.compile(r"(approved|preferred) (supplier|vendor)|supplier status|vendor status", re.IGNORECASE)
+DELIVERY_PATTERN = re.compile(r"deliver\w*|lead[- ]?time|dispatch\w*|ship\w* within", re.IGNORECASE)
+DELIVERY_QUESTION_PATTERN = re.compile(r"(deliver\w*|lead[- ]?time)\b.{0,40}\bwithin\b|deliver\w* (time|timeline|schedule)",
+                                       re.IGNORECASE)
+REFERENCE_DATE_PATTERN = re.compile(r"\b(DATE|order date|quote date|issued)\b", re.IGNORECASE)
+
+# Audit forms ask each check as a question followed by its Yes / No / N/A answer
+FORM_HEADER_PATTERN = re.compile(r"\bYes\s+No\b", re.IGNORECASE)
+FORM_ANSWER_PATTERN = re.compile(r"^\W*(?P<answer>yes|no|n/?a)\b", re.IGNORECASE)
+
+# A number with thousands groups ("1,200.5") or one decimal point or comma ("12,5"); digits
+# that run on into further separators, as in "1,2,3" or "12/05", are not a number
+NUMBER = r"(?<![\d.,])(?:\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:[.,]\d+)?)(?![.,]?\d)"
+
+# Mass units in kilograms
+MASS_UNITS = {"g": 0.001, "gram": 0.001, "kg": 1, "kilogram": 1, "t": 1000, "tonne": 1000, "ton": 1000,
+              "lb": 0.4536, "pound": 0.4536}
+CO2_QUANTITY_PATTERN = re.compile(
+    rf"(?P<value>{NUMBER})\s*(?P<unit>kilograms?|kg|grams?|g|tonnes?|tons?|t|lbs?|pounds?)\b\s*(?:of\s*)?(?:co\s?[2₂]e?)?\s*"
+    rf"(?:per|/|for(?: every)?)\s*(?P<basis>{NUMBER})?\s*(?:units?|pcs|pieces|items?)\b",
+    re.IGNORECASE)
+MASS_PATTERN = re.compile(rf"{NUMBER}\s*(kilograms?|kg|grams?|g|tonnes?|tons?|t|lbs?|pounds?)\b", re.IGNORECASE)
+
+# The score must follow the label, with only label words, punctuation or a parenthetical such as
+# "(ISO 59020)" in between; a score running on into a date or range is not read
+CIRCULARITY_SCORE_PATTERN = re.compile(
+    r"circularity(?:\s*(?:\([^)]*\)|[;:=\-]|\b(?:score|index|rating|value|level|is|of)\b)){0,5}\s*"
+    rf"(?P<value>{NUMBER})\s*(?:(?P<percent>%)|(?:/|out of)\s*(?P<scale>{NUMBER}))?(?![/.\-]?\d)",
+    re.IGNORECASE)
+
+# Duration units in calendar days; business days are converted at 7 calendar days per 5
+DURATION_UNITS = {"day": 1, "business day": 7 / 5, "working day": 7 / 5, "week": 7, "wk": 7, "month": 30,
+                  "hour": 1 / 24, "hr": 1 / 24}
+DURATION = (rf"(?P<low>{NUMBER})(?:\s*(?:-|–|to)\s*(?P<high>{NUMBER}))?\s*"
+            r"(?P<unit>business days?|working days?|days?|weeks?|wks?|months?|hours?|hrs?)\b")
+DURATION_PATTERN = re.compile(DURATION, re.IGNORECASE)
+DATE = r"\b(\d{1,2}/\d{1,2}/\d{4}|\d{4}-\d{2}-\d{2}|\d{1,2}\.\d{1,2}\.\d{4}|\d{1,2} [A-Za-z]+ \d{4}|[A-Za-z]+ \d{1,2},? \d{4})\b"
+DATE_PATTERN = re.compile(DATE)
+
+# A delivery or lead-time phrase followed within a few words by its duration or date, as in
+# "Delivery within 5 business days" or "Lead time: 2-3 weeks"; other wording in between, such
+# as "Delivery terms: Net 30 days" or "Delivery address: ...", does not bind the number
+DELIVERY_LEAD_IN = (
+    r"\b(?:deliver(?:y|ies|ed|s)?|lead[- ]?times?|dispatch(?:ed|es)?|ship(?:s|ped|ping|ment)?)"
+    r"(?:\s*(?:[;:=\-]|\b(?:time|times|period|schedule|timeline|date|is|are|will|be|of|in|within|by|on|"
+    r"approx|approximately|estimated|expected|guaranteed|about|up to)\b\.?)){0,6}\s*")
+DELIVERY_DURATION_PATTERN = re.compile(DELIVERY_LEAD_IN + DURATION, re.IGNORECASE)
+DELIVERY_DATE_PATTERN = re.compile(DELIVERY_LEAD_IN + DATE, re.IGNORECASE)
+DATE_FORMATS = ["%m/%d/%Y", "%Y-%m-%d", "%d.%m.%Y", "%d %B %Y", "%d %b %Y", "%B %d, %Y", "%B %d %Y", "%b %d, %Y", "%b %d %Y"]
+
+
+def parse_number(text):
+    """Parses "1,200.5" (thousands separators) or "12,5" (decimal comma) to a float, or returns None."""
+    text = text.strip()
+    if re.fullmatch(r"\d{1,3}(,\d{3})+(\.\d+)?", text):
+        text = text.replace(",", "")
+    else:
+        text = text.replace(",", ".")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_date(text):
+    """Parses a date in one of `DATE_FORMATS`, US month/day order first, or returns None."""
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), date_format).date()
+        except ValueError:
+            pass
+    return None
+
+
+def _table_rows(tables):
+    """Yields table rows as dicts from either the row or the columnar table form."""
+    for table in tables:
+        if isinstance(table, dict) and "headers" in table and "columns" in table:
+            for cells in zip(*table["columns"]):
+                yield dict(zip(table["headers"], cells))
+        elif isinstance(table, dict):
+            yield table
+
+
+def iter_facts(document, source=None):
+    """
+    Flattens an extraction into text facts with pointers to where they came from.
+
+    Args:
+        document (dict): Extraction result from `extract_pdf_to_json`.
+        source (str, optional): Document label added to the pointers, e.g. an audit file.
+
+    Yields:
+        tuple: (text, pointer), where pointer is {"section", "field", and "key", "index"
+        or "row"}, plus "source" when given.
+    """
+    origin = {"source": source} if source else {}
+    for section, data in document.items():
+        if not isinstance(data, dict):
+            continue
+        for key, value in data.get("key_values", {}).items():
+            yield f"{key}: {value}", {**origin, "section": section, "field": "key_values", "key": key}
+        for index, paragraph in enumerate(data.get("paragraphs", [])):
+            yield str(paragraph), {**origin, "section": section, "field": "paragraphs", "index": index}
+        for index, row in enumerate(_table_rows(data.get("tables", []))):
+            text = "; ".join(f"{key}: {value}" for key, value in row.items() if value not in (None, ""))
+            yield text, {**origin, "section": section, "field": "tables", "row": index}
+
+
+def _result(criterion, status, reasoning, evidence=None, pointer=None, value=None):
+    return {
+        "criterion": criterion,
+        "status": status,
+        "value": value,
+        "evidence": evidence,
+        "pointer": pointer,
+        "reasoning": reasoning,
+    }
+
+
+def _form_finding(criterion, pattern, text, pointer):
+    """
+    Reads an audit form question such as "Is the supplier GPP certified? Yes".
+
+    The questions are phrased so that "Yes" means the criterion is met, so the
+    answer decides the criterion and any threshold in the question text is ignored.
+    Returns None if the question itself (without a table column or key prefix)
+    does not match `pattern`.
+    """
+    question = text[:text.rindex("?")].split(": ")[-1]
+    if not pattern.search(question):
+        return None
+    match = FORM_ANSWER_PATTERN.search(text[text.rindex("?") + 1:])
+    answer = match.group("answer").lower() if match else None
+    if answer == "yes":
+        return _result(criterion, PASS, "The audit form answers yes", text, pointer, True)
+    if answer == "no":
+        return _result(criterion, FAIL, "The audit form answers no", text, pointer, False)
+    return _result(criterion, UNDECIDED, "The audit form question is unanswered or not applicable", text, pointer)
+
+
+def _combine(criterion, findings, missing_reason):
+    """
+    Reduces the findings for one criterion to a single result.
+
+    Findings that agree decide the criterion; conflicting findings are left
+    undecided, as are criteria with only inconclusive mentions or no evidence.
+    """
+    decided = [finding for finding in findings if finding["status"] != UNDECIDED]
+    if decided and len({finding["status"] for finding in decided}) == 1:
+        return decided[0]
+    if decided:
+        evidence = " | ".join(finding["evidence"] for finding in decided)
+        return _result(criterion, UNDECIDED, "Conflicting evidence in the document", evidence,
+                       [finding["pointer"] for finding in decided])
+    if findings:
+        return findings[0]
+    return _result(criterion, UNDECIDED, missing_reason)
+
+
+def _status_rule(criterion, pattern, facts, noun):
+    """Decides a present / not-present criterion from yes/no wording after the keyword."""
+    findings = []
+    for text, pointer in facts:
+        match = pattern.search(text)
+        if not match or FORM_HEADER_PATTERN.search(text):
+            continue
+        if "?" in text:
+            finding = _form_finding(criterion, pattern, text, pointer)
+            if finding:
+                findings.append(finding)
+            continue
+        remainder = text[match.end():]
+        if NEGATIVE_PATTERN.search(remainder) or NEGATIVE_PATTERN.search(text[:match.start()][-12:]):
+            findings.append(_result(criterion, FAIL, f"The document states that {noun} is not in place", text, pointer, False))
+        elif POSITIVE_PATTERN.search(text):
+            findings.append(_result(criterion, PASS, f"The document states that {noun} is in place", text, pointer, True))
+        else:
+            findings.append(_result(criterion, UNDECIDED, f"{noun.capitalize()} is mentioned without a clear status",
+                                    text, pointer))
+    return _combine(criterion, findings, f"No mention of {noun} in the document")
+
+
+def check_gpp(facts):
+    return _status_rule("GPP Certification", GPP_PATTERN, facts, "GPP certification")
+
+
+def check_esg(facts):
+    return _status_rule("ESG Compliance", ESG_PATTERN, facts, "ESG documentation")
+
+
+def check_approved_supplier(facts):
+    return _status_rule("Approved Supplier", APPROVED_PATTERN, facts, "approved supplier status")
+
+
+def check_registry_approval(match):
+    """
+    Decides the approved-supplier criterion from a supplier registry match, see `registry.resolve_supplier`.
+
+    Only an exact or alias match decides it; a fuzzy match may name another supplier,
+    so the criterion is left Undecided for the agent or a reviewer.
+    """
+    supplier = match["supplier"]
+    if match["match"] not in ("exact", "alias"):
+        return _result(
+            "Approved Supplier", UNDECIDED,
+            f"The bid only resembles the registered supplier {supplier['name']}, so its approval is not assumed",
+            f"{match['id']}: {supplier['name']} ({match['match']} match on '{match['matched_name']}', "
+            f"similarity {match['similarity']})",
+            {"source": "supplier_registry", "id": match["id"]})
+    approved = bool(supplier.get("approved"))
+    return _result(
+        "Approved Supplier", PASS if approved else FAIL,
+        f"The supplier registry lists {supplier['name']} as {'approved' if approved else 'not approved'}",
+        f"{match['id']}: {supplier['name']} ({match['match']} match on '{match['matched_name']}')",
+        {"source": "supplier_registry", "id": match["id"]}, approved)
+
+
+def check_co2(facts):
+    """CO₂ emissions must be below `CO2_LIMIT_KG_PER_100_UNITS`, after normalizing mass units and the per-unit basis."""
+    criterion = "CO₂ Emissions"
+    findings = []
+    for text, pointer in facts:
+        if not CO2_PATTERN.search(text) or FORM_HEADER_PATTERN.search(text):
+            continue
+        if "?" in text:
+            finding = _form_finding(criterion, CO2_PATTERN, text, pointer)
+            if finding:
+                findings.append(finding)
+            continue
+        match = CO2_QUANTITY_PATTERN.search(text)
+        if match:
+            unit = match.group("unit").lower().rstrip("s")
+            unit = "t" if unit in ("t", "tonne", "ton") else unit
+            basis = parse_number(match.group("basis")) if match.group("basis") else 1
+            value = parse_number(match.group("value"))
+            if value is None or not basis:
+                findings.append(_result(criterion, UNDECIDED, "The emissions figure could not be read", text, pointer))
+                continue
+            value = value * MASS_UNITS[unit] * 100 / basis
+            status = PASS if value < CO2_LIMIT_KG_PER_100_UNITS else FAIL
+            findings.append(_result(
+                criterion, status,
+                f"{value:g} kg CO₂ per 100 units (limit: below {CO2_LIMIT_KG_PER_100_UNITS} kg)",
+                text, pointer, round(value, 3)))
+        elif MASS_PATTERN.search(text):
+            findings.append(_result(criterion, UNDECIDED, "Emissions are stated without a per-unit basis", text, pointer))
+    return _combine(criterion, findings, "No CO₂ emissions figure in the document")
+
+
+def check_circularity(facts):
+    """The circularity score must be at least `CIRCULARITY_MIN` on a 10-point scale; x/N and percentages are rescaled."""
+    criterion = "Circularity Score"
+    findings = []
+    for text, pointer in facts:
+        match = CIRCULARITY_PATTERN.search(text)
+        if not match or FORM_HEADER_PATTERN.search(text):
+            continue
+        if "?" in text:
+            finding = _form_finding(criterion, CIRCULARITY_PATTERN, text, pointer)
+            if finding:
+                findings.append(finding)
+            continue
+        score = CIRCULARITY_SCORE_PATTERN.search(text, match.start())
+        value = parse_number(score.group("value")) if score else None
+        scale = parse_number(score.group("scale")) if score and score.group("scale") else 10
+        if value is None or not scale:
+            findings.append(_result(criterion, UNDECIDED, "Circularity is mentioned without a score", text, pointer))
+            continue
+        if score.group("percent"):
+            value /= 10
+        else:
+            value = value * 10 / scale
+        status = PASS if value >= CIRCULARITY_MIN else FAIL
+        findings.append(_result(criterion, status, f"Circularity score {value:g}/10 (required: at least {CIRCULARITY_MIN})",
+                                text, pointer, round(value, 2)))
+    return _combine(criterion, findings, "No circularity score in the document")
+
+
+def _reference_date(facts):
+    """Finds the quote or order date that delivery dates are counted from."""
+    for text, _ in facts:
+        match = REFERENCE_DATE_PATTERN.search(text)
+        if match:
+            date = DATE_PATTERN.search(text, match.end())
+            if date and parse_date(date.group(1)):
+                return parse_date(date.group(1))
+    return None
+
+
+def check_delivery(facts):
+    """
+    Delivery must be within `DELIVERY_MAX_DAYS` calendar days.
+
+    Durations are converted to calendar days (ranges use their upper bound); a
+    delivery date is counted from the quote or order date. Only a duration or date
+    that directly follows delivery or lead-time wording is read, see `DELIVERY_LEAD_IN`.
+    """
+    criterion = "Delivery Time"
+    findings = []
+    reference = None
+    for text, pointer in facts:
+        match = DELIVERY_PATTERN.search(text)
+        if not match or FORM_HEADER_PATTERN.search(text):
+            continue
+        if "?" in text:
+            finding = _form_finding(criterion, DELIVERY_QUESTION_PATTERN, text, pointer)
+            if finding:
+                findings.append(finding)
+            continue
+        duration = DELIVERY_DURATION_PATTERN.search(text, match.start())
+        date = DELIVERY_DATE_PATTERN.search(text, match.start())
+        if duration:
+            unit = duration.group("unit").lower()
+            unit = next(name for name in sorted(DURATION_UNITS, key=len, reverse=True) if unit.startswith(name))
+            value = parse_number(duration.group("high") or duration.group("low"))
+            if value is None:
+                findings.append(_result(criterion, UNDECIDED, "The delivery time could not be read", text, pointer))
+                continue
+            value *= DURATION_UNITS[unit]
+        elif date and parse_date(date.group(1)):
+            reference = reference or _reference_date(facts)
+            if reference is None:
+                findings.append(_result(criterion, UNDECIDED, "Delivery date given without a quote or order date",
+                                        text, pointer))
+                continue
+            value = (parse_date(date.group(1)) - reference).days
+        elif DURATION_PATTERN.search(text, match.start()):
+            findings.append(_result(criterion, UNDECIDED, "A duration is stated, but not as the delivery time",
+                                    text, pointer))
+            continue
+        else:
+            continue
+        status = PASS if value <= DELIVERY_MAX_DAYS else FAIL
+        findings.append(_result(criterion, status, f"Delivery in {value:g} days (limit: {DELIVERY_MAX_DAYS} days)",
+                                text, pointer, round(value, 1)))
+    return _combine(criterion, findings, "No delivery time in the document")
+
+
+RULES = [check_gpp, check_esg, check_co2, check_circularity, check_approved_supplier, check_delivery]
+
+
+def evaluate_compliance(document, supporting=None, supplier=None):
+    """
+    Evaluates the mechanical compliance criteria directly against an extraction.
+
+    Each criterion is Pass or Fail with a pointer to the evidence it was decided
+    on, or Undecided when the documents have no usable evidence or contradict
+    each other; only the undecided criteria need the compliance agent. The result
+    is the same on every run.
+
+    Args:
+        document (dict): Extraction result from `extract_pdf_to_json`.
+        supporting (dict, optional): {label: extraction} of further evidence, such as
+            the supplier's audit form.
+        supplier (dict, optional): Supplier registry match; when given, the registry
+            decides the approved-supplier criterion.
+
+    Returns:
+        dict: {"results": [{"criterion", "status", "value", "evidence", "pointer",
+        "reasoning"}], "undecided": [criterion names]}
+    """
+    facts = list(iter_facts(document))
+    for source, extraction in (supporting or {}).items():
+        facts.extend(iter_facts(extraction, source))
+    results = [rule(facts) for rule in RULES]
+    if supplier is not None:
+        results = [check_registry_approval(supplier) if result["criterion"] == "Approved Supplier" else result
+                   for result in results]
+    return {
+        "results": results,
+        "undecided": [result["criterion"] for result in results if result["status"] == UNDECIDED],
+    }
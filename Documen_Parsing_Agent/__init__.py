@@ -1 +0,0 @@
-from .agent import doc_agent
\ No newline at end of file
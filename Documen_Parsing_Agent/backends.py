@@ -0,0 +1,216 @@
+import hashlib
+import os
+import re
+
+# fitz and pdfplumber are imported inside the functions that use them, so the
+# app can import the extractor without paying for either library at start-up
+
+
+# Backend used when a call does not choose one
+DEFAULT_BACKEND = os.environ.get("PDF_BACKEND", "pdfplumber")
+
+# Vertical distance (in points) within which PyMuPDF lines are merged into one text line,
+# mirroring pdfplumber's default y_tolerance
+LINE_Y_TOLERANCE = 3
+
+# Words that mark a page as part of a pricing schedule
+PRICING_PATTERN = re.compile(r"\b(unit price|price|amount|subtotal|total|qty|quantity|cost)\b", re.IGNORECASE)
+
+
+def _pdfplumber_page(page):
+    """
+    Extracts the raw content of a single pdfplumber page.
+
+    The page text is extracted only once and the page's object cache is released
+    afterwards, so memory does not accumulate across the document. Table extraction
+    only runs on pages that have ruling lines, rects or curves: pdfplumber's default
+    "lines" table strategy builds tables from those edges, so other pages cannot
+    yield any table.
+
+    Returns:
+        dict: {"page": page number, "lines": text lines, "tables": raw tables,
+        "table_scan": whether table extraction ran}
+    """
+    text = page.extract_text()
+    table_scan = bool(page.lines or page.rects or page.curves)
+    content = {
+        "page": page.page_number,
+        "lines": text.split('\n') if text else [],
+        "tables": page.extract_tables() if table_scan else [],
+        "table_scan": table_scan,
+    }
+    page.close()
+    return content
+
+
+def pdfplumber_page_count(pdf_path):
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def pdfplumber_pages(pdf_path, start=0, stop=None):
+    """
+    Yields the raw content of pages [start, stop) using pdfplumber.
+
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        start (int): Index of the first page.
+        stop (int, optional): Index after the last page. Defaults to the end of the document.
+
+    Yields:
+        dict: Page content as returned by `_pdfplumber_page`.
+    """
+    if start == 0 and stop is None:
+        pages = None
+    else:
+        stop = pdfplumber_page_count(pdf_path) if stop is None else stop
+        pages = range(start + 1, stop + 1)
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path, pages=pages) as pdf:
+        for page in pdf.pages:
+            yield _pdfplumber_page(page)
+
+
+def _pymupdf_lines(page):
+    """
+    Rebuilds pdfplumber-style text lines from PyMuPDF's text dictionary.
+
+    PyMuPDF reports lines per text block, so spans from different columns that sit
+    on the same baseline are merged into one line and ordered left to right.
+    """
+    spans = []
+    for block in page.get_text("dict")["blocks"]:
+        for line in block.get("lines", []):
+            for span in line["spans"]:
+                if span["text"].strip():
+                    spans.append((span["bbox"][3], span["bbox"][0], span["text"].strip()))
+
+    rows = []
+    for bottom, x0, text in sorted(spans):
+        if rows and bottom - rows[-1][0] <= LINE_Y_TOLERANCE:
+            rows[-1][1].append((x0, text))
+        else:
+            rows.append((bottom, [(x0, text)]))
+    return [" ".join(text for _, text in sorted(row)) for _, row in rows]
+
+
+def pymupdf_page_count(pdf_path):
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def pymupdf_pages(pdf_path, start=0, stop=None):
+    """
+    Yields the raw content of pages [start, stop) using PyMuPDF.
+
+    Lines come from `page.get_text("dict")` and tables from `page.find_tables()`,
+    producing the same page content structure as `pdfplumber_pages`. As with
+    pdfplumber, table detection is skipped on pages without vector drawings.
+
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        start (int): Index of the first page.
+        stop (int, optional): Index after the last page. Defaults to the end of the document.
+
+    Yields:
+        dict: {"page": page number, "lines": text lines, "tables": raw tables,
+        "table_scan": whether table detection ran}
+    """
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        stop = doc.page_count if stop is None else stop
+        for index in range(start, stop):
+            page = doc[index]
+            table_scan = bool(page.get_drawings())
+            yield {
+                "page": index + 1,
+                "lines": _pymupdf_lines(page),
+                "tables": [table.extract() for table in page.find_tables().tables] if table_scan else [],
+                "table_scan": table_scan,
+            }
+
+
+def find_pricing_pages(pdf_path, indices):
+    """
+    Finds pages that look like pricing schedules, using a cheap PyMuPDF pass.
+
+    A page qualifies when it has vector drawings (table rulings) and its text
+    mentions at least two distinct pricing words such as "unit price" and "total".
+
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        indices (list): 0-based page indices to check.
+
+    Returns:
+        list: The indices of the pricing pages, in the given order.
+    """
+    import fitz
+
+    pricing_pages = []
+    with fitz.open(pdf_path) as doc:
+        for index in indices:
+            page = doc[index]
+            if not page.get_drawings():
+                continue
+            words = {match.lower() for match in PRICING_PATTERN.findall(page.get_text())}
+            if len(words) >= 2:
+                pricing_pages.append(index)
+    return pricing_pages
+
+
+def page_fingerprints(pdf_path, indices=None):
+    """
+    Fingerprints pages by hashing their content streams.
+
+    The hash covers the page size, the page's content stream and the streams of the
+    XObjects it draws, so an unchanged page keeps its fingerprint when other pages
+    of a revised PDF are edited, inserted or removed.
+
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        indices (list, optional): 0-based page indices. Defaults to every page.
+
+    Returns:
+        list: Hex digests in the order of `indices`.
+    """
+    import fitz
+
+    fingerprints = []
+    with fitz.open(pdf_path) as doc:
+        indices = range(doc.page_count) if indices is None else indices
+        for index in indices:
+            page = doc[index]
+            digest = hashlib.sha256(repr(tuple(page.rect)).encode("utf-8"))
+            digest.update(page.read_contents())
+            for xref, *_ in page.get_xobjects():
+                digest.update(doc.xref_stream(xref) or b"")
+            fingerprints.append(digest.hexdigest())
+    return fingerprints
+
+
+BACKENDS = {
+    "pdfplumber": {"page_count": pdfplumber_page_count, "pages": pdfplumber_pages},
+    "pymupdf": {"page_count": pymupdf_page_count, "pages": pymupdf_pages},
+}
+
+
+def get_backend(name=None):
+    """
+    Returns the page_count/pages functions of an extraction backend.
+
+    Args:
+        name (str, optional): "pdfplumber" or "pymupdf". Defaults to `DEFAULT_BACKEND`.
+
+    Returns:
+        dict: {"page_count": callable, "pages": callable}
+    """
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]
@@ -0,0 +1,177 @@
+"""
+Headless batch extraction of a directory of PDFs.
+
+Usage:
+    python -m Documen_Parsing_Agent.batch sample_files --output parsed --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from .backends import get_backend
+from .doc_tool import extract_pdf_to_json
+
+
+# Times a document may lose its worker in the shared pool before it is retried alone,
+# where a crash can only be its own
+POOL_ATTEMPTS = 2
+
+
+def find_pdfs(directory, recursive=False):
+    """
+    Lists the PDF files in a directory.
+
+    Args:
+        directory (str): Directory to scan.
+        recursive (bool): Whether to include subdirectories.
+
+    Returns:
+        list: Sorted PDF paths.
+    """
+    pdfs = []
+    for root, dirs, files in os.walk(directory):
+        pdfs.extend(os.path.join(root, name) for name in files if name.lower().endswith(".pdf"))
+        if not recursive:
+            break
+    return sorted(pdfs)
+
+
+def _extract_file(pdf_path, output_path, options):
+    """Extracts one PDF in a worker process and returns its index record."""
+    record = {"file": pdf_path, "output": output_path, "bytes": os.path.getsize(pdf_path)}
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        record["pages"] = get_backend(options.get("backend"))["page_count"](pdf_path)
+        result = extract_pdf_to_json(pdf_path=pdf_path, output_path=output_path, workers=1, **options)
+        record["sections"] = len(result)
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def _run_pool(jobs, workers, on_record):
+    """
+    Extracts jobs in one process pool, passing each record to `on_record`.
+
+    Returns:
+        list: The jobs whose worker died, e.g. from a crash in a PDF library, which
+        breaks the pool for every job still running in it.
+    """
+    lost = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_extract_file, *job): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except BrokenProcessPool:
+                lost.append(futures[future])
+                continue
+            on_record(record)
+    return lost
+
+
+def extract_directory(directory, output_dir=None, workers=None, recursive=False, **options):
+    """
+    Extracts every PDF in a directory with a process pool and writes an index file.
+
+    Each PDF is written to `<output_dir>/<relative path>.json`, and `index.json` in
+    the output directory lists every file with its page count, timing and status.
+    A failing file is recorded in the index and does not stop the batch. If a worker
+    process dies, the documents it took down with it are resubmitted to a new pool;
+    one that keeps losing its worker is retried alone and recorded as failed if it
+    crashes there too.
+
+    Args:
+        directory (str): Directory containing the PDFs.
+        output_dir (str, optional): Where to write the outputs. Defaults to `<directory>/parsed`.
+        workers (int, optional): Number of worker processes. Defaults to the CPU count.
+        recursive (bool): Whether to include subdirectories.
+        **options: Further `extract_pdf_to_json` options (backend, table_format, ...).
+
+    Returns:
+        dict: The index, with per-file records and totals including pages/sec and MB/sec.
+    """
+    output_dir = output_dir or os.path.join(directory, "parsed")
+    pdfs = find_pdfs(directory, recursive)
+    records = []
+    start = time.perf_counter()
+
+    def report(record):
+        records.append(record)
+        if record["status"] == "ok":
+            print(f"[{len(records)}/{len(pdfs)}] {record['file']}: {record['pages']} pages in {record['seconds']}s")
+        else:
+            print(f"[{len(records)}/{len(pdfs)}] {record['file']}: FAILED ({record['error']})")
+
+    jobs = [
+        (pdf_path, os.path.join(output_dir, os.path.splitext(os.path.relpath(pdf_path, directory))[0] + ".json"),
+         options)
+        for pdf_path in pdfs
+    ]
+    attempts = dict.fromkeys(pdfs, 0)
+    while jobs:
+        lost = _run_pool(jobs, workers or os.cpu_count() or 1, report)
+        jobs = []
+        for job in lost:
+            attempts[job[0]] += 1
+            if attempts[job[0]] < POOL_ATTEMPTS:
+                jobs.append(job)
+            elif _run_pool([job], 1, report):
+                report({"file": job[0], "output": job[1], "bytes": os.path.getsize(job[0]), "status": "failed",
+                        "error": "BrokenProcessPool: the worker process died while extracting this file",
+                        "seconds": None})
+
+    elapsed = time.perf_counter() - start
+    extracted = [record for record in records if record["status"] == "ok"]
+    pages = sum(record["pages"] for record in extracted)
+    megabytes = sum(record["bytes"] for record in extracted) / (1024 * 1024)
+    index = {
+        "directory": directory,
+        "files": sorted(records, key=lambda record: record["file"]),
+        "totals": {
+            "files": len(records),
+            "failed": len(records) - len(extracted),
+            "pages": pages,
+            "seconds": round(elapsed, 3),
+            "pages_per_second": round(pages / elapsed, 2) if elapsed else None,
+            "mb_per_second": round(megabytes / elapsed, 3) if elapsed else None,
+        },
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract every PDF in a directory to structured JSON.")
+    parser.add_argument("directory", help="Directory containing the PDFs")
+    parser.add_argument("--output", help="Output directory (default: <directory>/parsed)")
+    parser.add_argument("--workers", type=int, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--recursive", action="store_true", help="Include subdirectories")
+    parser.add_argument("--backend", choices=["pdfplumber", "pymupdf"], help="Extraction backend")
+    parser.add_argument("--table-format", choices=["rows", "columns"], default="rows", help="Table representation")
+    parser.add_argument("--strip-boilerplate", action="store_true", help="Remove repeated page headers and footers")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the extraction cache")
+    args = parser.parse_args()
+
+    index = extract_directory(args.directory, args.output, workers=args.workers, recursive=args.recursive,
+                              backend=args.backend, table_format=args.table_format,
+                              strip_boilerplate=args.strip_boilerplate, use_cache=not args.no_cache)
+    totals = index["totals"]
+    print(f"Extracted {totals['files'] - totals['failed']}/{totals['files']} files, {totals['pages']} pages "
+          f"in {totals['seconds']}s ({totals['pages_per_second']} pages/s, {totals['mb_per_second']} MB/s)")
+    if totals["failed"]:
+        print(f"{totals['failed']} file(s) failed, see index.json")
+
+
+if __name__ == "__main__":
+    main()
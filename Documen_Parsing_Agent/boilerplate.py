@@ -0,0 +1,114 @@
+import itertools
+import json
+import re
+
+from common_agents.tokens import estimate_tokens
+
+
+# Lines inspected at the top and at the bottom of each page
+EDGE_LINES = 3
+
+# Pages buffered at the start of a document to learn its repeated lines
+SAMPLE_PAGES = 12
+
+# A line is boilerplate when it repeats at the same position on this share of the
+# sampled pages, and on at least MIN_REPEAT_PAGES of them
+MIN_REPEAT_RATIO = 0.6
+MIN_REPEAT_PAGES = 3
+
+# Section that keeps one copy of every removed line
+BOILERPLATE_SECTION = "Page Headers and Footers"
+
+# Page numbers, the only part of a line allowed to change from page to page:
+# "Page 3", "Page 3 of 12", "3 of 12", "3/12" or a bare "- 3 -"
+PAGE_NUMBER_PATTERN = re.compile(
+    r"\bpage\s+\d+(\s*(of|/)\s*\d+)?\b|^[\s\-\u2013]*\d+(\s*(of|/)\s*\d+)?[\s\-\u2013]*$", re.IGNORECASE)
+
+
+def _normalize(line):
+    return PAGE_NUMBER_PATTERN.sub("#", " ".join(line.split()))
+
+
+def _edge_signatures(lines):
+    """
+    Yields (position, normalized text, index in `lines`) for the top and bottom lines
+    of a page. On short pages a line can be reported both from the top and the bottom.
+    """
+    indices = [i for i, line in enumerate(lines) if line.strip()]
+    for position, i in enumerate(indices[:EDGE_LINES]):
+        yield position, _normalize(lines[i]), i
+    for position, i in enumerate(reversed(indices[-EDGE_LINES:]), start=1):
+        yield -position, _normalize(lines[i]), i
+
+
+def find_repeated_lines(pages):
+    """
+    Finds header/footer lines that repeat at the same position across pages.
+
+    Args:
+        pages (list): Page contents as yielded by `iter_page_content`.
+
+    Returns:
+        set: (position, normalized text) signatures of the repeated lines. Positions
+        count from 0 at the top of the page and from -1 at the bottom.
+    """
+    counts = {}
+    for content in pages:
+        for signature in {(position, text) for position, text, _ in _edge_signatures(content["lines"])}:
+            counts[signature] = counts.get(signature, 0) + 1
+    threshold = max(MIN_REPEAT_PAGES, MIN_REPEAT_RATIO * len(pages))
+    return {signature for signature, count in counts.items() if count >= threshold}
+
+
+def strip_boilerplate(pages, stats, protected=None):
+    """
+    Removes repeated page headers, footers and letterhead lines from page contents.
+
+    The first `SAMPLE_PAGES` pages are buffered to learn which lines repeat; all
+    pages, including later ones, are then streamed through with those lines removed.
+
+    Args:
+        pages (iterable): Page contents as yielded by `iter_page_content`.
+        stats (dict): Updated in place with "boilerplate_lines" (one copy of each
+            removed line), "boilerplate_lines_removed", "boilerplate_bytes_saved" and
+            "boilerplate_tokens_saved".
+        protected (callable, optional): Takes a stripped line and returns True for lines to keep,
+            such as section headers and key-value lines, when they only repeat once their page
+            numbers are masked. A line identical at the same position on most pages, such as an
+            uppercase letterhead or a "Ref: ..." header, is removed either way.
+
+    Yields:
+        dict: Page contents without the repeated lines.
+    """
+    pages = iter(pages)
+    sample = list(itertools.islice(pages, SAMPLE_PAGES))
+    repeated = find_repeated_lines(sample)
+    kept = {}
+    removed_count = removed_bytes = removed_tokens = 0
+
+    for content in itertools.chain(sample, pages):
+        drop = set()
+        for position, text, i in _edge_signatures(content["lines"]):
+            line = content["lines"][i].strip()
+            if (position, text) not in repeated or i in drop:
+                continue
+            identical = " ".join(line.split()) == text
+            if identical or not (protected and protected(line)):
+                drop.add(i)
+                kept.setdefault(text, line)
+                removed_count += 1
+                removed_bytes += len(json.dumps(line, ensure_ascii=False).encode("utf-8")) + 2
+                removed_tokens += estimate_tokens(line)
+        if drop:
+            content = dict(content, lines=[line for i, line in enumerate(content["lines"]) if i not in drop])
+        yield content
+
+    reference = list(kept.values())
+    if reference:
+        # The kept copies still end up in the output
+        removed_bytes -= len(json.dumps(reference, ensure_ascii=False).encode("utf-8"))
+        removed_tokens -= estimate_tokens(" ".join(reference))
+    stats["boilerplate_lines"] = reference
+    stats["boilerplate_lines_removed"] = removed_count
+    stats["boilerplate_bytes_saved"] = removed_bytes
+    stats["boilerplate_tokens_saved"] = removed_tokens
@@ -1,87 +1,427 @@
-import PyPDF2
 import json
-from strands import tool,Agent
 import re
-import pdfplumber
-import json
  
 import os
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from . import boilerplate, extraction_cache
+from .tables import TABLE_FORMATS, table_to_columns, table_to_rows
+from .backends import DEFAULT_BACKEND, find_pricing_pages, get_backend, page_fingerprints
  
  
-# use this for complex
-@tool
-def extract_pdf_to_json(pdf_path, output_path):
+logger = logging.getLogger(__name__)
+
+# Bump whenever the structure of the extracted JSON changes, to invalidate cached results
+EXTRACTOR_VERSION = "1"
+
+# Number of worker processes used for parallel page extraction
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", os.cpu_count() or 1))
+
+# Documents with fewer pages than this are always extracted serially
+PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 40))
+
+# Shards per worker, so a slow page range does not leave other workers idle
+SHARDS_PER_WORKER = 4
+
+
+def _new_section():
+    return {"paragraphs": [], "key_values": {}, "tables": []}
+
+
+def _is_section_header(line):
+    return re.match(r"^(SECTION|Section)\s+\d+", line) or line.isupper()
+
+
+def _is_key_value(line):
+    return ':' in line and len(line.split(':', 1)[1].strip()) > 0
+
+
+def _page_runs(indices):
+    """Groups ascending page indices into contiguous (start, stop) runs."""
+    runs = []
+    for index in indices:
+        if runs and runs[-1][1] == index:
+            runs[-1][1] = index + 1
+        else:
+            runs.append([index, index + 1])
+    return runs
+
+
+def _extract_pages(pdf_path, indices, backend):
     """
-    Extracts structured content from a PDF file and saves it as a JSON file.
+    Extracts the raw content of the given pages in a worker process.
 
-    This function uses `pdfplumber` to read the PDF and organizes the content into sections.
-    Each section may contain:
-    - Paragraphs (free text lines)
-    - Key-value pairs (lines with a colon separator)
-    - Tables (converted into lists of dictionaries)
+    Returns:
+        list: Page contents in page order.
+    """
+    pages = get_backend(backend)["pages"]
+    return [content for start, stop in _page_runs(indices) for content in pages(pdf_path, start, stop)]
 
-    Section headers are detected based on formatting (e.g., "SECTION 1", all-uppercase lines).
-    The extracted data is saved to the specified output path in JSON format.
+
+def _page_shards(indices, workers):
+    shard_size = max(1, -(-len(indices) // (workers * SHARDS_PER_WORKER)))
+    return [indices[i:i + shard_size] for i in range(0, len(indices), shard_size)]
+
+
+def parse_page_spec(spec):
+    """
+    Parses a 1-based page specification such as "1-5,12" or [1, 2, 12].
+
+    Returns:
+        list: Sorted, de-duplicated 1-based page numbers.
+    """
+    if isinstance(spec, int):
+        return [spec]
+    if not isinstance(spec, str):
+        return sorted(set(int(page) for page in spec))
+    pages = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        pages.update(range(int(first), int(last or first) + 1))
+    return sorted(pages)
+
+
+def select_pages(pdf_path, page_count, pages=None, max_pages=None, preview_pages=None):
+    """
+    Resolves page selection options into 0-based page indices.
 
     Args:
         pdf_path (str): Path to the input PDF file.
-        output_path (str): Path where the output JSON file will be saved.
+        page_count (int): Number of pages in the document.
+        pages (str | list, optional): 1-based pages to extract, e.g. "1-5,12".
+        max_pages (int, optional): Extract at most this many of the selected pages.
+        preview_pages (int, optional): Preview mode; keep only the first N selected pages
+            plus pages detected as pricing tables (see `backends.find_pricing_pages`).
 
     Returns:
-        dict: A dictionary representing the structured content extracted from the PDF.
+        list: Ascending page indices to extract.
+    """
+    if pages is None:
+        indices = list(range(page_count))
+    else:
+        indices = [page - 1 for page in parse_page_spec(pages) if 1 <= page <= page_count]
+    if preview_pages is not None:
+        head, tail = indices[:preview_pages], indices[preview_pages:]
+        indices = head + find_pricing_pages(pdf_path, tail)
+    if max_pages is not None:
+        indices = indices[:max_pages]
+    return indices
+
+
+def _iter_extracted(pdf_path, page_indices, workers, backend):
+    """Extracts the given pages serially or across a process pool, yielding them in order."""
+    engine = get_backend(backend)
+    if workers <= 1 or len(page_indices) < PARALLEL_MIN_PAGES:
+        for start, stop in _page_runs(page_indices):
+            yield from engine["pages"](pdf_path, start, stop)
+        return
+
+    shards = _page_shards(page_indices, workers)
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+        results = executor.map(_extract_pages, [pdf_path] * len(shards), shards, [backend] * len(shards))
+        for shard in results:
+            yield from shard
+
+
+def iter_page_content(pdf_path, workers=None, backend=None, page_indices=None, page_cache=False, fingerprints=None):
+    """
+    Yields the raw content of each page of a PDF, in page order.
+
+    When at least `PARALLEL_MIN_PAGES` pages need extracting they are split into
+    shards that are extracted in a process pool; shard results are yielded in
+    order so the output is identical to serial extraction.
+
+    With `page_cache`, each page is fingerprinted (see `backends.page_fingerprints`)
+    and pages already extracted from any earlier PDF are read back from the
+    extraction cache, so a revised bid only re-extracts the pages that changed.
+
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        workers (int, optional): Number of worker processes. Defaults to `PDF_WORKERS`;
+            1 forces serial extraction.
+        backend (str, optional): Extraction backend name, see `backends.BACKENDS`.
+        page_indices (list, optional): Ascending 0-based pages to extract, see
+            `select_pages`. Defaults to every page.
+        page_cache (bool): Whether to reuse and store per-page results.
+        fingerprints (list, optional): `backends.page_fingerprints` of every page, if the
+            caller already has them. Computed here when needed otherwise.
+
+    Yields:
+        dict: {"page": page number, "lines": text lines, "tables": raw tables}
+    """
+    workers = workers or PDF_WORKERS
+    if page_indices is None:
+        page_indices = list(range(get_backend(backend)["page_count"](pdf_path)))
+    if not page_cache:
+        yield from _iter_extracted(pdf_path, page_indices, workers, backend)
+        return
+
+    if fingerprints is None:
+        fingerprints = page_fingerprints(pdf_path, page_indices)
+    else:
+        fingerprints = [fingerprints[index] for index in page_indices]
+    keys = [extraction_cache.data_key(fingerprint, EXTRACTOR_VERSION, backend or DEFAULT_BACKEND)
+            for fingerprint in fingerprints]
+    missing = [index for index, key in zip(page_indices, keys) if not extraction_cache.contains(key)]
+    extracted = _iter_extracted(pdf_path, missing, workers, backend)
+    missing = set(missing)
+    stored = False
+    for index, key in zip(page_indices, keys):
+        content = None if index in missing else extraction_cache.get(key)
+        if content is None:
+            # Changed page, or evicted by another process since the lookup
+            content = next(extracted) if index in missing else _extract_pages(pdf_path, [index], backend)[0]
+            extraction_cache.put_data(key, content)
+            stored = True
+        else:
+            content["page"] = index + 1
+            content["reused"] = True
+        yield content
+    if stored:
+        # Once per document rather than per page, as eviction scans the whole cache
+        extraction_cache.evict()
+
+
+def count_pages(pages, stats):
+    """
+    Passes page contents through while counting them into `stats`.
+
+    Args:
+        pages (iterable): Page contents as yielded by `iter_page_content`.
+        stats (dict): Updated in place with "pages", "pages_reused", "table_pages_scanned"
+            and "table_pages_skipped" counters.
+
+    Yields:
+        dict: The page contents, unchanged.
+    """
+    for key in ("pages", "pages_reused", "table_pages_scanned", "table_pages_skipped"):
+        stats.setdefault(key, 0)
+    for content in pages:
+        stats["pages"] += 1
+        if content.get("reused"):
+            stats["pages_reused"] += 1
+        elif content.get("table_scan", True):
+            stats["table_pages_scanned"] += 1
+        else:
+            stats["table_pages_skipped"] += 1
+        yield content
+
+
+def iter_sections(pages, table_format="rows"):
+    """
+    Groups page contents into sections as a generator.
+
+    Each section is yielded as soon as the next section header is seen, so only
+    the section currently being built is held in memory. Tables found on a page
+    are attached to the section that is open at the end of that page's text.
+
+    Args:
+        pages (iterable): Page contents as yielded by `iter_page_content`.
+        table_format (str): "rows" stores each table row as a dict keyed by header;
+            "columns" stores each table as a header list plus column arrays.
+
+    Yields:
+        tuple: (section name, section data)
     """
-    result = {}
     current_section = "General"
-    section_data = {"paragraphs": [], "key_values": {}, "tables": []}
+    section_data = _new_section()
+
+    for content in pages:
+        for line in content["lines"]:
+            line = line.strip()
+            if not line:
+                continue
 
-    def is_section_header(line):
-        return re.match(r"^(SECTION|Section)\s+\d+", line) or line.isupper()
+            if _is_section_header(line):
+                if section_data["paragraphs"] or section_data["key_values"] or section_data["tables"]:
+                    yield current_section, section_data
+                current_section = line
+                section_data = _new_section()
 
-    def is_key_value(line):
-        return ':' in line and len(line.split(':', 1)[1].strip()) > 0
+            elif _is_key_value(line):
+                key, value = line.split(':', 1)
+                section_data["key_values"][key.strip()] = value.strip()
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_num, page in enumerate(pdf.pages):
-            lines = page.extract_text().split('\n') if page.extract_text() else []
+            else:
+                section_data["paragraphs"].append(line)
 
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
+        # Extract tables
+        for table in content["tables"]:
+            if table_format == "columns":
+                columnar = table_to_columns(table)
+                if columnar["headers"]:
+                    section_data["tables"].append(columnar)
+            else:
+                section_data["tables"].extend(table_to_rows(table))
 
-                if is_section_header(line):
-                    if section_data["paragraphs"] or section_data["key_values"] or section_data["tables"]:
-                        result[current_section] = section_data
-                    current_section = line
-                    section_data = {"paragraphs": [], "key_values": {}, "tables": []}
+    # Save last section
+    if section_data["paragraphs"] or section_data["key_values"] or section_data["tables"]:
+        yield current_section, section_data
+
+
+def iter_pdf_sections(pdf_path, workers=None, backend=None, stats=None, page_indices=None, page_cache=False,
+                      strip_boilerplate=False, table_format="rows", fingerprints=None):
+    """
+    Streams the structured sections of a PDF file page by page.
 
-                elif is_key_value(line):
-                    key, value = line.split(':', 1)
-                    section_data["key_values"][key.strip()] = value.strip()
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        workers (int, optional): Number of worker processes for page extraction.
+        backend (str, optional): Extraction backend name, see `backends.BACKENDS`.
+        stats (dict, optional): Filled with page counters, see `count_pages`.
+        page_indices (list, optional): 0-based pages to extract, see `select_pages`.
+        page_cache (bool): Whether to reuse and store per-page results.
+        strip_boilerplate (bool): Remove lines repeated at the same position on every page
+            and keep one copy of each in a final `boilerplate.BOILERPLATE_SECTION` section.
+        table_format (str): "rows" or "columns", see `iter_sections`.
+        fingerprints (list, optional): Page fingerprints, see `iter_page_content`.
 
-                else:
-                    section_data["paragraphs"].append(line)
+    Yields:
+        tuple: (section name, section data)
+    """
+    stats = {} if stats is None else stats
+    pages = count_pages(iter_page_content(pdf_path, workers=workers, backend=backend, page_indices=page_indices,
+                                          page_cache=page_cache, fingerprints=fingerprints), stats)
+    if strip_boilerplate:
+        # Headings and key-value lines that differ only by a page number are content, not boilerplate
+        pages = boilerplate.strip_boilerplate(
+            pages, stats, protected=lambda line: bool(_is_section_header(line) or _is_key_value(line)))
+    yield from iter_sections(pages, table_format=table_format)
+    if strip_boilerplate and stats["boilerplate_lines"]:
+        yield boilerplate.BOILERPLATE_SECTION, dict(_new_section(), paragraphs=stats["boilerplate_lines"])
 
-            # Extract tables
-            tables = page.extract_tables()
-            for table in tables:
-                headers = table[0]
-                rows = [dict(zip(headers, row)) for row in table[1:] if len(row) == len(headers)]
-                section_data["tables"].extend(rows)
 
-        # Save last section
-        if section_data["paragraphs"] or section_data["key_values"] or section_data["tables"]:
-            result[current_section] = section_data
+def write_sections_json(sections, output_path):
+    """
+    Writes sections to a JSON object file incrementally and collects them.
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    Each section is serialised as soon as it is produced instead of dumping the
+    whole document at the end. A section name that repeats is written again;
+    JSON readers keep the last value, which matches the returned dictionary.
+    Sections are returned as they read back from the file (e.g. a None table
+    header becomes "null"), so a fresh and a cached extraction are identical.
+    The sections go to a temporary file next to `output_path` that replaces it
+    only once every section is written, so a failed extraction leaves no partial JSON.
 
+    Args:
+        sections (iterable): (section name, section data) pairs.
+        output_path (str): Path where the output JSON file will be saved.
+
+    Returns:
+        dict: The sections keyed by name.
+    """
+    # Devices such as os.devnull are written directly; renaming over them would replace them
+    atomic = not os.path.exists(output_path) or os.path.isfile(output_path)
+    if atomic:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix=".tmp")
+        f = os.fdopen(fd, "w", encoding="utf-8")
+    else:
+        f = open(output_path, "w", encoding="utf-8")
+
+    result = {}
+    try:
+        with f:
+            f.write("{")
+            for name, data in sections:
+                f.write(",\n" if result else "\n")
+                f.write(json.dumps(name, ensure_ascii=False))
+                f.write(": ")
+                text = json.dumps(data, ensure_ascii=False)
+                f.write(text)
+                result[name] = json.loads(text)
+            f.write("\n}\n")
+        if atomic:
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, output_path)
+    except BaseException:
+        if atomic and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
     return result
 
 
+# use this for complex; agents take it wrapped with `strands.tool`
+def extract_pdf_to_json(pdf_path, output_path, workers=None, use_cache=True, backend=None,
+                        pages=None, max_pages=None, preview_pages=None, strip_boilerplate=False,
+                        table_format="rows", fingerprints=None):
+    """
+    Extracts structured content from a PDF file and saves it as a JSON file.
+
+    This function uses `pdfplumber` (or PyMuPDF, see `backend`) to read the PDF and
+    organizes the content into sections.
+    Each section may contain:
+    - Paragraphs (free text lines)
+    - Key-value pairs (lines with a colon separator)
+    - Tables (converted into lists of dictionaries, or header + column arrays)
+
+    Section headers are detected based on formatting (e.g., "SECTION 1", all-uppercase lines).
+    Pages are processed one at a time and each section is written to the specified
+    output path as soon as it is complete, so memory stays flat for large documents.
+    Large documents are extracted in parallel across a process pool.
+    Results are cached on disk by the SHA-256 of the PDF bytes, so re-analysing the same
+    document returns the stored result without parsing it again. Pages are also cached
+    by fingerprint, so a revised PDF only re-extracts the pages that changed.
+
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        output_path (str): Path where the output JSON file will be saved.
+        workers (int, optional): Number of worker processes. Documents shorter than
+            `PARALLEL_MIN_PAGES` pages are always extracted serially.
+        use_cache (bool): Whether to read from and write to the extraction cache.
+        backend (str, optional): "pdfplumber" or "pymupdf". Defaults to the PDF_BACKEND
+            environment variable, else "pdfplumber". PyMuPDF is much faster per page;
+            pdfplumber handles some layouts better.
+        pages (str | list, optional): 1-based pages to extract, e.g. "1-5,12". Defaults to all pages.
+        max_pages (int, optional): Maximum number of pages to extract.
+        preview_pages (int, optional): Preview mode; extract only the first N pages plus
+            pages that look like pricing tables, for a quick first summary.
+        strip_boilerplate (bool): Remove page headers, footers and letterhead lines that
+            repeat on every page, keeping one copy of each in a "Page Headers and Footers" section.
+        table_format (str): "rows" (default) stores every table row as a dict keyed by header;
+            "columns" stores each table once as {"headers": [...], "columns": [[...], ...]} with
+            numeric cells parsed to floats. `tables.columns_to_rows` converts back.
+        fingerprints (list, optional): `backends.page_fingerprints` of every page, if already
+            computed, so the page cache does not hash the PDF again.
+
+    Returns:
+        dict: A dictionary representing the structured content extracted from the PDF.
+    """
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(f"Unknown table format '{table_format}', expected one of {TABLE_FORMATS}")
+
+    page_indices = None
+    if pages is not None or max_pages is not None or preview_pages is not None:
+        page_count = get_backend(backend)["page_count"](pdf_path)
+        page_indices = select_pages(pdf_path, page_count, pages, max_pages, preview_pages)
+
+    if use_cache:
+        key = extraction_cache.cache_key(pdf_path, EXTRACTOR_VERSION, backend=backend or DEFAULT_BACKEND,
+                                         page_indices=page_indices, strip_boilerplate=strip_boilerplate,
+                                         table_format=table_format)
+        cached = extraction_cache.get(key, output_path)
+        if cached is not None:
+            return cached
 
+    stats = {}
+    result = write_sections_json(iter_pdf_sections(pdf_path, workers=workers, backend=backend, stats=stats,
+                                                   page_indices=page_indices, page_cache=use_cache,
+                                                   strip_boilerplate=strip_boilerplate, table_format=table_format,
+                                                   fingerprints=fingerprints),
+                                 output_path)
+    logger.info("Extracted %s: %d pages, %d reused from cache, table extraction skipped on %d",
+                pdf_path, stats["pages"], stats["pages_reused"], stats["table_pages_skipped"])
+    if strip_boilerplate:
+        logger.info("Removed %d boilerplate lines from %s, saving %d bytes (~%d tokens)",
+                    stats["boilerplate_lines_removed"], pdf_path, stats["boilerplate_bytes_saved"],
+                    stats["boilerplate_tokens_saved"])
+    if use_cache:
+        extraction_cache.put(key, result)
+    return result
 
-agent = Agent(tools=[extract_pdf_to_json])
 
 
 # # Define paths
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+
+# Directory shared by every process that extracts PDFs on this host
+CACHE_DIR = os.environ.get("EXTRACTION_CACHE_DIR", os.path.join(os.getcwd(), ".extraction_cache"))
+
+# Total size of cached entries before the least recently used ones are evicted
+CACHE_MAX_BYTES = int(os.environ.get("EXTRACTION_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def file_sha256(path):
+    """
+    Computes the SHA-256 digest of a file's bytes.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(pdf_path, version, **options):
+    """
+    Builds the cache key for a PDF extraction.
+
+    The key is content-addressed: the same PDF bytes extracted by the same extractor
+    version with the same options map to the same entry, whatever the file is called.
+
+    Args:
+        pdf_path (str): Path to the input PDF file.
+        version (str): Extractor version; bump it whenever the output format changes.
+        **options: Extraction options that affect the output.
+
+    Returns:
+        str: Hex digest identifying the extraction.
+    """
+    material = json.dumps([file_sha256(pdf_path), version, options], sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def data_key(*parts):
+    """
+    Builds a cache key from JSON-serialisable parts, e.g. a page fingerprint and options.
+
+    Returns:
+        str: Hex digest of the parts.
+    """
+    material = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def contains(key):
+    return os.path.exists(_entry_path(key))
+
+
+def get(key, output_path=None):
+    """
+    Looks up a cached extraction and marks it as recently used.
+
+    Args:
+        key (str): Cache key from `cache_key`.
+        output_path (str, optional): If given, the cached JSON is copied there.
+
+    Returns:
+        dict | None: The cached extraction, or None on a miss.
+    """
+    path = _entry_path(key)
+    try:
+        os.utime(path)
+        if output_path:
+            shutil.copyfile(path, output_path)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Missing, evicted by another process meanwhile, or unreadable
+        return None
+
+
+def _atomic_write(key, write):
+    """
+    Writes an entry to a temporary name inside the cache directory and then
+    atomically renames it, so concurrent readers never see a partial entry.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            write(tmp)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, _entry_path(key))
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def put(key, extraction):
+    """
+    Stores an extraction in the cache, then evicts old entries.
+
+    The in-memory result is serialised rather than the caller's output file, which
+    another run may be writing to at the same time.
+
+    Args:
+        key (str): Cache key from `cache_key`.
+        extraction (dict): The extraction result, as returned by `extract_pdf_to_json`.
+    """
+    put_data(key, extraction)
+    evict()
+
+
+def put_data(key, data):
+    """
+    Stores a JSON-serialisable value in the cache, e.g. the content of one page.
+
+    Nothing is evicted here, so storing every page of a document stays linear;
+    call `evict` once the document is done.
+
+    Args:
+        key (str): Cache key from `data_key`.
+        data: Value to store.
+    """
+    _atomic_write(key, lambda tmp: tmp.write(json.dumps(data, ensure_ascii=False).encode("utf-8")))
+
+
+def evict(max_bytes=None):
+    """
+    Removes the least recently used entries until the cache fits its size bound.
+
+    Args:
+        max_bytes (int, optional): Size bound in bytes. Defaults to `CACHE_MAX_BYTES`.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = []
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        total -= size
@@ -0,0 +1,97 @@
+import json
+import os
+
+from .backends import page_fingerprints
+from .doc_tool import extract_pdf_to_json
+
+
+def _row_keys(rows):
+    # Header cells may be None, so keys are kept in column order rather than sorted
+    return [json.dumps(row, ensure_ascii=False) for row in rows]
+
+
+def _list_changes(old, new):
+    """Returns the items only in `new` and only in `old`, keeping duplicates and order."""
+    remaining = list(old)
+    added = []
+    for item in new:
+        if item in remaining:
+            remaining.remove(item)
+        else:
+            added.append(item)
+    return added, remaining
+
+
+def diff_sections(old, new):
+    """
+    Computes a structural diff between two extractions of a document.
+
+    Args:
+        old (dict): Sections extracted from the previous version.
+        new (dict): Sections extracted from the revised version.
+
+    Returns:
+        dict: {"added_sections": [...], "removed_sections": [...], "changed_sections": {
+        name: {"paragraphs_added", "paragraphs_removed", "key_values_changed",
+        "table_rows_added", "table_rows_removed"}}}, only listing non-empty changes.
+    """
+    changed = {}
+    for name in new.keys() & old.keys():
+        before, after = old[name], new[name]
+        if before == after:
+            continue
+        change = {}
+        change["paragraphs_added"], change["paragraphs_removed"] = _list_changes(
+            before.get("paragraphs", []), after.get("paragraphs", []))
+
+        before_kv, after_kv = before.get("key_values", {}), after.get("key_values", {})
+        change["key_values_changed"] = {
+            key: {"old": before_kv.get(key), "new": after_kv.get(key)}
+            for key in before_kv.keys() | after_kv.keys()
+            if before_kv.get(key) != after_kv.get(key)
+        }
+
+        rows_added, rows_removed = _list_changes(_row_keys(before.get("tables", [])), _row_keys(after.get("tables", [])))
+        change["table_rows_added"] = [json.loads(row) for row in rows_added]
+        change["table_rows_removed"] = [json.loads(row) for row in rows_removed]
+        changed[name] = {key: value for key, value in change.items() if value}
+
+    return {
+        "added_sections": [name for name in new if name not in old],
+        "removed_sections": [name for name in old if name not in new],
+        "changed_sections": changed,
+    }
+
+
+def extract_revised_pdf(pdf_path, previous_pdf_path, output_path, **options):
+    """
+    Extracts a resubmitted bid, reusing cached results for the pages it shares with
+    the previous submission, and reports what changed.
+
+    Args:
+        pdf_path (str): Path to the revised PDF file.
+        previous_pdf_path (str): Path to the previously submitted PDF file.
+        output_path (str): Path where the revised extraction JSON will be saved.
+        **options: Further `extract_pdf_to_json` options (backend, workers, ...).
+
+    Returns:
+        dict: {"result": revised extraction, "changed_pages": 1-based pages whose
+        fingerprint does not occur in the previous PDF, "diff": see `diff_sections`}
+    """
+    # Each PDF is fingerprinted once; the extractions reuse the fingerprints for the page cache
+    previous_fingerprints = page_fingerprints(previous_pdf_path)
+    fingerprints = page_fingerprints(pdf_path)
+
+    # Normally a cache hit; otherwise this also fills the page cache for the shared pages.
+    # Only the in-memory result is needed, so nothing is written next to output_path
+    previous = extract_pdf_to_json(pdf_path=previous_pdf_path, output_path=os.devnull,
+                                   fingerprints=previous_fingerprints, **options)
+    known = set(previous_fingerprints)
+    changed_pages = [number for number, fingerprint in enumerate(fingerprints, start=1) if fingerprint not in known]
+
+    result = extract_pdf_to_json(pdf_path=pdf_path, output_path=output_path, fingerprints=fingerprints, **options)
+    return {
+        "result": result,
+        "changed_pages": changed_pages,
+        "diff": diff_sections(previous, result),
+    }
@@ -0,0 +1,153 @@
+import re
+
+
+TABLE_FORMATS = ("rows", "columns")
+
+# Cells such as "1,200.00", "$ 45.50" or "-3" are stored as numbers in the columnar form
+NUMBER_PATTERN = re.compile(r"^[$€£]?\s*-?(\d{1,3}(,\d{3})+|\d+)?(\.\d+)?$")
+
+# Identifiers such as "007" or postal codes; "0" and "0.5" are still numbers
+LEADING_ZERO_PATTERN = re.compile(r"^[$€£]?\s*-?0\d")
+
+# Only columns whose header names a quantity, as a whole word, are parsed, so years,
+# part numbers and other codes in the remaining columns stay text ("Summary" is not "sum")
+NUMERIC_HEADER_PATTERN = re.compile(
+    r"\b(?:price|cost|amount|total|sum|subtotal|qty|quantity|rate|fee|tax|vat|discount|score|weight|"
+    r"percent|value|hours|days|units)(?:e?s)?\b|%", re.IGNORECASE)
+
+
+def _is_numeric_header(header):
+    return isinstance(header, str) and bool(NUMERIC_HEADER_PATTERN.search(header))
+
+
+def _parse_number(cell):
+    if isinstance(cell, str):
+        text = cell.strip()
+        if text and any(ch.isdigit() for ch in text) and NUMBER_PATTERN.match(text) \
+                and not LEADING_ZERO_PATTERN.match(text):
+            return float(text.lstrip("$€£").replace(",", "").replace(" ", ""))
+    return cell
+
+
+def _parse_column(header, cells):
+    """Parses the numeric cells of a column whose header marks it as numeric."""
+    return [_parse_number(cell) for cell in cells] if _is_numeric_header(header) else list(cells)
+
+
+def _fit_row(row, width):
+    """Pads a short row with None so every row has one cell per column."""
+    return list(row) + [None] * (width - len(row))
+
+
+def _column_headers(table):
+    headers = list(table[0])
+    width = max(len(row) for row in table)
+    # Cells beyond the header row get positional names instead of being dropped
+    return headers + [f"column_{i + 1}" for i in range(len(headers), width)]
+
+
+def table_to_rows(table):
+    """
+    Converts a raw table (header row followed by data rows) into row dictionaries.
+
+    Every row is brought to the width of the widest one: short rows are padded with
+    None, and cells beyond the header are kept under "column_<n>" keys, so no cell is
+    dropped and all rows of the table share the same keys.
+
+    Args:
+        table (list): Raw table as returned by the extraction backends.
+
+    Returns:
+        list: One dict per data row, keyed by header.
+    """
+    if not table:
+        return []
+    headers = _column_headers(table)
+    return [dict(zip(headers, _fit_row(row, len(headers)))) for row in table[1:]]
+
+
+def table_to_columns(table):
+    """
+    Converts a raw table into the compact columnar form.
+
+    Each header is stored once, followed by one array per column; numeric cells of
+    columns whose header names a quantity (price, total, quantity, ...) are parsed
+    to floats. Columns whose header and cells are all empty (ruling artifacts
+    of merged cells) are left out.
+
+    Args:
+        table (list): Raw table as returned by the extraction backends.
+
+    Returns:
+        dict: {"headers": [...], "columns": [[...], ...]}
+    """
+    if not table:
+        return {"headers": [], "columns": []}
+    headers = _column_headers(table)
+    rows = [_fit_row(row, len(headers)) for row in table[1:]]
+    columns = [(header, _parse_column(header, [row[i] for row in rows])) for i, header in enumerate(headers)]
+    columns = [(header, cells) for header, cells in columns if any(cell not in (None, "") for cell in [header] + cells)]
+    return {
+        "headers": [header for header, _ in columns],
+        "columns": [cells for _, cells in columns],
+    }
+
+
+def columns_to_rows(table):
+    """
+    Converts a columnar table back into row dictionaries.
+
+    Args:
+        table (dict): {"headers": [...], "columns": [[...], ...]}
+
+    Returns:
+        list: One dict per row, keyed by header. Numeric cells stay floats.
+    """
+    return [dict(zip(table["headers"], cells)) for cells in zip(*table["columns"])]
+
+
+def rows_to_columns(rows):
+    """
+    Groups row dictionaries into columnar tables.
+
+    Consecutive rows with the same keys are treated as one table, which is how the
+    row form lists the rows of each extracted table.
+
+    Args:
+        rows (list): Row dictionaries, as in a section's "tables" list.
+
+    Returns:
+        list: Columnar tables, see `table_to_columns`.
+    """
+    tables = []
+    for row in rows:
+        headers = list(row.keys())
+        if not tables or tables[-1]["headers"] != headers:
+            tables.append({"headers": headers, "columns": [[] for _ in headers]})
+        for column, value in zip(tables[-1]["columns"], row.values()):
+            column.append(value)
+    for table in tables:
+        table["columns"] = [_parse_column(header, cells) for header, cells in zip(table["headers"], table["columns"])]
+    return tables
+
+
+def compact_tables(sections):
+    """
+    Returns a copy of an extraction with every section's tables in columnar form.
+
+    Used by prompt builders so header strings are not repeated on every row.
+    Sections already extracted with `table_format="columns"` are left as they are.
+
+    Args:
+        sections (dict): Extraction result from `extract_pdf_to_json`.
+
+    Returns:
+        dict: The same sections with compact tables.
+    """
+    compact = {}
+    for name, data in sections.items():
+        tables = data.get("tables", [])
+        if tables and not (isinstance(tables[0], dict) and "columns" in tables[0] and "headers" in tables[0]):
+            data = dict(data, tables=rows_to_columns(tables))
+        compact[name] = data
+    return compact
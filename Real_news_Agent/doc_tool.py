@@ -1,4 +1,3 @@
-import PyPDF2
 import json
 from strands import tool,Agent
 import re
@@ -1,19 +1,13 @@
 import streamlit as st
+import hashlib
 import os
 import tempfile
-import subprocess
 import base64
-import re
 import json
-import fitz
 from streamlit_autorefresh import st_autorefresh
 import random
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
 from datetime import datetime
+from Bid_Scoring_Agent.scoring import CRITERIA, WEIGHT_PROFILES, parse_ratings, score_bids, score_evaluation
 
 # Set page config
 st.set_page_config(
@@ -30,54 +24,27 @@ def create_agents_with_credentials(aws_access_key, aws_secret_key, aws_region):
         os.environ['AWS_SECRET_ACCESS_KEY'] = aws_secret_key
         os.environ['AWS_REGION'] = aws_region
         
-        # Import agents after setting credentials
-        from Documen_Parsing_Agent import doc_agent
-        from Compliance_Check_Agent import compliance_checking_agent
-        from Bid_Scoring_Agent import bid_scoring_agent, pdf_code_agent
-        from common_agents import summary_agent
-        
-        return {
-            'doc_agent': doc_agent,
-            'compliance_agent': compliance_checking_agent,
-            'scoring_agent': bid_scoring_agent,
-            'pdf_code_agent': pdf_code_agent,
-            'summary_agent': summary_agent
-        }
+        # Agents are imported after setting credentials; they share one pooled Bedrock client per credential set
+        from common_agents.factory import create_agents
+        
+        return create_agents({"access_key": aws_access_key, "secret_key": aws_secret_key, "region": aws_region})
     except Exception as e:
         st.error(f"Error creating agents: {str(e)}")
         return None
 
 def validate_aws_credentials(aws_access_key, aws_secret_key, aws_region):
-    """Validate AWS credentials"""
-    try:
-        import boto3
-        session = boto3.Session(
-            aws_access_key_id=aws_access_key,
-            aws_secret_access_key=aws_secret_key,
-            region_name=aws_region,
-        )
-        
-        # Test credentials
-        sts_client = session.client('sts')
-        sts_client.get_caller_identity()
-        return True, "Credentials are valid"
-    except Exception as e:
-        return False, f"Invalid credentials: {str(e)}"
-
-def extract_and_save_code(text, output_filename="pdf_app.py"):
-    """Extract Python code from text and save it"""
-    code_pattern = r'```python\n(.*?)\n```'
-    matches = re.findall(code_pattern, text, re.DOTALL)
-    
-    if matches:
-        code = matches[0]
-        with open(output_filename, 'w') as f:
-            f.write(code)
-        return True
-    return False
+    """Validate AWS credentials, reusing recent results instead of calling STS on every check"""
+    from common_agents.factory import validate_credentials
+    return validate_credentials(aws_access_key, aws_secret_key, aws_region)
 
 def generate_pdf_report(results, filename="compliance_report.pdf"):
     """Generate a PDF report from analysis results"""
+    # reportlab is only loaded once a report is requested
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
     try:
         # Create a temporary file for the PDF
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
@@ -138,13 +105,13 @@ def generate_pdf_report(results, filename="compliance_report.pdf"):
                 if criterion != "Final Score":
                     table_data.append([
                         criterion,
-                        str(data["Score"]),
+                        "Unrated" if data["Score"] is None else str(data["Score"]),
                         str(data["Weight"]),
-                        str(data["Weighted Score"])
+                        "" if data["Weighted Score"] is None else str(data["Weighted Score"])
                     ])
             
             # Add final score row
-            if "Final Score" in scoring:
+            if scoring.get("Final Score") is not None:
                 table_data.append(["<b>FINAL SCORE</b>", "", "", f"<b>{scoring['Final Score']}/5.0</b>"])
             
             # Create table
@@ -183,6 +150,12 @@ def generate_pdf_report(results, filename="compliance_report.pdf"):
 
 def generate_ai_analysis_pdf(results, filename="ai_analysis_report.pdf"):
     """Generate a PDF report from AI analysis results"""
+    # reportlab is only loaded once a report is requested
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
     try:
         # Create a temporary file for the PDF
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
@@ -335,9 +308,16 @@ def main():
     if uploaded_file is not None:
         st.success(f"✅ File uploaded: {uploaded_file.name}")
         
+        # Results shown for an earlier upload are dropped once a different file is uploaded
+        file_bytes = uploaded_file.getvalue()
+        upload_key = f"{uploaded_file.name}:{len(file_bytes)}:{hashlib.sha256(file_bytes).hexdigest()}"
+        if st.session_state.get("displayed_results_key") != upload_key:
+            st.session_state.pop("displayed_results", None)
+            st.session_state.displayed_results_key = upload_key
+        
         # Save uploaded file temporarily
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
+            tmp_file.write(file_bytes)
             pdf_path = tmp_file.name
         
         # Process button
@@ -373,6 +353,7 @@ def main():
                         }
                     }
                     
+                    st.session_state.displayed_results = (demo_results, "Demo Mode Results")
                     display_results(demo_results, "Demo Mode Results")
                     
             else:
@@ -389,50 +370,70 @@ def main():
                         )
                         
                         if agents:
-                            # Process with agents
-                            with st.spinner(f"📄 Processing pdf ..."):
-                                doc_agent_response = agents['doc_agent'].tool.extract_pdf_to_json(pdf_path)
-                                summary_prompt = f"Summarize the following procurement bid document: {doc_agent_response}"
-                                summary_response = agents['summary_agent'](summary_prompt)
+                            # Imported here like the agents, so common_agents is only loaded once credentials are set
+                            from common_agents.pipeline import run_stages
+                            
+                            # Summary, compliance and scoring only need the extracted document,
+                            # so they run concurrently once extraction finishes
+                            stages = {
+                                "document": (lambda: agents['doc_agent'].tool.extract_pdf_to_json(
+                                    pdf_path=pdf_path, output_path="output.json", strip_boilerplate=True), []),
+                                "summary": (lambda document: agents['summary_agent'](
+                                    f"Summarize the following procurement bid document: {document}"), ["document"]),
+                                "compliance": (lambda document: agents['compliance_agent'](
+                                    f"Check compliance for this bid: {document}"), ["document"]),
+                                "scoring": (lambda document: agents['scoring_agent'](
+                                    f"Score this bid: {document}"), ["document"]),
+                            }
+                            status = st.empty()
+                            stage_results, stage_timings = run_stages(
+                                stages,
+                                on_stage_done=lambda name, result, seconds: status.info(f"✅ {name.capitalize()} stage completed in {seconds:.1f}s")
+                            )
+                            status.empty()
+                            doc_agent_response = stage_results["document"]
+                            # Agent results render as their response text
+                            summary_response = str(stage_results["summary"])
+                            compliance_response = str(stage_results["compliance"])
+                            scoring_response = str(stage_results["scoring"])
                             
                             # Store PDF data
                             pdf_data = {uploaded_file.name: {
                                 "path": pdf_path,
                                 "extracted_data": doc_agent_response,
-                                "summary": summary_response.content
+                                "summary": summary_response
                             }}
                             
-                            # Compliance checking
-                            with st.spinner("🔍 Running compliance check..."):
-                                compliance_prompt = f"Check compliance for this bid: {doc_agent_response}"
-                                compliance_response = agents['compliance_agent'](compliance_prompt)
-                            
-                            # Bid scoring
-                            with st.spinner("📊 Calculating bid scores..."):
-                                scoring_prompt = f"Score this bid: {doc_agent_response}"
-                                scoring_response = agents['scoring_agent'](scoring_prompt)
-                            
                             # Display results
                             st.success("✅ AI analysis completed!")
+                            st.caption("⏱️ Stage times: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in stage_timings.items()))
                             
                             # Summary
                             st.subheader("📋 Document Summary")
-                            st.write(summary_response.content)
+                            st.write(summary_response)
                             
                             # Compliance
                             st.subheader("✅ Compliance Analysis")
-                            st.write(compliance_response.content)
+                            st.write(compliance_response)
                             
                             # Scoring
                             st.subheader("📊 Bid Scoring")
-                            st.write(scoring_response.content)
+                            st.write(scoring_response)
+
+                            # Parsed ratings feed the weight what-if and the ranking of every cached bid
+                            live_results = agent_scoring_results(scoring_response, uploaded_file.name)
+                            if live_results:
+                                st.session_state.displayed_results = (live_results, "AI Scoring Results")
+                                display_results(live_results, "AI Scoring Results")
+                            else:
+                                st.warning("⚠️ No ratings found in the scoring response, so the weight what-if is unavailable")
                             
                             # Download results
                             st.subheader("💾 Download Results")
                             results = {
-                                "summary": summary_response.content,
-                                "compliance": compliance_response.content,
-                                "scoring": scoring_response.content,
+                                "summary": summary_response,
+                                "compliance": compliance_response,
+                                "scoring": scoring_response,
                                 "pdf_data": pdf_data
                             }
                             
@@ -457,6 +458,10 @@ def main():
                 
                 # Clean up temporary file
                 os.unlink(pdf_path)
+        
+        elif "displayed_results" in st.session_state:
+            # Weight slider changes rerun the script; show the cached results instead of re-analyzing
+            display_results(*st.session_state.displayed_results)
     
     else:
         st.info("👆 Please upload a PDF document to begin analysis")
@@ -485,6 +490,41 @@ def main():
             st.write("• Multi-criteria evaluation")
             st.write("• Transparent audit trail")
 
+def cache_bid_scores(results):
+    """Cache a bid's per-criterion scores in the session for weight what-if analysis"""
+    supplier = results.get("Supplier Info", {}).get("Name", "Supplier")
+    ratings = {
+        criterion: {"score": data["Score"]}
+        for criterion, data in results["Scoring"].items() if criterion != "Final Score"
+    }
+    st.session_state.setdefault("bid_scores", {})[supplier] = parse_ratings({"supplier": supplier, "ratings": ratings})
+    return supplier
+
+def agent_scoring_results(scoring_response, file_name):
+    """Build display results from the Bid Scoring Agent response, or None if it has no ratings"""
+    scored = score_evaluation(scoring_response)
+    if "categories" not in scored:
+        return None
+    supplier = scored.get("supplier") or scored.get("supplier_name") or os.path.splitext(file_name)[0]
+    results = {
+        "Supplier Info": {"Name": supplier},
+        "Compliance Check": {category["category"]: category["compliance_flag"] for category in scored["categories"]},
+    }
+    return rescore_results(results, scored)
+
+def rescore_results(results, scored):
+    """Return a copy of the results with the scoring recomputed for new weights"""
+    scoring = {
+        category["category"]: {
+            "Score": category["score"],
+            "Weight": category["weight"],
+            "Weighted Score": category["weighted_score"]
+        }
+        for category in scored["categories"]
+    }
+    scoring["Final Score"] = scored["final_score"]
+    return dict(results, Scoring=scoring)
+
 def display_results(results, title):
     """Display analysis results in a formatted way"""
     st.success(f"✅ {title}")
@@ -503,6 +543,24 @@ def display_results(results, title):
     
     # Scoring Results
     st.subheader("📈 Bid Scoring Results")
+    supplier = cache_bid_scores(results)
+    
+    # Weight what-if: scores are recomputed locally for every cached bid, without calling the agents
+    with st.expander("⚖️ Weight What-If", expanded=True):
+        profile = st.selectbox("Weight profile", list(WEIGHT_PROFILES), key="weight_profile")
+        columns = st.columns(len(CRITERIA))
+        weights = {
+            criterion: column.slider(f"{criterion} (%)", 0, 100, WEIGHT_PROFILES[profile][criterion], step=5,
+                                     key=f"weight_{profile}_{criterion}")
+            for column, criterion in zip(columns, CRITERIA)
+        }
+        if not any(weights.values()):
+            st.warning("⚠️ At least one weight must be above zero, using the profile weights")
+            weights = WEIGHT_PROFILES[profile]
+        st.caption(f"Weights are normalized to 100% (current total: {sum(weights.values())}%)")
+    
+    scored_bids = {bid["supplier"]: bid for bid in score_bids(list(st.session_state.bid_scores.values()), weights)}
+    results = rescore_results(results, scored_bids[supplier])
     scoring = results["Scoring"]
     
     # Create a scoring table
@@ -517,15 +575,27 @@ def display_results(results, title):
             })
     
     st.dataframe(scoring_data, use_container_width=True)
+    unrated = scored_bids[supplier].get("unrated")
+    if unrated:
+        st.warning(f"⚠️ No usable rating for {', '.join(unrated)}; the final score covers the rated criteria only")
     
     # Final Score
     st.metric(
         label="🎯 Final Weighted Score",
-        value=f"{scoring['Final Score']}/5.0",
+        value="Unrated" if scoring['Final Score'] is None else f"{scoring['Final Score']}/5.0",
         delta="Compliant"
     )
     
-    # Download results
+    # Ranking across every bid scored in this session
+    if len(scored_bids) > 1:
+        st.subheader("🏆 Supplier Ranking")
+        ranking = [
+            {"Rank": bid["rank"], "Supplier": name, "Final Score": bid["final_score"]}
+            for name, bid in scored_bids.items()
+        ]
+        st.dataframe(sorted(ranking, key=lambda row: row["Rank"]), use_container_width=True)
+    
+    # Download results (the report is regenerated locally with the current weights)
     st.subheader("💾 Download Results")
     pdf_data = generate_pdf_report(results)
     if pdf_data:
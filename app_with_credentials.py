@@ -5,13 +5,8 @@ import subprocess
 import base64
 import re
 import json
-import fitz
 from streamlit_autorefresh import st_autorefresh
 import random
-import boto3
-from strands.models import BedrockModel
-from strands import Agent
-from strands_tools import retrieve
 
 # Set page config
 st.set_page_config(
@@ -23,28 +18,20 @@ st.set_page_config(
 def create_agent_with_credentials(aws_access_key, aws_secret_key, aws_region, agent_type="summary"):
     """Create an agent with user-provided AWS credentials"""
     try:
-        # Create a custom boto3 session with user credentials
-        session = boto3.Session(
-            aws_access_key_id=aws_access_key,
-            aws_secret_access_key=aws_secret_key,
-            region_name=aws_region,
-        )
-        
-        # Create a Bedrock model instance
-        bedrock_model = BedrockModel(
-            model_id="amazon.nova-pro-v1:0",
-            boto_session=session,
-        )
+        # Agents share one pooled Bedrock client per credential set
+        from common_agents.factory import create_agent
+        from strands_tools import retrieve
+        credentials = {"access_key": aws_access_key, "secret_key": aws_secret_key, "region": aws_region}
         
         if agent_type == "summary":
-            return Agent(model=bedrock_model,
+            return create_agent(credentials=credentials, name="summary_agent",
                         system_prompt="""
                         You are a smart document summarizer. Read the attached vendor invoice and generate a clear, concise summary in plain text. Include the following key details:
                         
                         Format the summary in a professional and readable paragraph or bullet points. If any information is missing, simply skip it without guessing.
                         """)
         elif agent_type == "compliance":
-            return Agent(model=bedrock_model, tools=[retrieve],
+            return create_agent(credentials=credentials, tools=[retrieve], name="compliance_agent",
                         system_prompt="""
                         Role:
                         You are a Compliance Checking Agent responsible for validating supplier bids against ESG, GPP, CSRD, and internal procurement policies.
@@ -63,7 +50,7 @@ def create_agent_with_credentials(aws_access_key, aws_secret_key, aws_region, ag
                         - Recommendations
                         """)
         elif agent_type == "scoring":
-            return Agent(model=bedrock_model, tools=[retrieve],
+            return create_agent(credentials=credentials, tools=[retrieve], name="scoring_agent",
                         system_prompt="""
                         Role:
                         You are a Bid Scoring Agent responsible for evaluating supplier bids using a structured, transparent, and auditable weighted average scoring model.
@@ -84,20 +71,9 @@ def create_agent_with_credentials(aws_access_key, aws_secret_key, aws_region, ag
         return None
 
 def validate_aws_credentials(aws_access_key, aws_secret_key, aws_region):
-    """Validate AWS credentials by attempting to create a session"""
-    try:
-        session = boto3.Session(
-            aws_access_key_id=aws_access_key,
-            aws_secret_access_key=aws_secret_key,
-            region_name=aws_region,
-        )
-        
-        # Test credentials by listing regions (lightweight operation)
-        sts_client = session.client('sts')
-        sts_client.get_caller_identity()
-        return True, "Credentials are valid"
-    except Exception as e:
-        return False, f"Invalid credentials: {str(e)}"
+    """Validate AWS credentials, reusing recent results instead of calling STS on every check"""
+    from common_agents.factory import validate_credentials
+    return validate_credentials(aws_access_key, aws_secret_key, aws_region)
 
 def extract_and_save_code(text, output_filename="pdf_app.py"):
     """Extract Python code from text and save it"""
@@ -235,6 +211,8 @@ def main():
                 with st.spinner("🤖 Processing with AI agents..."):
                     try:
                         # Extract text from PDF
+                        import fitz
+
                         doc = fitz.open(pdf_path)
                         pdf_text = ""
                         for page in doc:
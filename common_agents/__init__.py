@@ -1 +0,0 @@
-from .agent import summary_agent
\ No newline at end of file
@@ -0,0 +1,143 @@
+import logging
+import os
+
+from .prompt_format import format_section
+from .retrieval import index_passages, search
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# Token budget for the packed context of an agent call; override per agent with
+# CONTEXT_TOKEN_BUDGET_<AGENT>, e.g. CONTEXT_TOKEN_BUDGET_COMPLIANCE
+DEFAULT_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", 6000))
+
+# A section that does not fit is cut down to the remaining budget if at least this many tokens are left
+MIN_PARTIAL_TOKENS = 200
+
+TRUNCATION_MARK = " …[truncated]"
+
+
+def budget_for(agent):
+    """
+    Returns the context token budget for an agent.
+
+    Args:
+        agent (str): Agent name, e.g. "compliance".
+
+    Returns:
+        int: Tokens from CONTEXT_TOKEN_BUDGET_<AGENT>, or `DEFAULT_BUDGET`.
+    """
+    return int(os.environ.get(f"CONTEXT_TOKEN_BUDGET_{agent.upper()}", DEFAULT_BUDGET))
+
+
+def document_sections(document):
+    """
+    Splits an extraction into one context section per document section, without empty ones.
+    Section content is serialized with `prompt_format.format_section`.
+
+    Args:
+        document (dict): Extraction result from `extract_pdf_to_json`.
+
+    Returns:
+        list: Sections as {"name", "text"}.
+    """
+    sections = []
+    for name, data in document.items():
+        text = format_section(data)
+        if text:
+            sections.append({"name": name, "text": text})
+    return sections
+
+
+def passage_sections(passages):
+    """
+    Turns retrieved passages into context sections.
+
+    Args:
+        passages (list): Results from `retrieval.search`.
+
+    Returns:
+        list: Sections as {"name", "text"}.
+    """
+    return [{"name": f"{passage['source']} / {passage['section']}", "text": passage["text"]} for passage in passages]
+
+
+def _block(name, text):
+    """Renders a section as it appears in the prompt, with its header and the blank line that follows it."""
+    return f"## {name}\n{text}\n\n"
+
+
+def _truncate(text, tokens):
+    return text[:max(0, tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARK))] + TRUNCATION_MARK
+
+
+def pack_context(groups, query, budget=None, agent="agent"):
+    """
+    Packs context sections into a token budget, most relevant first.
+
+    Sections from all groups are ranked together by BM25 relevance to the query
+    and added greedily while they fit; then the most relevant section that did
+    not fit is truncated if at least `MIN_PARTIAL_TOKENS` remain. Kept sections are
+    returned in their original order, and dropped sections are logged.
+
+    Args:
+        groups (dict): {group name: list of sections from `document_sections` or
+            `passage_sections`}, e.g. the bid and the audit passages.
+        query (str): What the agent has to do, used to rank the sections.
+        budget (int, optional): Token budget. Defaults to `budget_for(agent)`.
+        agent (str): Agent name, for the budget and the log.
+
+    Returns:
+        tuple: ({group name: packed text}, report), where report is {"agent", "budget",
+        "used", "included", "truncated", "dropped": [(name, tokens)]}.
+    """
+    budget = budget_for(agent) if budget is None else budget
+    # Each section is counted with its "## name" header, as it is sent
+    sections = [dict(section, group=group, position=position,
+                     tokens=estimate_tokens(_block(section["name"], section["text"])))
+                for group, items in groups.items() for position, section in enumerate(items)]
+
+    scores = {}
+    if sections:
+        for result in search(index_passages(sections), query, top_k=len(sections)):
+            scores[(result["group"], result["position"])] = result["score"]
+    # Ties keep document order, so unrelated sections fill the budget front to back
+    ranked = sorted(sections, key=lambda section: -scores.get((section["group"], section["position"]), 0.0))
+
+    kept, skipped = [], []
+    used = 0
+    for section in ranked:
+        if section["tokens"] <= budget - used:
+            kept.append(section)
+            used += section["tokens"]
+        else:
+            skipped.append(section)
+
+    # Whatever budget is left goes to the most relevant section that did not fit
+    truncated = []
+    if skipped and budget - used >= MIN_PARTIAL_TOKENS:
+        section = skipped.pop(0)
+        text_tokens = budget - used - estimate_tokens(_block(section["name"], ""))
+        kept.append(dict(section, text=_truncate(section["text"], text_tokens), tokens=budget - used))
+        truncated.append(section["name"])
+        used = budget
+    dropped = [(section["name"], section["tokens"]) for section in skipped]
+
+    packed = {group: [] for group in groups}
+    for section in sorted(kept, key=lambda section: section["position"]):
+        packed[section["group"]].append(_block(section["name"], section["text"]))
+
+    report = {
+        "agent": agent,
+        "budget": budget,
+        "used": used,
+        "included": [section["name"] for section in kept],
+        "truncated": truncated,
+        "dropped": dropped,
+    }
+    if truncated or dropped:
+        logger.info("Packed %s context into %d/%d tokens; truncated %s; dropped %d sections: %s",
+                    agent, used, budget, truncated or "none", len(dropped),
+                    ", ".join(f"{name} (~{tokens} tokens)" for name, tokens in dropped) or "none")
+    return {group: "".join(texts).rstrip("\n") for group, texts in packed.items()}, report
@@ -0,0 +1,238 @@
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from strands import Agent
+
+from .history import HISTORY_MODE, conversation_manager
+from .models import MODEL_ID, build_model
+
+
+# HTTP connections kept open per Bedrock client; the pipeline runs several agents at once
+MAX_POOL_CONNECTIONS = int(os.environ.get("BEDROCK_MAX_POOL_CONNECTIONS", 32))
+
+# Seconds to wait for a Bedrock response; long reports stream for minutes
+READ_TIMEOUT = int(os.environ.get("BEDROCK_READ_TIMEOUT", 300))
+
+# Seconds a credential check is reused before STS is called again
+CREDENTIAL_CACHE_TTL = float(os.environ.get("CREDENTIAL_CACHE_TTL", 300))
+
+# Builder function of every agent handed out by `create_agents`
+AGENT_BUILDERS = {
+    "doc_agent": "Documen_Parsing_Agent.agent:create_doc_agent",
+    "compliance_agent": "Compliance_Check_Agent.agent:create_compliance_checking_agent",
+    "scoring_agent": "Bid_Scoring_Agent.agent:create_bid_scoring_agent",
+    "summary_agent": "common_agents.agent:create_summary_agent",
+}
+
+# Module attribute holding the shared instance of every agent in `AGENT_BUILDERS`
+SHARED_AGENTS = {
+    "doc_agent": "Documen_Parsing_Agent.agent:doc_agent",
+    "compliance_agent": "Compliance_Check_Agent.agent:compliance_checking_agent",
+    "scoring_agent": "Bid_Scoring_Agent.agent:bid_scoring_agent",
+    "summary_agent": "common_agents.agent:summary_agent",
+}
+
+_lock = threading.Lock()
+_agents_lock = threading.Lock()
+_models = {}
+_validations = {}
+
+
+def credentials_from_env():
+    """
+    Reads AWS credentials from the standard environment variables.
+
+    Returns:
+        dict: {"access_key", "secret_key", "session_token", "region"}; missing values are None.
+    """
+    return {
+        "access_key": os.environ.get("AWS_ACCESS_KEY_ID"),
+        "secret_key": os.environ.get("AWS_SECRET_ACCESS_KEY"),
+        "session_token": os.environ.get("AWS_SESSION_TOKEN"),
+        "region": os.environ.get("AWS_REGION"),
+    }
+
+
+def _credential_key(credentials):
+    """Identifies a credential set by a digest, so secrets are not kept as dictionary keys."""
+    material = json.dumps([credentials.get(name) for name in ("access_key", "secret_key", "session_token", "region")])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def client_config():
+    """
+    Returns the botocore configuration for pooled Bedrock clients.
+
+    Returns:
+        botocore.config.Config: Connection pool size, TCP keep-alive, read timeout and adaptive retries.
+    """
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        read_timeout=READ_TIMEOUT,
+        retries={"max_attempts": 4, "mode": "adaptive"},
+    )
+
+
+def _session(credentials):
+    return boto3.Session(
+        aws_access_key_id=credentials.get("access_key"),
+        aws_secret_access_key=credentials.get("secret_key"),
+        aws_session_token=credentials.get("session_token"),
+        region_name=credentials.get("region"),
+    )
+
+
+def get_model(credentials=None, model_id=MODEL_ID):
+    """
+    Returns the shared model for a credential set, creating its session and client on first use.
+
+    All agents using the same credentials share one boto3 session and one
+    bedrock-runtime client, and so one connection pool.
+
+    Args:
+        credentials (dict, optional): See `credentials_from_env`. Defaults to the environment.
+        model_id (str): Bedrock model ID.
+
+    Returns:
+        Model: The model from `models.build_model`.
+    """
+    credentials = credentials or credentials_from_env()
+    key = (_credential_key(credentials), model_id)
+    with _lock:
+        if key not in _models:
+            _models[key] = build_model(boto_session=_session(credentials), model_id=model_id,
+                                       boto_client_config=client_config())
+        return _models[key]
+
+
+def create_agent(system_prompt, tools=None, credentials=None, model_id=MODEL_ID, **agent_options):
+    """
+    Creates an agent on the shared model for a credential set.
+
+    Only the agent itself is new; the session, client and connections are reused.
+    Unless a conversation_manager is given, the agent's history is bounded according
+    to the AGENT_HISTORY_MODE variable, see `history.conversation_manager`.
+
+    Args:
+        system_prompt (str): The agent's system prompt.
+        tools (list, optional): Tools available to the agent.
+        credentials (dict, optional): See `credentials_from_env`. Defaults to the environment.
+        model_id (str): Bedrock model ID.
+        **agent_options: Further `Agent` options, e.g. name or callback_handler.
+
+    Returns:
+        Agent: The new agent.
+    """
+    agent_options.setdefault("conversation_manager", conversation_manager())
+    return Agent(model=get_model(credentials, model_id), tools=tools or [], system_prompt=system_prompt,
+                 **agent_options)
+
+
+def create_agents(credentials=None, names=None):
+    """
+    Creates the named agents for a credential set.
+
+    Args:
+        credentials (dict, optional): See `credentials_from_env`. Defaults to the environment.
+        names (list, optional): Keys of `AGENT_BUILDERS`. Defaults to all of them.
+
+    Returns:
+        dict: {name: Agent}
+    """
+    agents = {}
+    for name in names or AGENT_BUILDERS:
+        module_name, function_name = AGENT_BUILDERS[name].split(":")
+        agents[name] = getattr(importlib.import_module(module_name), function_name)(credentials)
+    return agents
+
+
+def request_agent(name, mode=None):
+    """
+    Returns the agent to use for one request.
+
+    In "stateless" history mode the agent keeps nothing between requests, so every
+    request gets a fresh one on the shared model and concurrent sessions never
+    invoke the same agent. In the other modes the shared agent is returned, so its
+    history carries over from earlier requests.
+
+    Args:
+        name (str): Key of `AGENT_BUILDERS`, e.g. "compliance_agent".
+        mode (str, optional): History mode. Defaults to the AGENT_HISTORY_MODE variable.
+
+    Returns:
+        Agent: A new agent in "stateless" mode, otherwise the module's shared agent.
+    """
+    if (mode or HISTORY_MODE) == "stateless":
+        return create_agents(names=[name])[name]
+    module_name, attribute = SHARED_AGENTS[name].split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def deferred_agents(namespace, builders):
+    """
+    Returns a module `__getattr__` that builds each named agent on its first access.
+
+    Assign the result to `__getattr__` in an agent module: the agent is built once,
+    with the credentials in the environment, and then kept in the module like a
+    plain attribute, so importing the module creates no client.
+
+    Args:
+        namespace (dict): The module's `globals()`.
+        builders (dict): {attribute name: builder function taking optional credentials}
+
+    Returns:
+        function: The module `__getattr__`.
+    """
+    def __getattr__(name):
+        if name not in builders:
+            raise AttributeError(f"module {namespace['__name__']!r} has no attribute {name!r}")
+        with _agents_lock:
+            if name not in namespace:
+                namespace[name] = builders[name]()
+        return namespace[name]
+
+    return __getattr__
+
+
+def validate_credentials(access_key, secret_key, region, session_token=None, ttl=None):
+    """
+    Checks AWS credentials with STS, reusing the answer for `CREDENTIAL_CACHE_TTL` seconds.
+
+    Errors that do not come from STS itself, such as a network failure, are not reused.
+
+    Args:
+        access_key (str): AWS access key ID.
+        secret_key (str): AWS secret access key.
+        region (str): AWS region.
+        session_token (str, optional): Session token for temporary credentials.
+        ttl (float, optional): Seconds to reuse the result. Defaults to `CREDENTIAL_CACHE_TTL`.
+
+    Returns:
+        tuple: (valid, message)
+    """
+    ttl = CREDENTIAL_CACHE_TTL if ttl is None else ttl
+    credentials = {"access_key": access_key, "secret_key": secret_key, "session_token": session_token,
+                   "region": region}
+    key = _credential_key(credentials)
+    cached = _validations.get(key)
+    if cached and time.monotonic() < cached[0]:
+        return cached[1]
+
+    try:
+        _session(credentials).client("sts", config=Config(retries={"max_attempts": 2})).get_caller_identity()
+        result = (True, "Credentials are valid")
+    except ClientError as e:
+        result = (False, f"Invalid credentials: {str(e)}")
+    except Exception as e:
+        # Network and configuration errors say nothing about the credentials, so they are not cached
+        return False, f"Invalid credentials: {str(e)}"
+    _validations[key] = (time.monotonic() + ttl, result)
+    return result
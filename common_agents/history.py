@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+import threading
+
+from strands.agent.conversation_manager import ConversationManager
+
+from .tokens import estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+# "stateless" starts every request with an empty conversation, "window" keeps the most
+# recent turns within HISTORY_TOKEN_CAP, "full" keeps the whole conversation
+HISTORY_MODE = os.environ.get("AGENT_HISTORY_MODE", "stateless")
+
+# Tokens of conversation history an agent keeps between requests in "window" mode
+HISTORY_TOKEN_CAP = int(os.environ.get("AGENT_HISTORY_TOKENS", 4000))
+
+_lock = threading.Lock()
+_stats = {}
+
+
+def message_tokens(message):
+    """
+    Estimates the prompt tokens of one conversation message.
+
+    Args:
+        message (dict): A strands message with "role" and "content" blocks.
+
+    Returns:
+        int: Approximate token count; non-text blocks such as tool calls count as their JSON.
+    """
+    total = 0
+    for block in message.get("content", []):
+        text = block.get("text") if isinstance(block, dict) else None
+        total += estimate_tokens(text if isinstance(text, str) else json.dumps(block, default=str))
+    return total
+
+
+def _starts_turn(message):
+    """Whether history may start at this message: a user prompt, not a tool result answering a call."""
+    return message.get("role") == "user" and not any(
+        isinstance(block, dict) and "toolResult" in block for block in message.get("content", []))
+
+
+def trim_history(messages, token_cap):
+    """
+    Drops the oldest turns of a conversation until it fits a token cap.
+
+    History is only cut where a user turn starts, so a tool call is never separated
+    from its result. A latest turn that alone exceeds the cap is dropped as well.
+
+    Args:
+        messages (list): Conversation messages, oldest first.
+        token_cap (int): Maximum tokens to keep; 0 keeps nothing.
+
+    Returns:
+        list: The kept messages.
+    """
+    remaining = sum(message_tokens(message) for message in messages)
+    for index, message in enumerate(messages):
+        if remaining <= token_cap and _starts_turn(message):
+            return messages[index:]
+        remaining -= message_tokens(message)
+    return []
+
+
+def history_stats():
+    """
+    Returns the conversation history size of every agent, as of its latest request.
+
+    Returns:
+        dict: {agent name: {"messages", "tokens", "peak_tokens", "removed", "requests"}}, where
+        "messages" and "tokens" are what the agent keeps for its next request and "peak_tokens"
+        is the largest history seen at the end of a request.
+    """
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+
+class TokenWindowConversationManager(ConversationManager):
+    """
+    Bounds an agent's conversation history after every request.
+
+    With a token cap of 0 each request starts from an empty conversation; with a
+    positive cap the most recent turns are kept within it; with None nothing is
+    removed. The history size is recorded for `history_stats` either way.
+    """
+
+    def __init__(self, token_cap=None):
+        super().__init__()
+        self.token_cap = token_cap
+
+    def apply_management(self, agent, **kwargs):
+        tokens = sum(message_tokens(message) for message in agent.messages)
+        removed = 0
+        if self.token_cap is not None and tokens > self.token_cap:
+            kept = trim_history(agent.messages, self.token_cap)
+            removed = len(agent.messages) - len(kept)
+            agent.messages[:] = kept
+            self.removed_message_count += removed
+        kept_tokens = sum(message_tokens(message) for message in agent.messages)
+
+        with _lock:
+            stats = _stats.setdefault(agent.name, {"messages": 0, "tokens": 0, "peak_tokens": 0,
+                                                   "removed": 0, "requests": 0})
+            stats["messages"] = len(agent.messages)
+            stats["tokens"] = kept_tokens
+            stats["peak_tokens"] = max(stats["peak_tokens"], tokens)
+            stats["removed"] += removed
+            stats["requests"] += 1
+        logger.debug("History of %s: %d messages (~%d tokens) kept, %d removed",
+                     agent.name, len(agent.messages), kept_tokens, removed)
+
+    def reduce_context(self, agent, e=None, **kwargs):
+        # On a context overflow, drop the oldest turn but never the request in progress
+        cuts = [index for index in range(1, len(agent.messages)) if _starts_turn(agent.messages[index])]
+        if not cuts:
+            if e is not None:
+                raise e
+            return
+        del agent.messages[:cuts[0]]
+        self.removed_message_count += cuts[0]
+
+
+def conversation_manager(mode=None, token_cap=None):
+    """
+    Builds the conversation manager for an agent according to the history mode.
+
+    Args:
+        mode (str, optional): "stateless", "window" or "full". Defaults to the AGENT_HISTORY_MODE variable.
+        token_cap (int, optional): Token cap in "window" mode. Defaults to `HISTORY_TOKEN_CAP`.
+
+    Returns:
+        TokenWindowConversationManager: The manager for `Agent(conversation_manager=...)`.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    mode = mode or HISTORY_MODE
+    if mode == "stateless":
+        return TokenWindowConversationManager(0)
+    if mode == "window":
+        return TokenWindowConversationManager(HISTORY_TOKEN_CAP if token_cap is None else token_cap)
+    if mode == "full":
+        return TokenWindowConversationManager(None)
+    raise ValueError(f"Unknown history mode {mode!r}; expected 'stateless', 'window' or 'full'")
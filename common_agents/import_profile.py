@@ -0,0 +1,118 @@
+"""
+Reports the import cost of a module or app script, package by package.
+
+Each target is imported in a fresh interpreter under `python -X importtime`. For
+a script such as `main_app.py`, only its top-level import statements run, so the
+report shows what the app pays before its first paint without starting Streamlit.
+
+Usage:
+    python -m common_agents.import_profile main_app.py app.py
+    python -m common_agents.import_profile Documen_Parsing_Agent.doc_tool --modules --top 30
+"""
+import argparse
+import ast
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+
+# One line of `-X importtime` output: self and cumulative microseconds, then the indented module name
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def import_statements(script_path):
+    """
+    Collects the top-level import statements of a script.
+
+    Args:
+        script_path (str): Path to a Python file.
+
+    Returns:
+        str: The import statements, one per line, in source order.
+    """
+    with open(script_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script_path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def profile_imports(target):
+    """
+    Imports a module, or the top-level imports of a script, and records the cost of every module loaded.
+
+    Args:
+        target (str): A dotted module name, or a path ending in ".py".
+
+    Returns:
+        dict: {"target", "modules": [{"module", "self_ms", "cumulative_ms", "depth"}],
+        "total_ms", "error"}; "error" holds the interpreter's own messages if the import failed.
+    """
+    code = import_statements(target) if target.endswith(".py") else f"import {target}"
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             capture_output=True, text=True)
+    modules, messages = [], []
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules.append({
+                "module": match.group(4),
+                "self_ms": int(match.group(1)) / 1000,
+                "cumulative_ms": int(match.group(2)) / 1000,
+                "depth": len(match.group(3)) // 2,
+            })
+        elif not line.startswith("import time:"):
+            messages.append(line)
+    return {
+        "target": target,
+        "modules": modules,
+        "total_ms": sum(module["self_ms"] for module in modules),
+        "error": "\n".join(messages[-10:]) if process.returncode else None,
+    }
+
+
+def package_costs(modules):
+    """
+    Sums the self time of modules by top-level package.
+
+    Args:
+        modules (list): Modules from `profile_imports`.
+
+    Returns:
+        list: (package, milliseconds, module count), most expensive first.
+    """
+    costs = defaultdict(lambda: [0.0, 0])
+    for module in modules:
+        cost = costs[module["module"].split(".")[0]]
+        cost[0] += module["self_ms"]
+        cost[1] += 1
+    return sorted(((package, ms, count) for package, (ms, count) in costs.items()), key=lambda row: -row[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-module import cost of modules or app scripts.")
+    parser.add_argument("targets", nargs="*", default=["main_app.py"],
+                        help="Dotted module names or .py scripts (default: main_app.py)")
+    parser.add_argument("--top", type=int, default=15, help="Rows to show per target (default: 15)")
+    parser.add_argument("--modules", action="store_true",
+                        help="List single modules by cumulative time instead of packages by self time")
+    args = parser.parse_args()
+
+    for target in args.targets:
+        result = profile_imports(target)
+        print(f"{target}: {result['total_ms']:.0f} ms, {len(result['modules'])} modules")
+        if args.modules:
+            print(f"  {'Module':<50}  {'self ms':>8}  {'cumul ms':>8}")
+            for module in sorted(result["modules"], key=lambda module: -module["cumulative_ms"])[:args.top]:
+                print(f"  {module['module']:<50}  {module['self_ms']:>8.1f}  {module['cumulative_ms']:>8.1f}")
+        else:
+            print(f"  {'Package':<30}  {'ms':>8}  {'share':>6}  {'modules':>7}")
+            for package, ms, count in package_costs(result["modules"])[:args.top]:
+                share = 100 * ms / result["total_ms"] if result["total_ms"] else 0.0
+                print(f"  {package:<30}  {ms:>8.1f}  {share:>5.1f}%  {count:>7}")
+        if result["error"]:
+            print(f"  Import failed:\n{result['error']}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from strands.models.model import Model
+
+
+logger = logging.getLogger(__name__)
+
+# SQLite database shared by every process that calls the models on this host
+CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(os.getcwd(), ".llm_cache", "responses.sqlite3"))
+
+# Responses older than this many seconds are not reused
+CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", 7 * 24 * 3600))
+
+# Total size of cached responses before the least recently used ones are evicted
+CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Set to 1 to always call the model; fresh responses still replace the cached ones
+CACHE_BYPASS = os.environ.get("LLM_CACHE_BYPASS", "0") == "1"
+
+# invocation_state key that bypasses the cache for a single agent call, e.g.
+# agent(prompt, invocation_state={BYPASS_KEY: True})
+BYPASS_KEY = "llm_cache_bypass"
+
+# Model settings that change the response; connection and tracing options do not
+INFERENCE_PARAMS = ("model_id", "max_tokens", "temperature", "top_p", "stop_sequences",
+                    "additional_request_fields", "guardrail_id", "guardrail_version")
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _normalize(value):
+    """Collapses whitespace in text blocks, so re-indented prompt templates hash the same."""
+    if isinstance(value, dict):
+        return {key: " ".join(item.split()) if key == "text" and isinstance(item, str) else _normalize(item)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def cache_key(model_id, system_prompt, messages, params=None, tool_specs=None):
+    """
+    Builds the cache key for a model request.
+
+    Args:
+        model_id (str): Model identifier, e.g. "amazon.nova-pro-v1:0".
+        system_prompt (str): The agent's system prompt.
+        messages (list): Conversation messages; whitespace in text blocks is normalized.
+        params (dict, optional): Inference parameters such as temperature and max_tokens.
+        tool_specs (list, optional): Tools offered to the model.
+
+    Returns:
+        str: Hex digest identifying the request.
+    """
+    material = json.dumps([
+        model_id,
+        _sha256(system_prompt or ""),
+        _sha256(json.dumps(_normalize(messages), sort_keys=True, default=str)),
+        params or {},
+        _sha256(json.dumps(tool_specs or [], sort_keys=True, default=str)),
+    ], sort_keys=True, default=str)
+    return _sha256(material)
+
+
+@contextmanager
+def _connect(path):
+    """Opens the cache database in a transaction that is committed and closed on exit."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30)
+    try:
+        # WAL lets Streamlit sessions read the cache while another one writes to it
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, model_id TEXT, events TEXT, "
+            "created REAL, accessed REAL, bytes INTEGER)"
+        )
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+def get(key, path=None, ttl=None):
+    """
+    Looks up a cached response and marks it as recently used.
+
+    Args:
+        key (str): Cache key from `cache_key`.
+        path (str, optional): Database path. Defaults to `CACHE_PATH`.
+        ttl (float, optional): Maximum age in seconds. Defaults to `CACHE_TTL`.
+
+    Returns:
+        list | None: The recorded stream events, or None on a miss or an expired entry.
+    """
+    ttl = CACHE_TTL if ttl is None else ttl
+    now = time.time()
+    with _connect(path or CACHE_PATH) as connection:
+        row = connection.execute("SELECT events, created FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > ttl:
+            return None
+        connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+    return json.loads(row[0])
+
+
+def put(key, model_id, events, path=None):
+    """
+    Stores the stream events of a response, then evicts old entries.
+
+    Args:
+        key (str): Cache key from `cache_key`.
+        model_id (str): Model identifier, kept for inspection.
+        events (list): Stream events as yielded by the model.
+        path (str, optional): Database path. Defaults to `CACHE_PATH`.
+    """
+    data = json.dumps(events, ensure_ascii=False)
+    now = time.time()
+    with _connect(path or CACHE_PATH) as connection:
+        connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                           (key, model_id, data, now, now, len(data.encode("utf-8"))))
+    evict(path=path)
+
+
+def evict(max_bytes=None, ttl=None, path=None):
+    """
+    Removes expired entries, then the least recently used ones until the cache fits its size bound.
+
+    Args:
+        max_bytes (int, optional): Size bound in bytes. Defaults to `CACHE_MAX_BYTES`.
+        ttl (float, optional): Maximum age in seconds. Defaults to `CACHE_TTL`.
+        path (str, optional): Database path. Defaults to `CACHE_PATH`.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    ttl = CACHE_TTL if ttl is None else ttl
+    with _connect(path or CACHE_PATH) as connection:
+        connection.execute("DELETE FROM responses WHERE created < ?", (time.time() - ttl,))
+        total = connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM responses").fetchone()[0]
+        if total <= max_bytes:
+            return
+        for key, size in connection.execute("SELECT key, bytes FROM responses ORDER BY accessed").fetchall():
+            if total <= max_bytes:
+                break
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+
+class CachedModel(Model):
+    """
+    Wraps a strands model so identical requests are answered from the response cache.
+
+    The cache key covers the model ID, the system prompt, the normalized messages,
+    the inference parameters and the tools, see `cache_key`. A response is stored
+    only once the model has streamed it completely.
+    """
+
+    def __init__(self, model, path=None, ttl=None):
+        self.model = model
+        self.path = path
+        self.ttl = ttl
+
+    def update_config(self, **model_config):
+        self.model.update_config(**model_config)
+
+    def get_config(self):
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        config = self.get_config()
+        params = {name: config.get(name) for name in INFERENCE_PARAMS if config.get(name) is not None}
+        key = cache_key(params.get("model_id"), system_prompt, messages, params, tool_specs)
+        bypass = CACHE_BYPASS or bool((kwargs.get("invocation_state") or {}).get(BYPASS_KEY))
+
+        events = None
+        if not bypass:
+            try:
+                events = get(key, self.path, self.ttl)
+            except sqlite3.Error as e:
+                logger.warning("Could not read the LLM cache: %s", e)
+        if events is not None:
+            logger.info("LLM cache hit for %s (%s)", params.get("model_id"), key[:12])
+            for event in events:
+                yield event
+            return
+
+        events = []
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            events.append(event)
+            yield event
+        try:
+            put(key, params.get("model_id"), events, self.path)
+        except (TypeError, ValueError, sqlite3.Error) as e:
+            # A response that cannot be stored is still returned; it is just not cached
+            logger.warning("Could not cache LLM response: %s", e)
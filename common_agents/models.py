@@ -0,0 +1,40 @@
+import os
+
+from strands.models import BedrockModel
+
+from .llm_cache import CachedModel
+from .replay import LLM_MODE, RecordingModel, ReplayModel
+
+
+# Bedrock model used by every agent
+MODEL_ID = os.environ.get("BEDROCK_MODEL_ID", "amazon.nova-pro-v1:0")   # Nova Pro
+
+
+def build_model(boto_session=None, model_id=MODEL_ID, mode=None, boto_client_config=None):
+    """
+    Builds the model for an agent according to the LLM mode.
+
+    In "live" mode this is a Bedrock model behind the response cache. "record" calls
+    Bedrock for every request, bypassing the cache so each fixture holds a real
+    response and its latency, and "replay" serves the fixtures without creating any
+    AWS client, see `replay`.
+
+    Args:
+        boto_session (boto3.Session, optional): Session for the Bedrock client.
+        model_id (str): Bedrock model ID.
+        mode (str, optional): "live", "record" or "replay". Defaults to the LLM_MODE variable.
+        boto_client_config (botocore.config.Config, optional): Configuration of the Bedrock client.
+
+    Returns:
+        Model: A strands model for `Agent(model=...)`.
+
+    Raises:
+        ValueError: If the mode is unknown.
+    """
+    mode = mode or LLM_MODE
+    if mode not in ("live", "record", "replay"):
+        raise ValueError(f"Unknown LLM mode {mode!r}; expected 'live', 'record' or 'replay'")
+    if mode == "replay":
+        return ReplayModel(model_id)
+    model = BedrockModel(model_id=model_id, boto_session=boto_session, boto_client_config=boto_client_config)
+    return RecordingModel(model) if mode == "record" else CachedModel(model)
@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def run_stages(stages, max_workers=None, on_stage_done=None):
+    """
+    Runs agent stages as a dependency graph, starting each stage as soon as the
+    stages it depends on have finished.
+
+    Independent stages run concurrently on a thread pool, so the total latency is
+    that of the critical path rather than the sum of all stages. Stage functions
+    receive the results of their dependencies as keyword arguments.
+
+    Args:
+        stages (dict): {name: (function, [dependency names])}.
+        max_workers (int, optional): Thread pool size. Defaults to the number of stages.
+        on_stage_done (callable, optional): Called as on_stage_done(name, result, seconds)
+            from the calling thread as each stage finishes, e.g. to update the UI.
+
+    Returns:
+        tuple: ({name: result}, {name: wall time in seconds})
+
+    Raises:
+        ValueError: If a dependency is unknown or the stages contain a cycle.
+        Exception: The first exception raised by a stage, after running stages finish.
+    """
+    for name, (_, dependencies) in stages.items():
+        unknown = [dependency for dependency in dependencies if dependency not in stages]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on unknown stages {unknown}")
+
+    results = {}
+    timings = {}
+    pending = dict(stages)
+    running = {}
+
+    def stage_call(name, function, kwargs):
+        start = time.perf_counter()
+        result = function(**kwargs)
+        return result, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages) or 1) as executor:
+        while pending or running:
+            for name, (function, dependencies) in list(pending.items()):
+                if all(dependency in results for dependency in dependencies):
+                    kwargs = {dependency: results[dependency] for dependency in dependencies}
+                    running[executor.submit(stage_call, name, function, kwargs)] = name
+                    del pending[name]
+
+            if not running:
+                raise ValueError(f"Stages {sorted(pending)} have circular dependencies")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    wait(running)
+                    raise error
+                results[name], timings[name] = future.result()
+                if on_stage_done:
+                    on_stage_done(name, results[name], timings[name])
+
+    return results, timings
@@ -0,0 +1,224 @@
+"""
+Compact, deterministic serialization of extracted data for agent prompts.
+
+Usage:
+    python -m common_agents.prompt_format sample_files Audit_files
+"""
+import argparse
+import json
+import os
+
+from .tokens import estimate_tokens
+
+
+# Separator between table cells; cells containing it are escaped
+CELL_SEPARATOR = "|"
+
+
+def _is_empty(value):
+    return value is None or (isinstance(value, str) and value.strip() in ("", "null")) or \
+        (isinstance(value, (list, tuple, dict)) and not value)
+
+
+def prune(value):
+    """
+    Recursively drops empty values: None, blank or "null" strings, and empty lists and dicts.
+
+    Args:
+        value: JSON-like value.
+
+    Returns:
+        The value without empty members, or None if nothing is left.
+    """
+    if isinstance(value, dict):
+        pruned = {str(key): prune(item) for key, item in value.items() if str(key).strip() not in ("", "null")}
+        pruned = {key: item for key, item in pruned.items() if not _is_empty(item)}
+        return pruned or None
+    if isinstance(value, (list, tuple)):
+        pruned = [prune(item) for item in value]
+        pruned = [item for item in pruned if not _is_empty(item)]
+        return pruned or None
+    return None if _is_empty(value) else value
+
+
+def compact_json(value):
+    """
+    Serializes a value as minified JSON with sorted keys and without empty members.
+
+    The same value always gives the same text, so prompts built from it are cacheable.
+
+    Args:
+        value: JSON-serializable value, e.g. compliance results.
+
+    Returns:
+        str: Minified JSON.
+    """
+    return json.dumps(prune(value), ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _format_cell(cell):
+    if cell is None:
+        return ""
+    if isinstance(cell, float) and cell.is_integer():
+        cell = int(cell)
+    return " ".join(str(cell).split()).replace(CELL_SEPARATOR, "/")
+
+
+def _table_rows(table):
+    """Returns (headers, rows) for a table in the row or the columnar form."""
+    if isinstance(table, dict) and "headers" in table and "columns" in table:
+        return list(table["headers"]), [list(cells) for cells in zip(*table["columns"])]
+    if isinstance(table, dict):
+        return list(table.keys()), [list(table.values())]
+    return [], []
+
+
+def format_tables(tables):
+    """
+    Formats tables as separator-delimited text, one header line per table.
+
+    Consecutive row dicts with the same keys are written as one table. Columns
+    whose header and cells are all empty are left out.
+
+    Args:
+        tables (list): A section's "tables", in the row or the columnar form.
+
+    Returns:
+        list: One text block per table.
+    """
+    grouped = []
+    for table in tables:
+        headers, rows = _table_rows(table)
+        if grouped and isinstance(table, dict) and "columns" not in table and grouped[-1][0] == headers:
+            grouped[-1][1].extend(rows)
+        elif headers:
+            grouped.append((headers, rows))
+
+    blocks = []
+    for headers, rows in grouped:
+        header_cells = [_format_cell(header) for header in headers]
+        row_cells = [[_format_cell(cell) for cell in row] for row in rows]
+        keep = [i for i, header in enumerate(header_cells)
+                if header not in ("", "null") or any(i < len(row) and row[i] for row in row_cells)]
+        row_cells = [[row[i] if i < len(row) else "" for i in keep] for row in row_cells]
+        row_cells = [row for row in row_cells if any(row)]
+        if not keep or not row_cells:
+            continue
+        lines = [CELL_SEPARATOR.join("" if header_cells[i] == "null" else header_cells[i] for i in keep)]
+        lines.extend(CELL_SEPARATOR.join(row) for row in row_cells)
+        blocks.append("\n".join(lines))
+    return blocks
+
+
+def format_section(data):
+    """
+    Formats the content of one extracted section as compact text.
+
+    Paragraphs come first, one per line, then "key: value" lines, then tables
+    as separator-delimited text. Empty parts are left out.
+
+    Args:
+        data (dict): Section with "paragraphs", "key_values" and "tables".
+
+    Returns:
+        str: The section content, or "" if the section is empty.
+    """
+    if not isinstance(data, dict):
+        value = prune(data)
+        return "" if value is None else compact_json(value)
+    lines = [" ".join(str(paragraph).split()) for paragraph in data.get("paragraphs", []) if not _is_empty(paragraph)]
+    lines.extend(f"{_format_cell(key)}: {_format_cell(value)}"
+                 for key, value in data.get("key_values", {}).items() if not _is_empty(value))
+    lines.extend(format_tables(data.get("tables", [])))
+    return "\n".join(lines)
+
+
+def serialize_section(name, data):
+    """
+    Serializes one extracted section as a "## name" heading followed by its content.
+
+    Args:
+        name (str): Section name.
+        data (dict): Section with "paragraphs", "key_values" and "tables".
+
+    Returns:
+        str: The section text, or "" if the section is empty.
+    """
+    content = format_section(data)
+    return f"## {name}\n{content}" if content else ""
+
+
+def serialize_document(document):
+    """
+    Serializes an extraction as compact text, section by section in document order.
+
+    Args:
+        document (dict): Extraction result from `extract_pdf_to_json`.
+
+    Returns:
+        str: The document text, without empty sections.
+    """
+    sections = (serialize_section(name, data) for name, data in document.items())
+    return "\n\n".join(section for section in sections if section)
+
+
+def measure(path):
+    """
+    Compares the prompt size of a document as a Python repr and in the compact form.
+
+    Args:
+        path (str): A PDF (extracted with `extract_pdf_to_json`) or an extraction JSON file.
+
+    Returns:
+        dict: {"file", "repr_tokens", "json_tokens", "compact_tokens", "saved_percent"}
+    """
+    if path.lower().endswith(".pdf"):
+        from Documen_Parsing_Agent.doc_tool import extract_pdf_to_json
+
+        # A measurement should neither depend on nor fill the extraction cache
+        document = extract_pdf_to_json(pdf_path=path, output_path=os.devnull, use_cache=False)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+
+    repr_tokens = estimate_tokens(str(document))
+    compact = serialize_document(document) if all(isinstance(data, dict) for data in document.values()) \
+        else compact_json(document)
+    compact_tokens = estimate_tokens(compact)
+    return {
+        "file": path,
+        "repr_tokens": repr_tokens,
+        "json_tokens": estimate_tokens(json.dumps(document, ensure_ascii=False)),
+        "compact_tokens": compact_tokens,
+        "saved_percent": round(100 * (1 - compact_tokens / repr_tokens), 1) if repr_tokens else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the prompt token savings of the compact serialization.")
+    parser.add_argument("paths", nargs="*", default=["sample_files", "Audit_files"],
+                        help="PDF or JSON files, or directories of them (default: sample_files Audit_files)")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.lower().endswith((".pdf", ".json"))))
+        else:
+            files.append(path)
+
+    results = [measure(path) for path in files]
+    width = max([len(result["file"]) for result in results] + [4])
+    print(f"{'File':<{width}}  {'repr':>8}  {'json':>8}  {'compact':>8}  {'saved':>6}")
+    for result in results:
+        print(f"{result['file']:<{width}}  {result['repr_tokens']:>8}  {result['json_tokens']:>8}  "
+              f"{result['compact_tokens']:>8}  {result['saved_percent']:>5}%")
+    repr_total = sum(result["repr_tokens"] for result in results)
+    compact_total = sum(result["compact_tokens"] for result in results)
+    if repr_total:
+        print(f"Total: {repr_total} -> {compact_total} tokens (~{100 * (1 - compact_total / repr_total):.1f}% saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+from strands.models.model import Model
+
+from .llm_cache import INFERENCE_PARAMS, cache_key
+
+
+logger = logging.getLogger(__name__)
+
+# "live" calls the models, "record" calls them and saves every response as a fixture,
+# "replay" answers from the fixtures without any AWS access
+LLM_MODE = os.environ.get("LLM_MODE", "live")
+
+# Directory holding one JSON fixture per recorded request
+FIXTURE_DIR = os.environ.get("LLM_FIXTURE_DIR", os.path.join("fixtures", "llm"))
+
+# Simulated latency per replayed response: seconds, or "recorded" for the latency seen while recording
+REPLAY_LATENCY = os.environ.get("LLM_REPLAY_LATENCY", "0")
+
+
+def request_key(model, messages, tool_specs=None, system_prompt=None):
+    """
+    Identifies a model request, with the same key as the response cache.
+
+    Args:
+        model: Model whose config supplies the model ID and inference parameters.
+        messages (list): Conversation messages.
+        tool_specs (list, optional): Tools offered to the model.
+        system_prompt (str, optional): The agent's system prompt.
+
+    Returns:
+        str: Hex digest identifying the request.
+    """
+    config = model.get_config()
+    params = {name: config.get(name) for name in INFERENCE_PARAMS if config.get(name) is not None}
+    return cache_key(params.get("model_id"), system_prompt, messages, params, tool_specs)
+
+
+class MissingFixtureError(Exception):
+    """Raised in replay mode for a request that was never recorded."""
+
+
+def structured_request_key(model, output_model, prompt, system_prompt=None):
+    """
+    Identifies a structured output request; the output schema takes the place of the tools.
+
+    Args:
+        model: Model whose config supplies the model ID and inference parameters.
+        output_model (type): Pydantic model of the expected output.
+        prompt (list): Conversation messages.
+        system_prompt (str, optional): The agent's system prompt.
+
+    Returns:
+        str: Hex digest identifying the request.
+    """
+    return request_key(model, prompt, [{"structuredOutput": output_model.model_json_schema()}], system_prompt)
+
+
+def _fixture_path(fixture_dir, key):
+    return os.path.join(fixture_dir, f"{key}.json")
+
+
+def _save_fixture(fixture_dir, key, fixture):
+    os.makedirs(fixture_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=fixture_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+        json.dump(fixture, tmp, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, _fixture_path(fixture_dir, key))
+    logger.info("Recorded LLM fixture %s", key[:12])
+
+
+def _last_text(messages):
+    """Returns the text of the latest message, so fixtures can be told apart by eye."""
+    for message in reversed(messages):
+        for block in message.get("content", []):
+            if isinstance(block, dict) and isinstance(block.get("text"), str):
+                return block["text"][:500]
+    return ""
+
+
+class RecordingModel(Model):
+    """
+    Wraps a strands model and saves every completed response as a fixture for `ReplayModel`.
+
+    Structured output responses are recorded too, with the output object saved as JSON.
+    """
+
+    def __init__(self, model, fixture_dir=None):
+        self.model = model
+        self.fixture_dir = fixture_dir or FIXTURE_DIR
+
+    def update_config(self, **model_config):
+        self.model.update_config(**model_config)
+
+    def get_config(self):
+        return self.model.get_config()
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        key = structured_request_key(self, output_model, prompt, system_prompt)
+        start = time.perf_counter()
+        events = []
+        async for event in self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs):
+            # The last event carries the parsed output object, which is saved as its JSON fields
+            events.append({"output": event["output"].model_dump(mode="json")} if "output" in event else event)
+            yield event
+
+        _save_fixture(self.fixture_dir, key, {
+            "model_id": self.get_config().get("model_id"),
+            "prompt": _last_text(prompt),
+            "latency": round(time.perf_counter() - start, 3),
+            "events": events,
+        })
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        key = request_key(self, messages, tool_specs, system_prompt)
+        start = time.perf_counter()
+        events = []
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            events.append(event)
+            yield event
+
+        _save_fixture(self.fixture_dir, key, {
+            "model_id": self.get_config().get("model_id"),
+            "prompt": _last_text(messages),
+            "latency": round(time.perf_counter() - start, 3),
+            "events": events,
+        })
+
+
+class ReplayModel(Model):
+    """
+    Serves recorded responses in place of a live model, without any network access.
+
+    Requests are matched on the same key as the response cache, so a replay only
+    succeeds for prompts that were recorded; anything else raises `MissingFixtureError`.
+    """
+
+    def __init__(self, model_id, fixture_dir=None, latency=None, **model_config):
+        self.config = dict(model_config, model_id=model_id)
+        self.fixture_dir = fixture_dir or FIXTURE_DIR
+        self.latency = REPLAY_LATENCY if latency is None else latency
+
+    def update_config(self, **model_config):
+        self.config.update(model_config)
+
+    def get_config(self):
+        return self.config
+
+    async def _load(self, key):
+        """Reads a fixture and waits the simulated latency."""
+        try:
+            with open(_fixture_path(self.fixture_dir, key), "r", encoding="utf-8") as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            raise MissingFixtureError(f"No recorded response for request {key[:12]} in {self.fixture_dir}; "
+                                      "record it with LLM_MODE=record") from None
+
+        delay = fixture.get("latency", 0) if self.latency == "recorded" else float(self.latency)
+        if delay:
+            await asyncio.sleep(delay)
+        return fixture
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        fixture = await self._load(structured_request_key(self, output_model, prompt, system_prompt))
+        for event in fixture["events"]:
+            yield {"output": output_model.model_validate(event["output"])} if "output" in event else event
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        fixture = await self._load(request_key(self, messages, tool_specs, system_prompt))
+        for event in fixture["events"]:
+            yield event
@@ -0,0 +1,325 @@
+import glob
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever chunking or tokenization changes, to invalidate persisted indexes
+INDEX_VERSION = "1"
+
+# Directory holding persisted indexes, one JSON file per set of source documents
+INDEX_DIR = os.environ.get("RETRIEVAL_INDEX_DIR", os.path.join(os.getcwd(), ".retrieval_index"))
+
+# Documents searched when no knowledge base is given
+AUDIT_DIR = os.environ.get("RETRIEVAL_AUDIT_DIR", "Audit_files")
+
+# Number of passages included in a prompt
+TOP_K = int(os.environ.get("RETRIEVAL_TOP_K", 8))
+
+# Maximum words per passage; longer sections are split into several passages
+PASSAGE_WORDS = 80
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "does", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "that", "the", "this", "to", "was", "were", "what", "which", "with",
+}
+
+_index_cache = {}
+_stat_cache = {}
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase search terms, without stopwords.
+
+    Args:
+        text (str): e.g. "CO₂ emissions per 100 units"
+
+    Returns:
+        list: e.g. ["co2", "emissions", "per", "100", "units"]
+    """
+    words = re.findall(r"[a-z0-9]+", str(text).lower().replace("₂", "2"))
+    return [word for word in words if word not in STOPWORDS]
+
+
+def _section_lines(data):
+    """Yields the text lines of one extracted section: paragraphs, key-values and table rows."""
+    yield from (str(paragraph) for paragraph in data.get("paragraphs", []))
+    for key, value in data.get("key_values", {}).items():
+        yield f"{key}: {value}"
+    for table in data.get("tables", []):
+        if isinstance(table, dict) and "headers" in table and "columns" in table:
+            rows = [dict(zip(table["headers"], cells)) for cells in zip(*table["columns"])]
+        elif isinstance(table, dict):
+            rows = [table]
+        else:
+            continue
+        for row in rows:
+            # Extracted rows repeat header text in their cells; each distinct cell is kept once
+            cells = dict.fromkeys(str(cell).strip() for item in row.items() for cell in item if cell not in (None, ""))
+            line = " | ".join(cell for cell in cells if cell and cell != "null")
+            if line:
+                yield line
+
+
+def chunk_document(document, source):
+    """
+    Splits an extraction into passages of at most `PASSAGE_WORDS` words.
+
+    Passages never span sections, and each one starts with its section name so
+    the heading is searchable too.
+
+    Args:
+        document (dict): Extraction result from `extract_pdf_to_json`.
+        source (str): Document label, e.g. the audit file name.
+
+    Returns:
+        list: Passages as {"source", "section", "text"}.
+    """
+    passages = []
+    for section, data in document.items():
+        if not isinstance(data, dict):
+            continue
+        lines, words = [], 0
+        for line in _section_lines(data):
+            count = len(line.split())
+            if lines and words + count > PASSAGE_WORDS:
+                passages.append({"source": source, "section": section, "text": f"{section}\n" + "\n".join(lines)})
+                lines, words = [], 0
+            lines.append(line)
+            words += count
+        if lines:
+            passages.append({"source": source, "section": section, "text": f"{section}\n" + "\n".join(lines)})
+    return passages
+
+
+def build_index(passages):
+    """
+    Builds a BM25 inverted index over passages.
+
+    Args:
+        passages (list): Passages from `chunk_document`.
+
+    Returns:
+        dict: {"passages", "postings": {term: [[passage position, term frequency], ...]},
+        "lengths": terms per passage}
+    """
+    postings = {}
+    lengths = []
+    for position, passage in enumerate(passages):
+        terms = tokenize(passage["text"])
+        lengths.append(len(terms))
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, count in counts.items():
+            postings.setdefault(term, []).append([position, count])
+    return {"passages": passages, "postings": postings, "lengths": lengths}
+
+
+def _prepare(index):
+    """Converts posting lists to arrays once, so every query is a few vector operations."""
+    lengths = np.array(index["lengths"], dtype=np.float64)
+    average = lengths.mean() if len(lengths) else 0.0
+    return {
+        "passages": index["passages"],
+        "postings": {term: np.array(entries, dtype=np.int32).T for term, entries in index["postings"].items()},
+        "norms": BM25_K1 * (1 - BM25_B + BM25_B * lengths / (average or 1)),
+    }
+
+
+def index_passages(passages):
+    """
+    Indexes passages in memory, without persisting the index.
+
+    Args:
+        passages (list): Dicts with at least a "text" key.
+
+    Returns:
+        dict: Index ready for `search`.
+    """
+    return _prepare(build_index(passages))
+
+
+def _resolve_paths(paths):
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.json"))))
+        else:
+            files.append(path)
+    return files
+
+
+def _stat_key(files):
+    """Identifies the source files by path, modification time and size, without reading them."""
+    key = [INDEX_VERSION]
+    for path in files:
+        stat = os.stat(path)
+        key.append((os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(key)
+
+
+def _index_key(files):
+    digest = hashlib.sha256(INDEX_VERSION.encode("utf-8"))
+    for path in files:
+        with open(path, "rb") as f:
+            digest.update(os.path.basename(path).encode("utf-8") + b"\0" + hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def load_index(paths=None):
+    """
+    Loads the search index for a set of JSON extractions, building and persisting it on first use.
+
+    Persisted indexes are keyed by the content of the source files, so an edited
+    audit file gets a fresh index. Within a process, files whose modification time
+    and size are unchanged are not read again. Files that are not extractions (such
+    as the supplier registry) contribute no passages.
+
+    Args:
+        paths (str or list, optional): JSON files or directories of JSON files. Defaults to `AUDIT_DIR`.
+
+    Returns:
+        dict: Index ready for `search`.
+    """
+    files = _resolve_paths(paths or AUDIT_DIR)
+    stat_key = _stat_key(files)
+    if stat_key in _stat_cache:
+        return _stat_cache[stat_key]
+    key = _index_key(files)
+    if key in _index_cache:
+        _stat_cache[stat_key] = _index_cache[key]
+        return _index_cache[key]
+
+    index_path = os.path.join(INDEX_DIR, f"{key}.json")
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        passages = []
+        for path in files:
+            with open(path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+            if isinstance(document, dict):
+                passages.extend(chunk_document(document, os.path.basename(path)))
+        index = build_index(passages)
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        # Written under a temporary name first, so concurrent readers never see a partial index
+        fd, tmp_path = tempfile.mkstemp(dir=INDEX_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+            json.dump(index, tmp, ensure_ascii=False)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, index_path)
+
+    _index_cache[key] = _stat_cache[stat_key] = _prepare(index)
+    return _index_cache[key]
+
+
+def search(index, query, top_k=TOP_K, min_score=0.0):
+    """
+    Ranks passages against a query with BM25.
+
+    Args:
+        index (dict): Index from `load_index`.
+        query (str): Free-text query.
+        top_k (int): Maximum number of passages.
+        min_score (float): Minimum score relative to the best passage, from 0 to 1.
+
+    Returns:
+        list: Passages with "score" (the best passage scores 1.0), best first.
+    """
+    passages = index["passages"]
+    scores = np.zeros(len(passages))
+    for term in set(tokenize(query)):
+        postings = index["postings"].get(term)
+        if postings is None:
+            continue
+        positions, frequencies = postings
+        idf = math.log(1 + (len(passages) - len(positions) + 0.5) / (len(positions) + 0.5))
+        scores[positions] += idf * frequencies * (BM25_K1 + 1) / (frequencies + index["norms"][positions])
+
+    best = scores.max() if len(scores) else 0.0
+    if best <= 0:
+        return []
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return [dict(passages[i], score=round(float(scores[i] / best), 4)) for i in order
+            if scores[i] > 0 and scores[i] / best >= min_score]
+
+
+def format_passages(passages):
+    """
+    Formats passages for a prompt, each with the document and section it came from.
+
+    Args:
+        passages (list): Results from `search`.
+
+    Returns:
+        str: One block per passage.
+    """
+    return "\n\n".join(f"[{passage['source']} / {passage['section']}]\n{passage['text']}" for passage in passages)
+
+
+def local_source(knowledge_base_id):
+    """
+    Resolves a knowledge base ID to a file or directory inside `AUDIT_DIR`.
+
+    The ID comes from the model, so it is only used when it names a JSON file or
+    directory within the audit files. Bedrock knowledge base IDs, missing paths and anything
+    resolving outside `AUDIT_DIR` fall back to the whole audit directory.
+
+    Args:
+        knowledge_base_id (str): e.g. "Supplier1_audit.json" or "XWJWESUWGC".
+
+    Returns:
+        str: A path inside `AUDIT_DIR`, or `AUDIT_DIR` itself.
+    """
+    if not knowledge_base_id:
+        return AUDIT_DIR
+    root = os.path.realpath(AUDIT_DIR)
+    # Accepted relative to the working directory ("Audit_files/x.json") or to AUDIT_DIR ("x.json")
+    for candidate in (knowledge_base_id, os.path.join(AUDIT_DIR, knowledge_base_id)):
+        path = os.path.realpath(candidate)
+        if os.path.commonpath([root, path]) == root and (os.path.isdir(path) or
+                                                         os.path.isfile(path) and path.endswith(".json")):
+            return path
+    logger.info("Knowledge base %r is not a local audit file; searching %s", knowledge_base_id, AUDIT_DIR)
+    return AUDIT_DIR
+
+
+def retrieve_local(text: str, numberOfResults: int = 5, score: float = 0.4, knowledgeBaseId: str = None) -> str:
+    """
+    Retrieves relevant passages from the local audit files. Works offline, with the same
+    parameters as the Bedrock Knowledge Base `retrieve` tool; agents take it wrapped with
+    `strands.tool`.
+
+    Args:
+        text: The query to retrieve relevant knowledge.
+        numberOfResults: The maximum number of results to return.
+        score: Minimum relevance score (0.0-1.0), relative to the best result.
+        knowledgeBaseId: A JSON file or directory of JSON files within the audit files to search.
+            Defaults to all audit files; any other ID, such as a Bedrock knowledge base ID, is ignored.
+    """
+    results = search(load_index(local_source(knowledgeBaseId)), text, numberOfResults, score)
+    if not results:
+        return "No results found above score threshold."
+    lines = [f"Retrieved {len(results)} results with score >= {score}:"]
+    for result in results:
+        lines.append(f"\nScore: {result['score']:.4f}")
+        lines.append(f"Document ID: {result['source']}#{result['section']}")
+        lines.append(f"Content: {result['text']}\n")
+    return "\n".join(lines)
@@ -0,0 +1,18 @@
+import math
+
+
+# Average number of characters per model token for English text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimates how many model tokens a piece of text costs in a prompt.
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: Approximate token count, using `CHARS_PER_TOKEN` characters per token.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -1,6 +1,5 @@
 import streamlit as st
 import json
-import fitz  # PyMuPDF
 import tempfile
 import os
 
@@ -41,6 +40,8 @@ demo_audit_data = {
 
 def extract_pdf_text(pdf_file):
     """Extract text from PDF file"""
+    import fitz  # PyMuPDF, loaded on the first upload
+
     try:
         doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
         text = ""
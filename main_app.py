@@ -1,58 +1,86 @@
 import streamlit as st
 import os
 import tempfile
-import subprocess
 import base64
 import re
-from Documen_Parsing_Agent import doc_agent
-from Compliance_Check_Agent import compliance_checking_agent
-from Bid_Scoring_Agent import bid_scoring_agent, pdf_code_agent
-from common_agents import summary_agent
+from Documen_Parsing_Agent.doc_tool import extract_pdf_to_json
+from Documen_Parsing_Agent.tables import compact_tables
+from Compliance_Check_Agent.registry import identify_supplier
+from Compliance_Check_Agent.rules import evaluate_compliance
+from Bid_Scoring_Agent.report_renderer import render_bid_report
+from Bid_Scoring_Agent.scoring import CRITERIA, score_evaluation
+from Bid_Scoring_Agent.sensitivity import weight_sensitivity
 import json
-import fitz
 from streamlit_autorefresh import st_autorefresh
 import random
+from concurrent.futures import ThreadPoolExecutor
+from common_agents.pipeline import run_stages
+from common_agents.context_packer import document_sections, pack_context, passage_sections
+from common_agents.prompt_format import compact_json
+from common_agents.retrieval import load_index, search
 
 
+# Pages extracted up front for the bid summary; the full document is parsed in the background
+PREVIEW_PAGES = 3
 
-def extract_and_save_code(text, output_filename="pdf_app.py"):
-    """
-    Extracts Python code from a text block (typically containing markdown-style code blocks),
-    replaces any usage of 'insert_html' with 'insert_htmlbox', and writes the cleaned code
-    to a specified Python file.
-    
-    Parameters:
-    - text (str): The input text containing Python code, possibly wrapped in triple backticks.
-    - output_filename (str): The name of the file where the extracted code will be saved. Defaults to 'pdf_app.py'.
-    """
-    match = re.search(r"```(?:python)?\n(.*?)```", text, re.DOTALL)
-    code = match.group(1) if match else text
-    code = re.sub(r'\binsert_html\b', 'insert_htmlbox', code)
-    with open(output_filename, "w", encoding="utf-8") as f:
-        f.write(code)
+# What the summary should cover, used to pick the preview sections that fit its context budget
+SUMMARY_QUERY = "supplier contact quote total price quantity delivery date payment terms certifications"
 
 
+@st.cache_resource
+def get_extraction_pool():
+    """Returns the thread pool shared by all sessions for background full extractions."""
+    return ThreadPoolExecutor(max_workers=2)
 
-def pdf_to_report(pdf_path, selected_file_name):
+
+def pdf_to_report(pdf_path, selected_file_name, extraction=None, fresh=False):
     """
     Processes a procurement bid PDF by running document extraction, compliance checking,
     bid scoring, and generating a PDF report. The function dynamically selects the appropriate
-    audit file based on the selected supplier quote.
+    audit files by resolving the supplier in the supplier registry.
 
     Args:
         pdf_path (str): Path to the uploaded bid PDF file.
         selected_file_name (str): Name of the selected file (used to determine supplier).
+        extraction (Future, optional): Background full extraction started at upload time.
+        fresh (bool): Call the agents again instead of reusing cached responses.
     """
+    # The agents and their model stack load on the first analysis, not at app start-up
+    from common_agents.factory import request_agent
+    from common_agents.llm_cache import BYPASS_KEY
+
+    # Fresh agents in stateless mode, so concurrent sessions never share one
+    compliance_checking_agent = request_agent("compliance_agent")
+    bid_scoring_agent = request_agent("scoring_agent")
+
     progress = st.progress(0)
+    # Agent responses are cached by prompt; a fresh analysis still refreshes the cache
+    invocation_state = {BYPASS_KEY: fresh}
     col1, col2, col3, col4 = st.columns(4)
 
-    with st.spinner("📄 Running Document Agent..."):
-        # col1.info("📄 Document Agent is working...")
-        doc_agent_response = doc_agent.tool.extract_pdf_to_json(pdf_path=pdf_path, output_path="output.json")
-        col1.success("✅ Document Agent completed.")
-        progress.progress(25)
-
-    with st.spinner("🔍 Running Compliance Agent..."):
+    def run_document():
+        if extraction is not None:
+            doc_agent_response = extraction.result()
+        else:
+            doc_agent_response = extract_pdf_to_json(pdf_path=pdf_path, output_path="output.json",
+                                                     strip_boilerplate=True)
+        # Tables go into the prompts as header + column arrays instead of one dict per row
+        return compact_tables(doc_agent_response)
+
+    def find_supplier(document):
+        # The file name, the bid's opening lines and any supplier fields are matched against the registry
+        candidates = [os.path.splitext(selected_file_name)[0]]
+        for index, data in enumerate(document.values()):
+            if index == 0:
+                candidates.extend(data.get("paragraphs", [])[:3])
+            candidates.extend(value for key, value in data.get("key_values", {}).items()
+                              if re.search(r"supplier|vendor|company", key, re.IGNORECASE))
+        supplier = identify_supplier(candidates)
+        if supplier is None:
+            raise LookupError("Could not determine the supplier from the file name or the bid.")
+        return supplier
+
+    def load_audit_forms(supplier):
         # results_compliance_knowledgebase = compliance_checking_agent.tool.retrieve(
         #     text=f"Extract the compliance information from the Knowledge Base",
         #     numberOfResults=5,
@@ -66,20 +94,40 @@ def pdf_to_report(pdf_path, selected_file_name):
         #     file_contents = file.read()
         #     compliance_report = json.loads(file_contents)
         
-        with open("Audit_files/star-enterprise-audit-form.json", 'r', encoding='utf-8') as file1, \
-        open("Audit_files/vendus-supplier-audit-form.json", 'r', encoding='utf-8') as file2:
-            star_enterprise_data = json.load(file1)
-            vendus_supplier_data = json.load(file2)
-        compliance_report = {
-            "star_enterprise_audit": star_enterprise_data,
-            "vendus_supplier_audit": vendus_supplier_data
-        }
-        
+        # Only the resolved supplier's audit form is relevant to this bid
+        audit_form_path = supplier["supplier"].get("audit_form")
+        if not audit_form_path:
+            return {}
+        with open(audit_form_path, 'r', encoding='utf-8') as file:
+            return {os.path.basename(audit_form_path): json.load(file)}
+
+    def audit_passages(path, query):
+        # Only the passages relevant to the query are sent to the agents, not the whole audit file
+        if not path:
+            return []
+        return passage_sections(search(load_index(path), query))
+
+    def load_supplier_audit(supplier):
+        query = " ".join([supplier["supplier"]["name"], *CRITERIA])
+        return audit_passages(supplier["supplier"].get("audit_file"), query)
+
+    def run_compliance(document, audit_forms, supplier):
+        # Mechanical criteria are decided by rules; the agent only resolves the ones they could not decide
+        rule_checks = evaluate_compliance(document, supporting=audit_forms, supplier=supplier)
+        compliance = {"rule_checks": rule_checks["results"], "agent_review": None}
+        if not rule_checks["undecided"]:
+            return compliance
+
+        decided = [result for result in rule_checks["results"] if result["status"] != "Undecided"]
+        query = " ".join([supplier["supplier"]["name"], *rule_checks["undecided"]])
+        context, _ = pack_context({"bid": document_sections(document),
+                                   "audit": audit_passages(supplier["supplier"].get("audit_form"), query)},
+                                  query, agent="compliance")
         compliance_query = f"""
-            Given the following procurement bid data extracted from a PDF (in JSON format):
+            Given the following procurement bid data extracted from a PDF (the most relevant sections, as compact text):
 
-            ```json
-            {doc_agent_response}
+            ```
+            {context["bid"]}
             ```
             Analyze the data to extract and summarize all relevant information for compliance checking.
             The data includes supplier profiles, contacts, certifications, standards, pricing, quantities, delivery schedules, ESG and sustainability declarations, terms, conditions, and any other facts or entities present.
@@ -95,30 +143,19 @@ def pdf_to_report(pdf_path, selected_file_name):
             - Any additional observations or risks identified
 
             The compliance checking agent is designed to analyze procurement bid data and extract relevant information for compliance checking.
+            The most relevant passages of the supplier's audit form are:
+            {context["audit"]}
+            These criteria were already decided by deterministic rules against the bid data; do not re-evaluate them:
             ```json
-            {compliance_report}
+            {compact_json(decided)}
             ```
+            Determine Pass/Fail, evidence and reasoning only for: {", ".join(rule_checks["undecided"])}.
             Return a comprehensive summary of all extracted information.
         """
-        compliance_agent_response = compliance_checking_agent(compliance_query)
-        col2.success("✅ Compliance Agent completed.")
-        progress.progress(50)
-
-    with st.spinner("📊 Running Bid Scoring Agent..."):
-        
-# Determine which audit file to load based on selected quote
-        if "supplier1_quote" in selected_file_name.lower():
-            audit_file_path = "Audit_files/supplier1_audit.json"
-        elif "supplier2_quote" in selected_file_name.lower():
-            audit_file_path = "Audit_files/supplier2_audit.json"
-        else:
-            st.error("❌ Could not determine the correct audit file.")
-            return
-
-        with open(audit_file_path, 'r', encoding='utf-8') as file:
-            file_contents = file.read()
-            audit_file_info = json.loads(file_contents)
+        compliance["agent_review"] = str(compliance_checking_agent(compliance_query, invocation_state=invocation_state))
+        return compliance
 
+    def run_scoring(document, compliance, supplier_audit, supplier):
         # results_bid_knowledgebase = bid_scoring_agent.tool.retrieve(
         # text=f"what are the audit criteria for the supplier information : {doc_agent_response}",
         # numberOfResults=6,
@@ -128,53 +165,90 @@ def pdf_to_report(pdf_path, selected_file_name):
         #     )
         # st.write("Bid Knowledge Base Results:", results_bid_knowledgebase)
 
+        context, _ = pack_context({"bid": document_sections(document), "audit": supplier_audit},
+                                  " ".join([supplier["supplier"]["name"], *CRITERIA]), agent="scoring")
         bid_query = f"""
         You will use the outputs from the Document Validation Agent and the Compliance Checking Agent to assess each bid independently and comparatively and analyze the audit information to provide accurate bid score.
-        Supplier information is as follows: {doc_agent_response}
-        Compliance Information : {compliance_agent_response}
-        Audit Information: {audit_file_info}
+        Supplier information is as follows: {context["bid"]}
+        Compliance Information : {compact_json(compliance)}
+        Audit Information (most relevant passages): {context["audit"]}
         """
-        bid_agent_response = bid_scoring_agent(bid_query)
-        col3.success("✅ Bid Scoring completed.")
-        progress.progress(75)
-
-    with st.spinner("🧠 Generating PDF Report..."):
-        # col4.info("🧠 PDF Code Agent is generating report...")
-        attempt_count = 0
-        success = False
-        max_attempts = 5  # Set your maximum attempts here
-        while not success and attempt_count < max_attempts:
-            attempt_count += 1
-            pdf_agent_response = pdf_code_agent(
-                "You have to analyze the following bid evaluation data and extract and convert it into html and then use html to generate python code for the json given in response" + str(bid_agent_response)
-            )
-            extract_and_save_code(str(pdf_agent_response), "pdf_app.py")
-
-            try:
-                subprocess.run(["python", "pdf_app.py"], check=True)
-                success = True
-                col4.success(f"✅ PDF Report generated (attempt #{attempt_count})")
-            except subprocess.CalledProcessError:
-                col4.warning(f"⚠️ Attempt #{attempt_count} failed. Retrying...")
-                
-        if not success:
-            st.error(f"❌ Failed to generate PDF report after {max_attempts} attempts.")
-            return
+        # The agent only rates each criterion; weighted and final scores are computed locally
+        return score_evaluation(str(bid_scoring_agent(bid_query, invocation_state=invocation_state)))
+
+    # Bids scored earlier in this session are ranked against this one in the sensitivity analysis
+    scored_bids = st.session_state.setdefault("scored_bids", {})
+    other_bids = [bid for name, bid in scored_bids.items() if name != selected_file_name]
+
+    def run_sensitivity(scoring):
+        if "ratings" not in scoring:
+            return None
+        return weight_sensitivity(other_bids + [scoring])
+
+    def run_report(scoring, sensitivity):
+        # The report layout is fixed, so it is rendered directly from the scoring JSON
+        if sensitivity:
+            scoring = dict(scoring, sensitivity=sensitivity)
+        return render_bid_report(scoring, output_path="bid_evaluation_report.pdf")
+
+    # Each stage starts as soon as its inputs are ready
+    stages = {
+        "document": (run_document, []),
+        "supplier": (find_supplier, ["document"]),
+        "audit_forms": (load_audit_forms, ["supplier"]),
+        "supplier_audit": (load_supplier_audit, ["supplier"]),
+        "compliance": (run_compliance, ["document", "audit_forms", "supplier"]),
+        "scoring": (run_scoring, ["document", "compliance", "supplier_audit", "supplier"]),
+        "sensitivity": (run_sensitivity, ["scoring"]),
+        "report": (run_report, ["scoring", "sensitivity"]),
+    }
+
+    finished = []
+
+    def on_stage_done(name, result, seconds):
+        finished.append(name)
+        progress.progress(int(100 * len(finished) / len(stages)))
+        if name == "document":
+            col1.success(f"✅ Document Agent completed ({seconds:.1f}s).")
+        elif name == "compliance":
+            col2.success(f"✅ Compliance Agent completed ({seconds:.1f}s).")
+        elif name == "scoring":
+            col3.success(f"✅ Bid Scoring completed ({seconds:.1f}s).")
+        elif name == "report":
+            col4.success(f"✅ PDF Report generated ({seconds:.2f}s)")
+
+    try:
+        with st.spinner("🤖 Running Document, Compliance and Bid Scoring Agents..."):
+            stage_results, stage_timings = run_stages(stages, on_stage_done=on_stage_done)
+    except LookupError as e:
+        st.error(f"❌ Could not determine the correct audit file. {e}")
+        return
 
+    st.caption("⏱️ Stage times: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in stage_timings.items()))
     progress.progress(100)
 
-    pdf_output_path = os.path.join(os.getcwd(), "bid_evaluation_report.pdf")
-    if os.path.exists(pdf_output_path):
-        with open(pdf_output_path, "rb") as f:
-            pdf_bytes = f.read()
-            b64_pdf = base64.b64encode(pdf_bytes).decode("utf-8")
-            pdf_display = f'''
-                <iframe src="data:application/pdf;base64,{b64_pdf}" width="100%" height="600px" type="application/pdf" style="border:none;"></iframe>
-            '''
-            st.markdown("#### 📑 Bid Evaluation Report")
-            st.markdown(pdf_display, unsafe_allow_html=True)
-    else:
-        st.error("❌ bid_evaluation_report.pdf not found.")
+    supplier = stage_results["supplier"]
+    st.caption(f"🏢 Supplier: {supplier['supplier']['name']} ({supplier['id']}, {supplier['match']} match)")
+
+    with st.expander("📋 Rule-based compliance checks"):
+        st.dataframe([
+            {"Criterion": result["criterion"], "Status": result["status"], "Evidence": result["evidence"],
+             "Reasoning": result["reasoning"]}
+            for result in stage_results["compliance"]["rule_checks"]
+        ], use_container_width=True)
+
+    sensitivity = stage_results["sensitivity"]
+    if sensitivity:
+        scored_bids[selected_file_name] = dict(stage_results["scoring"], sensitivity=sensitivity)
+        st.caption(f"🎲 Ranking unchanged in {sensitivity['rank_stability']:.0%} of {sensitivity['samples']} "
+                   f"sampled weight vectors across {len(sensitivity['suppliers'])} scored bid(s)")
+
+    b64_pdf = base64.b64encode(stage_results["report"]).decode("utf-8")
+    pdf_display = f'''
+        <iframe src="data:application/pdf;base64,{b64_pdf}" width="100%" height="600px" type="application/pdf" style="border:none;"></iframe>
+    '''
+    st.markdown("#### 📑 Bid Evaluation Report")
+    st.markdown(pdf_display, unsafe_allow_html=True)
 
 def fetch_latest_news():
     sample_news = [
@@ -279,18 +353,28 @@ def main():
             pdf_path = tmp_pdf.name
 
         with st.spinner(f"📄 Processing pdf ..."):
-            doc_agent_response = doc_agent.tool.extract_pdf_to_json(pdf_path=pdf_path, output_path=f"output_{idx}.json")
-            summary_prompt = f"Summarize the following procurement bid data:\n\n{doc_agent_response}"
-            summary_response = summary_agent(summary_prompt)
+            # Summarize from the cover pages and pricing tables while the full parse runs in the background
+            preview_response = extract_pdf_to_json(pdf_path=pdf_path, output_path=f"output_{idx}_preview.json",
+                                                   preview_pages=PREVIEW_PAGES, strip_boilerplate=True)
+            extraction = get_extraction_pool().submit(extract_pdf_to_json, pdf_path=pdf_path,
+                                                      output_path=f"output_{idx}.json", strip_boilerplate=True)
+            context, _ = pack_context({"bid": document_sections(compact_tables(preview_response))},
+                                      SUMMARY_QUERY, agent="summary")
+            summary_prompt = f"Summarize the following procurement bid data:\n\n{context['bid']}"
+            from common_agents.factory import request_agent
+
+            summary_response = request_agent("summary_agent")(summary_prompt)
 
         pdf_data[pdf_file.name] = {
             "path": pdf_path,
-            "summary": summary_response
+            "summary": summary_response,
+            "extraction": extraction
         }
         # Mark this file as processed
         st.session_state.processed_files[pdf_file.name] = {
             "path": pdf_path,
-            "summary": summary_response
+            "summary": summary_response,
+            "extraction": extraction
         }
     
     # Load previously processed files
@@ -311,11 +395,22 @@ def main():
         st.subheader("⚙️ Process a Bid")
         with st.sidebar:
             selected_file = st.radio("Select a bid to process:", list(pdf_data.keys()))
+            fresh = st.checkbox("Fresh analysis (skip cached agent responses)")
             process_btn = st.button("Process this bid")
 
         if process_btn and selected_file:
             st.markdown(f"### Processing: {selected_file}")
-            pdf_to_report(pdf_data[selected_file]["path"], selected_file)
+            pdf_to_report(pdf_data[selected_file]["path"], selected_file, pdf_data[selected_file].get("extraction"),
+                          fresh=fresh)
+
+            # Conversation history each agent carries into its next request
+            from common_agents.history import HISTORY_MODE, history_stats
+
+            with st.sidebar.expander(f"Agent history ({HISTORY_MODE})"):
+                for name, stats in sorted(history_stats().items()):
+                    st.metric(name, f"~{stats['tokens']} tokens",
+                              f"{stats['messages']} messages, peak ~{stats['peak_tokens']} tokens",
+                              delta_color="off")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+from Documen_Parsing_Agent.boilerplate import strip_boilerplate
+from Documen_Parsing_Agent.doc_tool import _is_key_value, _is_section_header, iter_sections
+
+
+def _pages(count=5):
+    return [
+        {
+            "page": number,
+            "lines": ["Acme Procurement Ltd", f"SECTION {number}", f"Body text {number}",
+                      f"Reference: BID-{number}", f"Page {number} of {count}"],
+            "tables": [],
+        }
+        for number in range(1, count + 1)
+    ]
+
+
+def _protected(line):
+    return bool(_is_section_header(line) or _is_key_value(line))
+
+
+def test_numbered_headings_and_body_lines_are_kept():
+    stats = {}
+    pages = list(strip_boilerplate(_pages(), stats, protected=_protected))
+
+    for number, content in enumerate(pages, start=1):
+        assert content["lines"] == [f"SECTION {number}", f"Body text {number}", f"Reference: BID-{number}"]
+    assert stats["boilerplate_lines"] == ["Acme Procurement Ltd", "Page 1 of 5"]
+
+    sections = dict(iter_sections(pages))
+    assert list(sections) == [f"SECTION {number}" for number in range(1, 6)]
+
+
+def test_lines_differing_by_other_numbers_are_not_boilerplate():
+    stats = {}
+    pages = list(strip_boilerplate(_pages(), stats))
+
+    assert [content["lines"][:2] for content in pages] == [[f"SECTION {number}", f"Body text {number}"]
+                                                           for number in range(1, 6)]
+    assert "Page 1 of 5" in stats["boilerplate_lines"]
+
+
+def test_repeated_letterhead_and_key_value_header_are_removed():
+    pages = [
+        {"page": number, "lines": ["ACME PROCUREMENT LTD", "Ref: TENDER-2024-17", f"Body text {number}"], "tables": []}
+        for number in range(1, 6)
+    ]
+    assert _protected("ACME PROCUREMENT LTD") and _protected("Ref: TENDER-2024-17")
+
+    stats = {}
+    stripped = list(strip_boilerplate(pages, stats, protected=_protected))
+
+    assert [content["lines"] for content in stripped] == [[f"Body text {number}"] for number in range(1, 6)]
+    assert stats["boilerplate_lines"] == ["ACME PROCUREMENT LTD", "Ref: TENDER-2024-17"]
@@ -0,0 +1,11 @@
+from common_agents.context_packer import pack_context
+from common_agents.tokens import estimate_tokens
+
+
+def test_packed_context_with_headers_fits_the_budget():
+    sections = [{"name": f"Section {index} with a fairly long heading", "text": "x" * 37} for index in range(40)]
+    sections.append({"name": "Section with a long body", "text": "section " * 500})
+
+    for budget in (100, 250, 400, 1200):
+        packed, report = pack_context({"bid": sections}, "section", budget=budget)
+        assert estimate_tokens(packed["bid"]) <= report["used"] <= budget
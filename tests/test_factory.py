@@ -0,0 +1,17 @@
+import pytest
+
+from common_agents.factory import request_agent
+
+
+@pytest.fixture(autouse=True)
+def aws_region(monkeypatch):
+    # Building a Bedrock client needs a region, but no credentials or network
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+
+
+def test_stateless_requests_get_their_own_agent():
+    assert request_agent("summary_agent", mode="stateless") is not request_agent("summary_agent", mode="stateless")
+
+
+def test_window_requests_share_the_agent():
+    assert request_agent("summary_agent", mode="window") is request_agent("summary_agent", mode="window")
@@ -0,0 +1,35 @@
+import pytest
+
+from Compliance_Check_Agent.registry import build_index, identify_supplier, resolve_supplier
+
+
+REGISTRY = build_index([
+    {"id": "SUP-0001", "name": "Vendus Enterprise", "aliases": ["Vendus", "Vendus Supplier", "Supplier1"],
+     "approved": True},
+    {"id": "SUP-0002", "name": "Star Enterprise", "aliases": ["Star Enterprises", "Supplier2"], "approved": True},
+])
+
+
+@pytest.mark.parametrize("name", [
+    "Supplier3_quote", "supplier_quote", "Nova Enterprise", "Venus Enterprise", "Star Supplies Ltd", "Enterprise",
+])
+def test_near_miss_names_do_not_resolve(name):
+    assert resolve_supplier(name, REGISTRY) is None
+
+
+@pytest.mark.parametrize("name, supplier_id, match", [
+    ("Supplier1_quote", "SUP-0001", "alias"),
+    ("Vendus Enterprise QUOTE", "SUP-0001", "exact"),
+    ("Supplier2_quote", "SUP-0002", "alias"),
+    ("star-enterprise-audit-form", "SUP-0002", "exact"),
+    ("Vendus Enterprise Pvt. Ltd.", "SUP-0001", "exact"),
+    ("Vendus Enterprises", "SUP-0001", "fuzzy"),
+])
+def test_registered_names_resolve(name, supplier_id, match):
+    resolved = resolve_supplier(name, REGISTRY)
+    assert (resolved["id"], resolved["match"]) == (supplier_id, match)
+
+
+def test_candidates_naming_different_suppliers_are_ambiguous():
+    assert identify_supplier(["Supplier1_quote", "Vendus Enterprise QUOTE"], REGISTRY)["id"] == "SUP-0001"
+    assert identify_supplier(["Supplier1_quote", "Star Enterprise"], REGISTRY) is None
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+from strands.models.model import Model
+
+from common_agents.replay import MissingFixtureError, RecordingModel, ReplayModel
+
+
+class Rating(BaseModel):
+    category: str
+    score: int
+
+
+class FakeModel(Model):
+    def __init__(self):
+        self.config = {"model_id": "fake-model"}
+
+    def update_config(self, **model_config):
+        self.config.update(model_config)
+
+    def get_config(self):
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        yield {"event": {"messageStart": {"role": "assistant"}}}
+        yield {"output": output_model(category="ESG", score=4)}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        yield {"contentBlockDelta": {"delta": {"text": "Compliant"}}}
+
+
+def _collect(events):
+    async def collect():
+        return [event async for event in events]
+    return asyncio.run(collect())
+
+
+PROMPT = [{"role": "user", "content": [{"text": "Rate the bid"}]}]
+
+
+def test_recorded_stream_and_structured_output_replay(tmp_path):
+    recorder = RecordingModel(FakeModel(), fixture_dir=str(tmp_path))
+    recorded_stream = _collect(recorder.stream(PROMPT, system_prompt="Score bids"))
+    recorded_output = _collect(recorder.structured_output(Rating, PROMPT, system_prompt="Score bids"))
+
+    replay = ReplayModel("fake-model", fixture_dir=str(tmp_path))
+    assert _collect(replay.stream(PROMPT, system_prompt="Score bids")) == recorded_stream
+    assert _collect(replay.structured_output(Rating, PROMPT, system_prompt="Score bids")) == recorded_output
+
+
+def test_missing_fixture_is_not_a_lookup_error(tmp_path):
+    replay = ReplayModel("fake-model", fixture_dir=str(tmp_path))
+    with pytest.raises(MissingFixtureError):
+        _collect(replay.stream(PROMPT))
+    assert not issubclass(MissingFixtureError, LookupError)
@@ -0,0 +1,29 @@
+import json
+
+from common_agents import retrieval
+
+
+def _unexpected_hash(files):
+    raise AssertionError("unchanged files were hashed again")
+
+
+def test_knowledge_base_ids_stay_inside_the_audit_files(tmp_path, monkeypatch):
+    audit_dir = tmp_path / "audit"
+    audit_dir.mkdir()
+    (audit_dir / "supplier.json").write_text(json.dumps({"Emissions": {"paragraphs": ["CO2 per unit"]}}))
+    (tmp_path / "secret.json").write_text("{}")
+    monkeypatch.setattr(retrieval, "AUDIT_DIR", str(audit_dir))
+
+    assert retrieval.local_source("supplier.json") == str(audit_dir / "supplier.json")
+    for knowledge_base_id in ("XWJWESUWGC", "../secret.json", str(tmp_path / "secret.json"), None):
+        assert retrieval.local_source(knowledge_base_id) == str(audit_dir)
+
+
+def test_load_index_skips_hashing_unchanged_files(tmp_path, monkeypatch):
+    source = tmp_path / "supplier.json"
+    source.write_text(json.dumps({"Emissions": {"paragraphs": ["CO2 per unit"]}}))
+    monkeypatch.setattr(retrieval, "INDEX_DIR", str(tmp_path / "index"))
+    index = retrieval.load_index(str(source))
+
+    monkeypatch.setattr(retrieval, "_index_key", _unexpected_hash)
+    assert retrieval.load_index(str(source)) is index
@@ -0,0 +1,40 @@
+import pytest
+
+from Compliance_Check_Agent.rules import FAIL, PASS, UNDECIDED, check_circularity, check_co2, check_delivery
+
+
+POINTER = {"section": "Sustainability", "field": "paragraphs", "index": 0}
+
+
+def _check(rule, text):
+    result = rule([(text, POINTER)])
+    return result["status"], result["value"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Circularity Index (ISO 59020): 6", (FAIL, 6.0)),
+    ("Circularity report dated 12/05/2024", (UNDECIDED, None)),
+    ("Circularity score: 8/10", (PASS, 8.0)),
+    ("Criterion: Circularity Score; Value: 85%", (PASS, 8.5)),
+])
+def test_circularity_reads_only_the_labelled_score(text, expected):
+    assert _check(check_circularity, text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Delivery terms: Net 30 days", (UNDECIDED, None)),
+    ("Delivery address: 12 Main St, Suite 3 days", (UNDECIDED, None)),
+    ("Delivery within 5 business days", (PASS, 7.0)),
+    ("Lead time: 2-3 weeks", (FAIL, 21.0)),
+])
+def test_delivery_reads_only_the_delivery_time(text, expected):
+    assert _check(check_delivery, text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("CO2 1,2,3 kg per unit", (UNDECIDED, None)),
+    ("CO2: 1,200 g per 100 units", (PASS, 1.2)),
+    ("CO2 0,12 kg per unit", (PASS, 12.0)),
+])
+def test_co2_numbers(text, expected):
+    assert _check(check_co2, text) == expected
@@ -0,0 +1,40 @@
+import math
+
+from Bid_Scoring_Agent.report_renderer import _sensitivity_html
+from Bid_Scoring_Agent.scoring import parse_ratings, score_bids
+from Bid_Scoring_Agent.sensitivity import weight_sensitivity
+
+
+def _evaluation(supplier, **scores):
+    ratings = [{"criterion": name, "score": score} for name, score in scores.items()]
+    return parse_ratings({"supplier": supplier, "ratings": ratings})
+
+
+FULL = {"CO2 Emissions": 4, "Circularity": 4, "Cost": 4, "Delivery": 4, "Vendor Scorecard": 4}
+
+
+def test_missing_ratings_are_unrated_not_scored_as_one():
+    partial = dict(FULL, Cost="n/a")
+    del partial["Circularity"]
+    scored = score_bids([_evaluation("Complete", **FULL), _evaluation("Partial", **partial)])
+
+    assert scored[1]["unrated"] == ["Circularity", "Cost"]
+    assert [category["score"] for category in scored[1]["categories"]] == [4.0, None, None, 4.0, 4.0]
+    assert scored[0]["final_score"] == scored[1]["final_score"] == 4.0
+    assert scored[0]["rank"] == scored[1]["rank"] == 1
+
+
+def test_sensitivity_handles_unrated_suppliers():
+    result = weight_sensitivity([_evaluation("Complete", **FULL), _evaluation("Empty")], samples=50)
+
+    assert result["suppliers"]["Complete"]["base_rank"] == 1
+    assert result["suppliers"]["Empty"]["base_rank"] == 2
+    assert math.isnan(result["suppliers"]["Empty"]["base_score"])
+
+
+def test_sensitivity_text_names_the_weight_profile():
+    evaluations = [_evaluation("Complete", **FULL)]
+    assert "around the cost focused weights" in _sensitivity_html(
+        weight_sensitivity(evaluations, "cost_focused", samples=10), "Complete")
+    assert "around the custom weights" in _sensitivity_html(
+        weight_sensitivity(evaluations, dict.fromkeys(FULL, 1), samples=10), "Complete")
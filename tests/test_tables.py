@@ -0,0 +1,35 @@
+from Documen_Parsing_Agent.tables import _is_numeric_header, rows_to_columns, table_to_columns, table_to_rows
+
+
+TABLE = [
+    ["Part No", "Year", "Postcode", "Quantity", "Unit Price"],
+    ["007", "2024", "02115", "10", "$1,200.50"],
+    ["0042", "2025", "10001", "0.5", "3"],
+]
+
+
+def test_identifiers_and_years_stay_text():
+    columnar = table_to_columns(TABLE)
+    columns = dict(zip(columnar["headers"], columnar["columns"]))
+
+    assert columns["Part No"] == ["007", "0042"]
+    assert columns["Year"] == ["2024", "2025"]
+    assert columns["Postcode"] == ["02115", "10001"]
+    assert columns["Quantity"] == [10.0, 0.5]
+    assert columns["Unit Price"] == [1200.5, 3.0]
+
+
+def test_wide_rows_keep_one_table():
+    table = [["Item", "Total"], ["Desk", "100"], ["Chair", "50", "note"], ["Lamp"]]
+    rows = table_to_rows(table)
+
+    assert {tuple(row) for row in rows} == {("Item", "Total", "column_3")}
+    assert len(rows_to_columns(rows)) == 1
+    assert rows_to_columns(rows)[0]["columns"][1] == [100.0, 50.0, None]
+
+
+def test_numeric_headers_match_whole_words():
+    for header in ["Unit Prices", "Total", "Taxes", "Discount %", "Lead Time (days)"]:
+        assert _is_numeric_header(header), header
+    for header in ["Corporate", "Summary", "Feedback", "Syntax", "Valuesetter"]:
+        assert not _is_numeric_header(header), header